@@ -1,54 +1,137 @@
+# ai_advisor.py
+# 예측 결과 → LLM 투자 조언
+#
+# - request_ai_advice(): 백그라운드 스레드에서 호출하고 Future 를 바로 돌려준다
+# - 예측은 30분봉 표 대신 토큰 예산 안의 요약(forecast_summary.py)으로 넣는다
+# - 결과는 요청 내용(모델 + 프롬프트) 해시로 메모리 + 디스크(data/ai_advice/)에 캐시
+# - LLMClient 인터페이스로 실제 OpenAI / 로컬 가짜 LLM(FakeLLMClient)을 바꿔 끼운다
+
+import hashlib
+import json
 import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
 import pandas as pd
-from openai import OpenAI
 from dotenv import load_dotenv
 
+from cache import MISSING, DiskCache, MemoryLRU, TieredCache
+from forecast_summary import summarize_forecast
+
 # 환경 변수 로드
 load_dotenv()
 
-def get_ai_advice(item_name, current_price, df_forecast):
+ADVICE_MODEL = os.getenv("AI_ADVISOR_MODEL", "gpt-4o-mini")
+ADVICE_TIMEOUT = float(os.getenv("AI_ADVISOR_TIMEOUT", "30"))        # LLM 호출 제한 시간 (초)
+ADVICE_CACHE_DIR = Path(os.getenv("AI_ADVICE_CACHE_DIR", Path(__file__).resolve().parent / "data" / "ai_advice"))
+ADVICE_CACHE_TTL = float(os.getenv("AI_ADVICE_CACHE_TTL", str(24 * 3600)))
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("AI_ADVISOR_TOKEN_BUDGET", "400"))   # 예측 요약 부분 토큰 예산
+
+SYSTEM_PROMPT = "데이터의 변동성을 해석하여 실질적인 조언을 주는 투자 전문가입니다."
+TEMPERATURE = 0.7
+MAX_TOKENS = 600
+
+# 프롬프트 해시 → 조언 텍스트 (세션 / 재시작과 무관하게 같은 예측이면 같은 답을 다시 쓴다)
+_ADVICE_CACHE = TieredCache(MemoryLRU(256), DiskCache(ADVICE_CACHE_DIR, max_age=ADVICE_CACHE_TTL))
+
+# 백그라운드 호출용 (페이지는 먼저 그리고, 조언은 끝나는 대로 채운다)
+_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ai-advisor")
+_PENDING: dict[str, Future] = {}
+_PENDING_LOCK = threading.Lock()
+
+
+class LLMClient(ABC):
     """
-    OpenAI GPT를 활용하여 예측 데이터를 분석하고 투자 조언을 생성합니다.
+    LLM 호출 인터페이스. complete() 하나만 구현하면 된다.
+    (OpenAIClient: 실제 API, FakeLLMClient: 로컬 / 테스트용)
+    """
+
+    @abstractmethod
+    def complete(self, messages: list[dict], model: str, temperature: float, max_tokens: int, timeout: float) -> str:
+        pass
+
+
+class OpenAIClient(LLMClient):
+    def __init__(self, api_key: str):
+        # openai 는 실제로 호출할 때만 import (페이지 import 시간 / 설치 안 된 로컬 환경)
+        from openai import OpenAI
+
+        self._client = OpenAI(api_key=api_key, max_retries=1)
+
+    def complete(self, messages, model, temperature, max_tokens, timeout):
+        response = self._client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+        )
+        return response.choices[0].message.content
+
+
+class FakeLLMClient(LLMClient):
     """
-    # 1. API 키 확인
+    네트워크 없이 쓰는 가짜 LLM. 프롬프트를 받은 그대로 기록하고 고정된 답을 돌려준다.
+    delay 로 응답 지연을, delay > timeout 이면 시간 초과를 흉내낸다.
+    """
+
+    def __init__(self, response: str = "🤖 (fake) 테스트용 AI 조언입니다.", delay: float = 0.0):
+        self.response = response
+        self.delay = delay
+        self.calls: list[list[dict]] = []
+
+    def complete(self, messages, model, temperature, max_tokens, timeout):
+        self.calls.append(messages)
+        if self.delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"{timeout:g}초 안에 응답이 없습니다.")
+        time.sleep(self.delay)
+        return self.response
+
+
+def default_client() -> LLMClient | None:
+    """AI_ADVISOR_CLIENT=fake 면 FakeLLMClient, 아니면 OPENAI_API_KEY 로 OpenAIClient (키가 없으면 None)"""
+    if os.getenv("AI_ADVISOR_CLIENT") == "fake":
+        return FakeLLMClient()
+
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
-        return "⚠️ .env 파일에 OPENAI_API_KEY가 설정되지 않았습니다."
+        return None
+    return OpenAIClient(api_key)
 
-    client = OpenAI(api_key=api_key)
 
-    try:
-        # 2. 데이터 전처리 및 팩트 계산
-        # 날짜 컬럼이 datetime 형식인지 확실하게 변환
-        if not pd.api.types.is_datetime64_any_dtype(df_forecast['ds']):
-            df_forecast['ds'] = pd.to_datetime(df_forecast['ds'])
-
-        # 최고점 (Max) 계산
-        idx_max = df_forecast['forecast'].idxmax()
-        max_val = int(df_forecast.loc[idx_max, 'forecast'])
-        max_time_exact = df_forecast.loc[idx_max, 'ds'].strftime("%m/%d %H:%M")
-
-        # 최저점 (Min) 계산
-        idx_min = df_forecast['forecast'].idxmin()
-        min_val = int(df_forecast.loc[idx_min, 'forecast'])
-        min_time_exact = df_forecast.loc[idx_min, 'ds'].strftime("%m/%d %H:%M")
-
-        # GPT에게 넘겨줄 데이터 포맷팅 (가독성을 위해 날짜 문자열 변환)
-        df_full = df_forecast[['ds', 'forecast']].copy()
-        df_full['ds'] = df_full['ds'].dt.strftime("%m/%d %H:%M")
-        data_str = df_full.to_string(index=False)
-
-        # 3. 프롬프트 구성 (요청사항: 원본 유지)
-        prompt = f"""
-    너는 노련한 로스트아크 투자 전문가야. '{item_name}'의 향후 3일(30분 봉) 시세 데이터를 분석해줘.
+def build_prompt(item_name, current_price, df_forecast, token_budget=PROMPT_TOKEN_BUDGET):
+    """
+    df_forecast(ds, forecast) → 사용자 프롬프트.
+    예측 데이터는 30분봉 전체 표 대신 토큰 예산 안의 요약(forecast_summary.py)으로 넣는다
+    → 예측 구간(FORECAST_STEPS)이 길어져도 프롬프트 길이 / 호출 비용이 늘지 않는다
+    """
+    data_str, info = summarize_forecast(df_forecast, token_budget=token_budget)
+
+    # 최저 / 최고는 요약에 들어간 값 그대로 (절대 팩트와 요약 표가 서로 어긋나지 않도록)
+    min_ts, min_price = info["min"]
+    max_ts, max_price = info["max"]
+    min_val, min_time_exact = int(min_price), min_ts.strftime("%m/%d %H:%M")
+    max_val, max_time_exact = int(max_price), max_ts.strftime("%m/%d %H:%M")
+
+    horizon = pd.to_datetime(df_forecast['ds']).agg(["min", "max"])
+    horizon_days = round((horizon["max"] - horizon["min"] + pd.Timedelta(minutes=30)) / pd.Timedelta(days=1), 1)
+
+    # 프롬프트 구성 (예측 데이터 부분만 요약으로 바꾸고 나머지는 원본 유지)
+    return f"""
+    너는 노련한 로스트아크 투자 전문가야. '{item_name}'의 향후 {horizon_days:g}일 시세 예측을 분석해줘.
 
     [절대 팩트 (참고용)]
     - 현재가: {current_price} G
     - 데이터상 최저점: {min_val} G (찍은 시각: {min_time_exact})
     - 데이터상 최고점: {max_val} G (찍은 시각: {max_time_exact})
 
-    [향후 3일(30분 봉) 시세 예측 데이터]
-    {data_str}
+    [향후 {horizon_days:g}일 시세 예측 요약 (30분 봉 예측을 전환점 / 추세 구간 / {info["freq"]} OHLC 로 압축)]
+{data_str}
 
     [분석 요청]
     위 데이터를 보고, 사용자가 실제로 수익을 낼 수 있는 "유효 타격 시간대"와 "안전 매매가"를 판단해줘.
@@ -64,21 +147,104 @@ def get_ai_advice(item_name, current_price, df_forecast):
         -> (전략: 하락 추세의 기울기를 보고, 체결 가능한 안전한 가격 산정)
     5. **추천 판매가**: **0000 G** 이상
         -> (전략: 상승 추세의 힘을 보고, 욕심부리지 않고 팔릴 가격 산정)
-    
+
     **요약:** (추천 구매가, 추천 판매가를 확인 후 한 줄로 추천)
     """
 
-        # 4. GPT API 호출
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+
+def advice_key(prompt, model=ADVICE_MODEL):
+    """
+    캐시 key = 실제 요청 내용(모델 + 시스템 / 사용자 프롬프트 + 샘플링 설정)의 해시.
+    프롬프트에 아이템 / 현재가 / 예측값이 모두 들어가므로, 예측이 바뀌면 key 도 바뀐다.
+    """
+    payload = json.dumps([model, SYSTEM_PROMPT, prompt, TEMPERATURE, MAX_TOKENS], ensure_ascii=False)
+    return f"ai_advice:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+def ai_advice_key(item_name, current_price, df_forecast, model=ADVICE_MODEL):
+    """request_ai_advice 가 쓸 캐시 key (LLM 호출 없이 확인용, 프롬프트를 만들 수 없으면 None)"""
+    try:
+        return advice_key(build_prompt(item_name, current_price, df_forecast), model)
+    except Exception:
+        return None
+
+
+def cached_advice(key):
+    """캐시된 조언 (없으면 None)"""
+    value = _ADVICE_CACHE.get(key)
+    return None if value is MISSING else value
+
+
+def _call_llm(client, key, prompt, model, timeout):
+    try:
+        advice = client.complete(
             messages=[
-                {"role": "system", "content": "데이터의 변동성을 해석하여 실질적인 조언을 주는 투자 전문가입니다."},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.7,
-            max_tokens=600
+            model=model,
+            temperature=TEMPERATURE,
+            max_tokens=MAX_TOKENS,
+            timeout=timeout,
         )
-        return response.choices[0].message.content
-
     except Exception as e:
+        # 실패 / 시간 초과는 캐시하지 않는다 (다음 요청에서 다시 시도)
         return f"🤖 AI 분석 실패: {str(e)}"
+
+    _ADVICE_CACHE.set(key, advice)
+    return advice
+
+
+def request_ai_advice(item_name, current_price, df_forecast, client=None, model=ADVICE_MODEL, timeout=ADVICE_TIMEOUT):
+    """
+    조언 요청을 백그라운드로 보내고 (key, Future[str]) 를 바로 돌려준다.
+
+    - 캐시에 있으면 이미 끝난 Future
+    - 같은 key 로 진행 중인 요청이 있으면 그 Future 를 같이 쓴다 (세션 여러 개가 동시에 눌러도 호출 1번)
+    - 결과는 항상 문자열 (실패 / 시간 초과 / 키 없음은 안내 문구)
+    """
+    try:
+        prompt = build_prompt(item_name, current_price, df_forecast)
+    except Exception as e:
+        return None, _done(f"🤖 AI 분석 실패: {str(e)}")
+    key = advice_key(prompt, model)
+
+    advice = cached_advice(key)
+    if advice is not None:
+        return key, _done(advice)
+
+    with _PENDING_LOCK:
+        # 끝난 job 은 done 콜백(_forget)이 돌기 전까지 잠깐 남아 있을 수 있다 → 진행 중인 것만 같이 쓴다
+        job = _PENDING.get(key)
+        if job is not None and not job.done():
+            return key, job
+
+        client = client or default_client()
+        if client is None:
+            return key, _done("⚠️ .env 파일에 OPENAI_API_KEY가 설정되지 않았습니다.")
+
+        job = _EXECUTOR.submit(_call_llm, client, key, prompt, model, timeout)
+        _PENDING[key] = job
+
+    job.add_done_callback(lambda _: _forget(key))
+    return key, job
+
+
+def get_ai_advice(item_name, current_price, df_forecast, client=None, model=ADVICE_MODEL, timeout=ADVICE_TIMEOUT):
+    """
+    OpenAI GPT를 활용하여 예측 데이터를 분석하고 투자 조언을 생성합니다.
+    (request_ai_advice 를 끝날 때까지 기다리는 동기 버전)
+    """
+    _, job = request_ai_advice(item_name, current_price, df_forecast, client, model, timeout)
+    return job.result()
+
+
+def _done(value):
+    job = Future()
+    job.set_result(value)
+    return job
+
+
+def _forget(key):
+    with _PENDING_LOCK:
+        _PENDING.pop(key, None)
@@ -1,76 +1,121 @@
 # backtest.py
+# 예측 기반 '깐깐한 투자자' 백테스트 엔진
+#
+# - 매수/매도 신호(괴리율, 예측가 도달 여부)는 NumPy 로 한 번에 계산
+# - 현금 / 포지션 상태 머신만 float 리스트 위의 짧은 루프로 돌린다
+#   (포지션이 없을 때는 다음 매수 후보 시점으로 바로 건너뜀)
+# - 거래 기록은 tuple 로 모았다가 마지막에 structured array(TRADE_DTYPE) 1개로 만든다
+# - sweep_strict_investor(): 파라미터 grid 전체를 같은 y_test / y_pred 위에서 한 번에 평가
+#   (target_margin 별 신호는 한 번만 계산, 조합들은 워커 프로세스에 나눠서 실행)
 
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 
 
-def simulate_strict_investor(
-	test_dates,
-	y_test,
-	y_pred,
+TAKE_PROFIT_RATE = 0.05		# 평단가 대비 이 비율 넘게 오르면 전량 매도
+
+TRADE_DTYPE = np.dtype([
+	("type", "U4"),					# "BUY" / "SELL"
+	("date", "datetime64[ns]"),
+	("price", "f8"),				# 체결가 (실제 가격)
+	("pred_price", "f8"),
+	("expected_margin", "f8"),		# BUY: 예측 괴리율 / SELL: 평단 대비 수익률
+	("qty", "i8"),
+	("profit", "f8"),				# SELL 만 (BUY 는 NaN)
+])
+
+_NAT = np.datetime64("NaT", "ns")
+
+
+def strict_investor_signals(y_test, y_pred, target_margin: float) -> dict[str, np.ndarray]:
+	"""
+	상태(현금 / 보유 수량)와 무관한 신호를 한 번에 계산.
+
+	return: {
+		"price", "pred": float 배열,
+		"margin": (예측가 - 현재가) / 현재가,
+		"buy": margin > target_margin (매수 후보),
+		"sell": 현재가 >= 예측가 (보유 중이면 매도),
+	}
+	"""
+	price = np.asarray(y_test, dtype=float).ravel()
+	pred = np.asarray(y_pred, dtype=float).ravel()
+
+	with np.errstate(divide="ignore", invalid="ignore"):
+		margin = (pred - price) / price
+
+	return {
+		"price": price,
+		"pred": pred,
+		"margin": margin,
+		"buy": margin > target_margin,
+		"sell": price >= pred,
+	}
+
+
+def run_strict_investor(
+	signals: dict[str, np.ndarray],
 	initial_balance: float,
 	fee_rate: float,
 	per_trade_ratio: float,
 	max_position_ratio: float,
-	target_margin: float,
+	dates=None,
 ):
 	"""
-	비율 기반 '깐깐한 투자자' 시뮬레이션
+	strict_investor_signals() 결과로 현금 / 포지션 상태 머신 실행.
 
-	- initial_balance: 기준 자산 (골드)
-	- per_trade_ratio: 1회 매수 시 자산 대비 투자 비율 (0.05 = 5%)
-	- max_position_ratio: 한 아이템에 최대 투자 가능한 비율 (0.3 = 30%)
-	- fee_rate: 매도 시 수수료율 (0.05 = 5%)
-	- target_margin: 매수 기준 기대 수익률 (0.1 = 10%)
-
-	과거 test 구간에 대해:
-		예측가와 현재가의 괴리율이 target_margin 이상이면 매수
-		예측가 이상이 되었거나, 5% 이상 수익이 나면 전량 매도
+	return: (balance, position_qty, ledger)
+	  - ledger: TRADE_DTYPE structured array (체결 순서)
 	"""
+	price = signals["price"]
+	n = len(price)
 
-	# pandas Series/Index 로 통일
-	test_dates = pd.Series(test_dates).reset_index(drop=True)
-	y_test = pd.Series(y_test).reset_index(drop=True)
-	y_pred = pd.Series(y_pred).reset_index(drop=True)
-
-	balance = float(initial_balance)		# 현금
-	position_qty = 0						# 보유 수량
-	avg_buy_price = 0.0						# 평단가
-
-	max_position_value = initial_balance * max_position_ratio
+	price_l = price.tolist()
+	pred_l = signals["pred"].tolist()
+	margin_l = signals["margin"].tolist()
+	buy_l = signals["buy"].tolist()
+	sell_l = signals["sell"].tolist()
 
-	records = []
+	# next_buy[i] = i 이후(포함) 첫 매수 후보 시점 (없으면 n)
+	next_buy = np.where(signals["buy"], np.arange(n), n)
+	next_buy = np.minimum.accumulate(next_buy[::-1])[::-1].tolist()
 
-	for date, real_price, pred_price in zip(test_dates, y_test, y_pred):
-		real_price = float(real_price)
-		pred_price = float(pred_price)
+	trades = []		# TRADE_DTYPE 순서 tuple (날짜는 마지막에 한 번에 채운다)
+	rows = []		# trades 각 행의 시점 index
 
-		# 현재 보유 포지션 평가액
-		position_value = position_qty * real_price
+	balance = float(initial_balance)
+	position_qty = 0
+	avg_buy_price = 0.0
 
-		# ---------------------------------------------------
-		# 🔵 매수 전략: 예측가가 충분히 높고, 남은 캐파가 있을 때만
-		# ---------------------------------------------------
-		# 이번 트레이드에 사용할 최대 예산 (비율 기반)
-		buy_budget = initial_balance * per_trade_ratio
+	buy_budget = initial_balance * per_trade_ratio
+	max_position_value = initial_balance * max_position_ratio
 
-		# 최대 포지션 비율을 넘지 않도록 남은 캐파 계산
-		remaining_capacity_value = max(0.0, max_position_value - position_value)
+	i = 0
+	while i < n:
+		# 포지션이 없으면 매도할 게 없으므로 다음 매수 후보로 바로 이동
+		if position_qty == 0:
+			i = next_buy[i]
+			if i >= n:
+				break
 
-		# 실제로 사용할 수 있는 예산 = (트레이드 예산, 남은 캐파, 현재 잔고) 중 최소
-		usable_budget = min(buy_budget, remaining_capacity_value, balance)
+		real_price = price_l[i]
+		pred_price = pred_l[i]
 
-		if usable_budget >= real_price:
-			expected_profit_margin = (pred_price - real_price) / real_price
+		# 🔵 매수: 괴리율이 target_margin 초과 + (트레이드 예산, 남은 캐파, 잔고) 중 최소가 1개 가격 이상
+		if buy_l[i]:
+			remaining_capacity_value = max(0.0, max_position_value - position_qty * real_price)
+			usable_budget = min(buy_budget, remaining_capacity_value, balance)
 
-			if expected_profit_margin > target_margin:
-				# 매수 가능 수량 (정수)
+			if usable_budget >= real_price:
 				buy_qty = int(usable_budget // real_price)
 
 				if buy_qty > 0:
-					cost = buy_qty * real_price
-					balance -= cost
+					balance -= buy_qty * real_price
 
-					# 평단가 갱신 (가중 평균)
 					new_position_qty = position_qty + buy_qty
 					if position_qty == 0:
 						avg_buy_price = real_price
@@ -78,70 +123,210 @@ def simulate_strict_investor(
 						avg_buy_price = (
 							avg_buy_price * position_qty + real_price * buy_qty
 						) / new_position_qty
-
 					position_qty = new_position_qty
 
-					records.append(
-						{
-							"type": "BUY",
-							"date": date,
-							"price": real_price,
-							"pred_price": pred_price,
-							"expected_margin": expected_profit_margin,
-							"qty": buy_qty,
-							"profit": None,
-						}
-					)
-
-		# ---------------------------------------------------
-		# 🔵 매도 전략: 예측가 이상이 되었거나, 5% 이상 수익이면 전량 매도
-		# ---------------------------------------------------
+					trades.append(("BUY", _NAT, real_price, pred_price, margin_l[i], buy_qty, np.nan))
+					rows.append(i)
+
+		# 🔵 매도: 예측가 이상이 되었거나, 평단 대비 TAKE_PROFIT_RATE 넘게 수익이면 전량 매도
 		if position_qty > 0:
 			current_profit_rate = (real_price - avg_buy_price) / avg_buy_price
 
-			if real_price >= pred_price or current_profit_rate > 0.05:
-				sell_qty = position_qty
-				gross_amount = sell_qty * real_price
-				net_amount = gross_amount * (1.0 - fee_rate)
-
+			if sell_l[i] or current_profit_rate > TAKE_PROFIT_RATE:
+				net_amount = position_qty * real_price * (1.0 - fee_rate)
 				balance += net_amount
+				profit = net_amount - position_qty * avg_buy_price
+
+				trades.append(("SELL", _NAT, real_price, pred_price, current_profit_rate, position_qty, profit))
+				rows.append(i)
 
-				profit = net_amount - sell_qty * avg_buy_price
-
-				records.append(
-					{
-						"type": "SELL",
-						"date": date,
-						"price": real_price,
-						"pred_price": pred_price,
-						"expected_margin": current_profit_rate,
-						"qty": sell_qty,
-						"profit": profit,
-					}
-				)
-
-				# 포지션 정리
 				position_qty = 0
 				avg_buy_price = 0.0
 
+		i += 1
+
+	ledger = np.array(trades, dtype=TRADE_DTYPE)
+	if dates is not None and rows:
+		# 체결된 시점만 골라서 변환 (전체 날짜열 변환 비용 회피)
+		ledger["date"] = pd.to_datetime(pd.Series(dates).iloc[rows]).to_numpy("datetime64[ns]")
+
+	return balance, position_qty, ledger
+
+
+def simulate_strict_investor(
+	test_dates,
+	y_test,
+	y_pred,
+	initial_balance: float,
+	fee_rate: float,
+	per_trade_ratio: float,
+	max_position_ratio: float,
+	target_margin: float,
+):
+	"""
+	비율 기반 '깐깐한 투자자' 시뮬레이션
+
+	- initial_balance: 기준 자산 (골드)
+	- per_trade_ratio: 1회 매수 시 자산 대비 투자 비율 (0.05 = 5%)
+	- max_position_ratio: 한 아이템에 최대 투자 가능한 비율 (0.3 = 30%)
+	- fee_rate: 매도 시 수수료율 (0.05 = 5%)
+	- target_margin: 매수 기준 기대 수익률 (0.1 = 10%)
+
+	과거 test 구간에 대해:
+		예측가와 현재가의 괴리율이 target_margin 이상이면 매수
+		예측가 이상이 되었거나, 5% 이상 수익이 나면 전량 매도
+
+	return: {"final_asset_value", "net_profit", "roi", "trade_history"(DataFrame), "ledger"(structured array)}
+	"""
+	signals = strict_investor_signals(y_test, y_pred, target_margin)
+
+	balance, position_qty, ledger = run_strict_investor(
+		signals,
+		initial_balance=initial_balance,
+		fee_rate=fee_rate,
+		per_trade_ratio=per_trade_ratio,
+		max_position_ratio=max_position_ratio,
+		dates=test_dates,
+	)
+
 	# ---------------------------------------------------
 	# 최종 정산: 마지막 시점 가격 기준으로 잔여 포지션 평가
 	# ---------------------------------------------------
-	if len(y_test) > 0:
-		last_price = float(y_test.iloc[-1])
-	else:
-		last_price = 0.0
+	price = signals["price"]
+	last_price = float(price[-1]) if len(price) > 0 else 0.0
 
 	unrealized_value = position_qty * last_price * (1.0 - fee_rate)
 	final_asset_value = balance + unrealized_value
 	net_profit = final_asset_value - initial_balance
 	roi = (net_profit / initial_balance) * 100.0 if initial_balance > 0 else 0.0
 
-	trade_history = pd.DataFrame(records)
-
 	return {
 		"final_asset_value": final_asset_value,
 		"net_profit": net_profit,
 		"roi": roi,
-		"trade_history": trade_history,
+		"trade_history": pd.DataFrame(ledger),
+		"ledger": ledger,
 	}
+
+
+# ---------------------------------------------------------------------
+# 파라미터 스윕 (grid backtest)
+# ---------------------------------------------------------------------
+SWEEP_PARAMS = ("fee_rate", "per_trade_ratio", "max_position_ratio", "target_margin")
+SWEEP_PARALLEL_MIN = 64		# 조합이 이보다 적으면 프로세스 띄우는 비용이 더 커서 그냥 순차 실행
+
+_SWEEP_PRICE: np.ndarray | None = None
+_SWEEP_PRED: np.ndarray | None = None
+
+
+def _init_sweep_worker(price, pred):
+	global _SWEEP_PRICE, _SWEEP_PRED
+	_SWEEP_PRICE = price
+	_SWEEP_PRED = pred
+
+
+def _run_sweep_chunk(target_margin: float, combos: list[tuple[float, float, float]], initial_balance: float):
+	"""
+	target_margin 1개 + (fee_rate, per_trade_ratio, max_position_ratio) 조합 여러 개.
+	신호는 여기서 한 번만 계산하고 모든 조합이 같이 쓴다.
+
+	return: [(fee_rate, per_trade_ratio, max_position_ratio, target_margin, final_asset_value, n_trades), ...]
+	"""
+	signals = strict_investor_signals(_SWEEP_PRICE, _SWEEP_PRED, target_margin)
+	price = signals["price"]
+	last_price = float(price[-1]) if len(price) > 0 else 0.0
+
+	rows = []
+	for fee_rate, per_trade_ratio, max_position_ratio in combos:
+		balance, position_qty, ledger = run_strict_investor(
+			signals,
+			initial_balance=initial_balance,
+			fee_rate=fee_rate,
+			per_trade_ratio=per_trade_ratio,
+			max_position_ratio=max_position_ratio,
+		)
+		final_asset_value = balance + position_qty * last_price * (1.0 - fee_rate)
+		rows.append((fee_rate, per_trade_ratio, max_position_ratio, target_margin, final_asset_value, len(ledger)))
+
+	return rows
+
+
+def sweep_strict_investor(
+	y_test,
+	y_pred,
+	initial_balance: float,
+	fee_rates,
+	per_trade_ratios,
+	max_position_ratios,
+	target_margins,
+	max_workers: int | None = None,
+) -> pd.DataFrame:
+	"""
+	4개 파라미터 grid 의 모든 조합에 대해 simulate_strict_investor 와 같은 백테스트 실행.
+
+	- 각 파라미터는 값 1개 또는 값 목록
+	- y_test / y_pred 는 워커마다 한 번만 넘기고, target_margin 별로 신호를 한 번만 계산한다
+	- max_workers=1 이거나 조합이 적으면 현재 프로세스에서 순차 실행
+
+	return: 조합당 1행 DataFrame
+	  (fee_rate, per_trade_ratio, max_position_ratio, target_margin,
+	   final_asset_value, net_profit, roi, n_trades)
+	  → sweep_pivot() 으로 히트맵용 2차원 표를 만들 수 있다
+	"""
+	price = np.asarray(y_test, dtype=float).ravel()
+	pred = np.asarray(y_pred, dtype=float).ravel()
+
+	fee_rates, per_trade_ratios, max_position_ratios, target_margins = (
+		[float(v) for v in np.atleast_1d(values)]
+		for values in (fee_rates, per_trade_ratios, max_position_ratios, target_margins)
+	)
+	combos = list(itertools.product(fee_rates, per_trade_ratios, max_position_ratios))
+
+	max_workers = max_workers or os.cpu_count() or 1
+	n_runs = len(combos) * len(target_margins)
+
+	# target_margin 마다 조합을 워커 수만큼 잘라서 넘김 (신호 계산은 chunk 당 1번)
+	n_split = max(1, min(len(combos), -(-max_workers // max(1, len(target_margins)))))
+	chunks = [
+		(m, combos[k::n_split], initial_balance)
+		for m in target_margins
+		for k in range(n_split)
+	]
+
+	results = []
+	if max_workers == 1 or n_runs < SWEEP_PARALLEL_MIN:
+		_init_sweep_worker(price, pred)
+		for chunk in chunks:
+			results.extend(_run_sweep_chunk(*chunk))
+	else:
+		with ProcessPoolExecutor(
+			max_workers=max_workers,
+			initializer=_init_sweep_worker,
+			initargs=(price, pred),
+		) as pool:
+			for rows in pool.map(_run_sweep_chunk, *zip(*chunks)):
+				results.extend(rows)
+
+	df = pd.DataFrame(results, columns=[*SWEEP_PARAMS, "final_asset_value", "n_trades"])
+	df["net_profit"] = df["final_asset_value"] - initial_balance
+	df["roi"] = (df["net_profit"] / initial_balance) * 100.0 if initial_balance > 0 else 0.0
+
+	return (
+		df[[*SWEEP_PARAMS, "final_asset_value", "net_profit", "roi", "n_trades"]]
+		.sort_values(list(SWEEP_PARAMS))
+		.reset_index(drop=True)
+	)
+
+
+def sweep_pivot(
+	df_sweep: pd.DataFrame,
+	index: str = "target_margin",
+	columns: str = "per_trade_ratio",
+	value: str = "roi",
+	agg: str = "max",
+) -> pd.DataFrame:
+	"""
+	sweep_strict_investor() 결과를 index × columns 히트맵용 표로 변환.
+	나머지 파라미터 축은 agg(기본: 가장 좋은 값)로 접는다.
+	"""
+	return df_sweep.pivot_table(index=index, columns=columns, values=value, aggfunc=agg)
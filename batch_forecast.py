@@ -0,0 +1,311 @@
+# batch_forecast.py
+# 여러 아이템을 한 번에 예측하는 배치 스크립트 (야간 일괄 예측용)
+#
+# 사용법:
+#   python batch_forecast.py --grade 유물 --keyword 각인서 --output batch_forecasts.parquet
+#
+# - load_merged_data() 결과는 한 번만 읽고, 숫자 컬럼(date / price / item_id)을
+#   shared memory 에 올려서 워커 프로세스들이 복사 없이 같이 읽는다
+# - 아이템별로 대시보드와 동일한 파이프라인(pipeline.py)을 ProcessPoolExecutor 로 병렬 실행
+# - 모든 아이템 예측 결과는 Parquet 파일 1개로 저장
+#   (--store 를 주면 대시보드가 읽는 결과 저장소(forecast_store.py)에도 같이 저장)
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from feature_store import FeatureStore
+from forecast_store import FORECAST_STORE_PATH, ForecastStore, ensemble_record
+from models.ensemble import ENSEMBLE_KEYS, EnsemblePriceModel
+
+
+FORECAST_STEPS = 144		# 3일 (30분 단위)
+MIN_ROWS = 300				# 대시보드와 동일한 최소 학습 데이터 수
+
+SHARED_COLUMNS = ("date", "price", "item_id")
+
+
+# ---------------------------------------------------------------------
+# 1. Shared memory 에 가격 로그 올리기 (부모 프로세스)
+# ---------------------------------------------------------------------
+class SharedPriceLog:
+	"""
+	item_id → date 순으로 정렬한 가격 로그의 숫자 컬럼을 SharedMemory 블록으로 공개.
+	워커에는 블록 이름(spec)과 아이템별 [start, end) 구간만 넘긴다.
+	"""
+
+	def __init__(self, df_final: pd.DataFrame):
+		order = np.argsort(df_final["item_id"].to_numpy(), kind="stable")	# date 순서 유지
+		df_sorted = df_final.iloc[order]
+
+		columns = {
+			"date": df_sorted["date"].to_numpy(dtype="datetime64[ns]").view("int64"),
+			"price": df_sorted["price"].to_numpy(dtype=float),
+			"item_id": df_sorted["item_id"].to_numpy(dtype="int64"),
+		}
+
+		self.blocks: list[shared_memory.SharedMemory] = []
+		self.spec: dict[str, tuple[str, str, int]] = {}
+
+		for col, arr in columns.items():
+			shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+			np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+			self.blocks.append(shm)
+			self.spec[col] = (shm.name, arr.dtype.str, len(arr))
+
+		# 아이템별 연속 구간
+		item_ids = columns["item_id"]
+		unique_ids, starts = np.unique(item_ids, return_index=True)
+		ends = np.append(starts[1:], len(item_ids))
+		self.ranges = {
+			int(i): (int(s), int(e))
+			for i, s, e in zip(unique_ids, starts, ends)
+		}
+
+		# 이름 / 등급은 아이템당 1개라서 작은 dict 로 전달
+		meta = df_sorted.drop_duplicates("item_id", keep="last")
+		self.item_meta = {
+			int(row.item_id): {"name": row.name, "grade": row.grade}
+			for row in meta[["item_id", "name", "grade"]].itertuples(index=False)
+		}
+
+	def close(self):
+		for shm in self.blocks:
+			shm.close()
+			shm.unlink()
+		self.blocks = []
+
+
+# ---------------------------------------------------------------------
+# 2. 워커 프로세스
+# ---------------------------------------------------------------------
+_SHARED: dict[str, np.ndarray] = {}
+_SHM_HANDLES: list[shared_memory.SharedMemory] = []
+_ITEM_META: dict[int, dict] = {}
+_DF_GPT: pd.DataFrame | None = None
+_THREADS: int | None = None
+
+
+def _init_worker(spec, item_meta, df_gpt, threads_per_worker):
+	global _ITEM_META, _DF_GPT, _THREADS
+
+	for col, (name, dtype, length) in spec.items():
+		shm = shared_memory.SharedMemory(name=name)
+		_SHM_HANDLES.append(shm)
+		_SHARED[col] = np.ndarray((length,), dtype=np.dtype(dtype), buffer=shm.buf)
+
+	_ITEM_META = item_meta
+	_DF_GPT = df_gpt
+	_THREADS = threads_per_worker
+
+	# 워커 여러 개가 각자 n_jobs=-1 로 코어를 다 쓰지 않도록 스레드 수 제한
+	if threads_per_worker:
+		from threadpoolctl import threadpool_limits
+		threadpool_limits(limits=threads_per_worker)
+
+
+def _forecast_item(
+	item_id: int,
+	start: int,
+	end: int,
+	steps: int,
+	model_keys: list[str],
+	update: bool = True,
+):
+	"""
+	아이템 1개 예측. return: (item_id, record | None, error_message | None)
+	record: forecast_store.ensemble_record() 결과 (record["forecast"] 가 미래 예측 DataFrame)
+	"""
+	try:
+		meta = _ITEM_META.get(item_id, {})
+
+		df_target = pd.DataFrame({
+			"date": _SHARED["date"][start:end].view("datetime64[ns]"),
+			"price": _SHARED["price"][start:end],
+			"item_id": _SHARED["item_id"][start:end],
+			"name": meta.get("name"),
+			"grade": meta.get("grade"),
+		})
+
+		df_gpt_item = None
+		if _DF_GPT is not None and not _DF_GPT.empty:
+			df_gpt_item = _DF_GPT[_DF_GPT["item_id"] == item_id]
+
+		# feature store 갱신 겸 df_ml 조회 (대시보드와 같은 저장소를 데워둔다)
+		df_ml, features = FeatureStore().refresh(item_id, df_target, df_gpt_item)
+
+		if len(df_ml) < MIN_ROWS:
+			return item_id, None, f"데이터 부족 ({len(df_ml)}개)"
+
+		# 앙상블 멤버끼리도 워커 몫(threads_per_worker) 안에서 스레드를 나눠 쓴다
+		ensemble = EnsemblePriceModel(
+			model_keys=model_keys,
+			item_id=item_id,
+			update=update,
+			n_threads=_THREADS,
+		)
+		ensemble.train(df_ml, features)
+		df_future = ensemble.predict_future(steps)
+
+		if df_future is None:
+			return item_id, None, "예측 가능한 모델 없음"
+
+		# 결과 저장소(forecast_store)에 넣을 검증 예측 / 가중치 / 지표까지 같이 돌려준다
+		record = ensemble_record(ensemble, df_future)
+		return item_id, record, None
+
+	except Exception as e:
+		return item_id, None, str(e)
+
+
+# ---------------------------------------------------------------------
+# 3. 배치 실행 엔트리 포인트
+# ---------------------------------------------------------------------
+def run_batch_forecast(
+	item_ids: list[int],
+	df_final: pd.DataFrame,
+	df_gpt: pd.DataFrame | None,
+	output_path: str | None,
+	max_workers: int | None = None,
+	steps: int = FORECAST_STEPS,
+	model_keys: list[str] = ENSEMBLE_KEYS,
+	update: bool = True,
+	store: ForecastStore | None = None,
+) -> dict:
+	"""
+	item_ids 각각에 대해 앙상블 예측을 병렬 수행하고 output_path(Parquet)에 저장.
+	update=True 면 저장된 LGBM / XGB 는 전체 재학습 대신 새 봉만 이어 학습한다.
+	store 를 주면 아이템별 결과를 (item_id, generated_at) 키로 결과 저장소에도 넣는다
+	(generated_at 은 배치 1번에 하나, 쓰기는 부모 프로세스에서만 한다).
+	output_path 가 None 이면 Parquet 은 만들지 않는다.
+
+	return: {"n_items", "n_ok", "errors", "elapsed_sec", "items_per_sec", "output_path", "generated_at"}
+	"""
+	max_workers = max_workers or os.cpu_count() or 1
+	threads_per_worker = max(1, (os.cpu_count() or 1) // max_workers)
+
+	shared = SharedPriceLog(df_final)
+	targets = [i for i in item_ids if int(i) in shared.ranges]
+
+	results: list[pd.DataFrame] = []
+	errors: dict[int, str] = {}
+
+	generated_at = pd.Timestamp.now()
+	start_time = time.perf_counter()
+
+	try:
+		with ProcessPoolExecutor(
+			max_workers=max_workers,
+			initializer=_init_worker,
+			initargs=(shared.spec, shared.item_meta, df_gpt, threads_per_worker),
+		) as pool:
+			futures = [
+				pool.submit(_forecast_item, int(i), *shared.ranges[int(i)], steps, model_keys, update)
+				for i in targets
+			]
+
+			for fut in as_completed(futures):
+				item_id, record, err = fut.result()
+				if record is None:
+					errors[item_id] = err
+					continue
+
+				if store is not None:
+					store.put(item_id, record, generated_at=generated_at)
+
+				df_future = record["forecast"]
+				df_future.insert(0, "item_id", item_id)
+				df_future.insert(1, "name", shared.item_meta.get(item_id, {}).get("name"))
+				results.append(df_future)
+	finally:
+		shared.close()
+
+	elapsed = time.perf_counter() - start_time
+
+	if results:
+		df_all = pd.concat(results, ignore_index=True).sort_values(["item_id", "date"])
+	else:
+		df_all = pd.DataFrame(columns=["item_id", "name", "date", "ensemble_price"])
+
+	if output_path is not None:
+		df_all.to_parquet(output_path, index=False)
+
+	return {
+		"n_items": len(targets),
+		"n_ok": len(results),
+		"errors": errors,
+		"elapsed_sec": elapsed,
+		"items_per_sec": len(targets) / elapsed if elapsed > 0 else 0.0,
+		"output_path": output_path,
+		"generated_at": generated_at,
+	}
+
+
+def main():
+	parser = argparse.ArgumentParser(description="등급 / 키워드 기준 아이템 일괄 시세 예측")
+	parser.add_argument("--grade", default="유물", help="아이템 등급 ('전체'면 등급 무관)")
+	parser.add_argument("--keyword", default="각인서", help="아이템 이름 키워드")
+	parser.add_argument("--output", default="batch_forecasts.parquet")
+	parser.add_argument("--workers", type=int, default=None)
+	parser.add_argument("--steps", type=int, default=FORECAST_STEPS)
+	parser.add_argument(
+		"--cache-dir",
+		default=None,
+		help="DB 조회 결과 디스크 캐시 디렉터리 (cache.py, 같은 조건으로 다시 돌릴 때 DB 를 다시 읽지 않음)",
+	)
+	parser.add_argument(
+		"--store",
+		nargs="?",
+		const=str(FORECAST_STORE_PATH),
+		default=None,
+		help="결과를 대시보드가 읽는 예측 결과 저장소(SQLite)에도 저장 (경로 생략 시 기본 경로)",
+	)
+	parser.add_argument(
+		"--no-update",
+		action="store_true",
+		help="저장된 LGBM / XGB 를 이어 학습하지 않고 그대로 사용",
+	)
+	args = parser.parse_args()
+
+	from cache import configure_cache
+	from data_loader import load_gpt_scores, load_merged_data
+
+	if args.cache_dir:
+		configure_cache(disk_dir=args.cache_dir)
+
+	print("[1] 시세 / GPT 점수 데이터 로드 중...")
+	df_final = load_merged_data()
+	df_gpt = load_gpt_scores()
+
+	mask = df_final["name"].str.contains(args.keyword, regex=False)
+	if args.grade and args.grade != "전체":
+		mask &= df_final["grade"] == args.grade
+	item_ids = sorted(df_final.loc[mask, "item_id"].dropna().astype(int).unique())
+	print(f" - 대상 아이템: {len(item_ids)}개")
+
+	print("[2] 배치 예측 실행 중...")
+	summary = run_batch_forecast(
+		item_ids,
+		df_final,
+		df_gpt,
+		output_path=args.output,
+		max_workers=args.workers,
+		steps=args.steps,
+		update=not args.no_update,
+		store=ForecastStore(args.store) if args.store else None,
+	)
+
+	print(f" - 성공: {summary['n_ok']} / {summary['n_items']}")
+	for item_id, err in summary["errors"].items():
+		print(f"   · item {item_id}: {err}")
+	print(f" - 소요 시간: {summary['elapsed_sec']:.1f}s ({summary['items_per_sec']:.2f} items/s)")
+	print(f"[완료] {summary['output_path']}")
+
+
+if __name__ == "__main__":
+	main()
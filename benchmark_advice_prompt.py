@@ -0,0 +1,64 @@
+# benchmark_advice_prompt.py
+# AI 조언 프롬프트 크기 비교: 기존 30분봉 전체 표(df.to_string) vs forecast_summary.py 요약
+#
+# 사용법:
+#   python benchmark_advice_prompt.py
+#
+# 예측 길이(FORECAST_STEPS)별 예측 데이터 부분의 추정 토큰 수 / 생성 시간
+# (기존 방식은 길이에 비례해서 늘고, 요약은 토큰 예산 근처에서 멈춰야 한다)
+# 최저 / 최고 보존 확인은 tests/test_forecast_summary.py 에 있다. OpenAI 호출 없이 실행된다.
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from forecast_summary import TOKEN_BUDGET, estimate_tokens, summarize_forecast
+
+
+STEPS = [48, 144, 288, 576, 1440]
+
+
+def make_forecast(steps: int, seed: int) -> pd.DataFrame:
+	"""30분봉 예측 형태의 합성 데이터 (랜덤워크 + 일간 주기 + 가끔 급등/급락)"""
+	rng = np.random.default_rng(seed)
+	walk = np.cumsum(rng.normal(0, 60, steps))
+	daily = 300 * np.sin(np.arange(steps) * 2 * np.pi / 48 + rng.uniform(0, 2 * np.pi))
+	jumps = np.cumsum(rng.normal(0, 800, steps) * (rng.random(steps) < 0.02))
+
+	return pd.DataFrame({
+		"ds": pd.date_range("2025-01-01 00:30", periods=steps, freq="30min"),
+		"forecast": 50_000 + walk + daily + jumps,
+	})
+
+
+def legacy_data_str(df_forecast: pd.DataFrame) -> str:
+	"""기존 get_ai_advice 의 예측 데이터 부분 (30분봉 전체 표)"""
+	df_full = df_forecast[["ds", "forecast"]].copy()
+	df_full["ds"] = df_full["ds"].dt.strftime("%m/%d %H:%M")
+	return df_full.to_string(index=False)
+
+
+def main():
+	print(f"예측 데이터 부분 추정 토큰 수 (요약 예산 {TOKEN_BUDGET})")
+	print(f" {'steps':>6s} | {'기존 표':>8s} | {'요약':>6s} | 요약 설정")
+	for steps in STEPS:
+		df = make_forecast(steps, seed=steps)
+
+		start = time.perf_counter()
+		legacy = legacy_data_str(df)
+		legacy_ms = (time.perf_counter() - start) * 1000
+
+		start = time.perf_counter()
+		text, info = summarize_forecast(df)
+		summary_ms = (time.perf_counter() - start) * 1000
+
+		print(
+			f" {steps:6d} | {estimate_tokens(legacy):8d} | {info['est_tokens']:6d} | "
+			f"{info['freq']} OHLC, 전환점 {info['n_pivots']}개 "
+			f"({legacy_ms:.1f}ms → {summary_ms:.1f}ms)"
+		)
+
+
+if __name__ == "__main__":
+	main()
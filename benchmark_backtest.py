@@ -0,0 +1,239 @@
+# benchmark_backtest.py
+# 백테스트 속도 / 결과 비교: 기존 행 단위 루프 vs backtest.py 엔진 (신호 NumPy 계산 + structured array 거래 기록)
+#
+# 사용법:
+#   python benchmark_backtest.py
+#
+# 합성 가격 / 예측 데이터(고정 seed)를 회귀 fixture 로 써서
+# 여러 파라미터 조합에서 두 구현의 최종 자산 / 거래 기록이 완전히 같은지 확인하고 소요 시간을 비교한다.
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from backtest import simulate_strict_investor
+
+
+N_POINTS = 20_000
+REPEAT = 3
+
+# (fee_rate, per_trade_ratio, max_position_ratio, target_margin)
+PARAM_GRID = [
+	(0.05, 0.05, 0.30, 0.10),
+	(0.05, 0.20, 0.50, 0.02),
+	(0.00, 0.50, 1.00, 0.00),
+	(0.10, 0.01, 0.05, 0.05),
+]
+INITIAL_BALANCE = 10_000_000
+
+
+def make_fixture(n: int = N_POINTS, seed: int = 7):
+	"""랜덤워크 가격 + 노이즈 섞인 예측 (매수/매도가 자주 일어나도록 괴리를 크게 줌)"""
+	rng = np.random.default_rng(seed)
+	dates = pd.Series(pd.date_range("2025-01-01", periods=n, freq="30min"))
+	price = 50_000 * np.exp(np.cumsum(rng.normal(0, 0.004, size=n)))
+	pred = price * (1.0 + rng.normal(0.01, 0.04, size=n))
+	return dates, pd.Series(price), pd.Series(pred)
+
+
+def legacy_simulate_strict_investor(
+	test_dates,
+	y_test,
+	y_pred,
+	initial_balance: float,
+	fee_rate: float,
+	per_trade_ratio: float,
+	max_position_ratio: float,
+	target_margin: float,
+):
+	"""
+	기존 backtest.simulate_strict_investor 구현 (pandas Series 를 한 행씩 순회 + dict append).
+	회귀 비교 기준으로만 사용한다.
+
+	비율 기반 '깐깐한 투자자' 시뮬레이션
+
+	- initial_balance: 기준 자산 (골드)
+	- per_trade_ratio: 1회 매수 시 자산 대비 투자 비율 (0.05 = 5%)
+	- max_position_ratio: 한 아이템에 최대 투자 가능한 비율 (0.3 = 30%)
+	- fee_rate: 매도 시 수수료율 (0.05 = 5%)
+	- target_margin: 매수 기준 기대 수익률 (0.1 = 10%)
+
+	과거 test 구간에 대해:
+		예측가와 현재가의 괴리율이 target_margin 이상이면 매수
+		예측가 이상이 되었거나, 5% 이상 수익이 나면 전량 매도
+	"""
+
+	# pandas Series/Index 로 통일
+	test_dates = pd.Series(test_dates).reset_index(drop=True)
+	y_test = pd.Series(y_test).reset_index(drop=True)
+	y_pred = pd.Series(y_pred).reset_index(drop=True)
+
+	balance = float(initial_balance)		# 현금
+	position_qty = 0						# 보유 수량
+	avg_buy_price = 0.0						# 평단가
+
+	max_position_value = initial_balance * max_position_ratio
+
+	records = []
+
+	for date, real_price, pred_price in zip(test_dates, y_test, y_pred):
+		real_price = float(real_price)
+		pred_price = float(pred_price)
+
+		# 현재 보유 포지션 평가액
+		position_value = position_qty * real_price
+
+		# ---------------------------------------------------
+		# 🔵 매수 전략: 예측가가 충분히 높고, 남은 캐파가 있을 때만
+		# ---------------------------------------------------
+		# 이번 트레이드에 사용할 최대 예산 (비율 기반)
+		buy_budget = initial_balance * per_trade_ratio
+
+		# 최대 포지션 비율을 넘지 않도록 남은 캐파 계산
+		remaining_capacity_value = max(0.0, max_position_value - position_value)
+
+		# 실제로 사용할 수 있는 예산 = (트레이드 예산, 남은 캐파, 현재 잔고) 중 최소
+		usable_budget = min(buy_budget, remaining_capacity_value, balance)
+
+		if usable_budget >= real_price:
+			expected_profit_margin = (pred_price - real_price) / real_price
+
+			if expected_profit_margin > target_margin:
+				# 매수 가능 수량 (정수)
+				buy_qty = int(usable_budget // real_price)
+
+				if buy_qty > 0:
+					cost = buy_qty * real_price
+					balance -= cost
+
+					# 평단가 갱신 (가중 평균)
+					new_position_qty = position_qty + buy_qty
+					if position_qty == 0:
+						avg_buy_price = real_price
+					else:
+						avg_buy_price = (
+							avg_buy_price * position_qty + real_price * buy_qty
+						) / new_position_qty
+
+					position_qty = new_position_qty
+
+					records.append(
+						{
+							"type": "BUY",
+							"date": date,
+							"price": real_price,
+							"pred_price": pred_price,
+							"expected_margin": expected_profit_margin,
+							"qty": buy_qty,
+							"profit": None,
+						}
+					)
+
+		# ---------------------------------------------------
+		# 🔵 매도 전략: 예측가 이상이 되었거나, 5% 이상 수익이면 전량 매도
+		# ---------------------------------------------------
+		if position_qty > 0:
+			current_profit_rate = (real_price - avg_buy_price) / avg_buy_price
+
+			if real_price >= pred_price or current_profit_rate > 0.05:
+				sell_qty = position_qty
+				gross_amount = sell_qty * real_price
+				net_amount = gross_amount * (1.0 - fee_rate)
+
+				balance += net_amount
+
+				profit = net_amount - sell_qty * avg_buy_price
+
+				records.append(
+					{
+						"type": "SELL",
+						"date": date,
+						"price": real_price,
+						"pred_price": pred_price,
+						"expected_margin": current_profit_rate,
+						"qty": sell_qty,
+						"profit": profit,
+					}
+				)
+
+				# 포지션 정리
+				position_qty = 0
+				avg_buy_price = 0.0
+
+	# ---------------------------------------------------
+	# 최종 정산: 마지막 시점 가격 기준으로 잔여 포지션 평가
+	# ---------------------------------------------------
+	if len(y_test) > 0:
+		last_price = float(y_test.iloc[-1])
+	else:
+		last_price = 0.0
+
+	unrealized_value = position_qty * last_price * (1.0 - fee_rate)
+	final_asset_value = balance + unrealized_value
+	net_profit = final_asset_value - initial_balance
+	roi = (net_profit / initial_balance) * 100.0 if initial_balance > 0 else 0.0
+
+	trade_history = pd.DataFrame(records)
+
+	return {
+		"final_asset_value": final_asset_value,
+		"net_profit": net_profit,
+		"roi": roi,
+		"trade_history": trade_history,
+	}
+
+
+def _best_of(func, repeat: int = REPEAT):
+	best = float("inf")
+	result = None
+	for _ in range(repeat):
+		start = time.perf_counter()
+		result = func()
+		best = min(best, time.perf_counter() - start)
+	return best, result
+
+
+def main():
+	print(f"[1] 회귀 fixture 생성 ({N_POINTS:,}개 시점)")
+	dates, y_test, y_pred = make_fixture()
+
+	print(f"[2] 파라미터 {len(PARAM_GRID)}개 조합 비교 (best of {REPEAT})")
+	for fee_rate, per_trade_ratio, max_position_ratio, target_margin in PARAM_GRID:
+		params = dict(
+			initial_balance=INITIAL_BALANCE,
+			fee_rate=fee_rate,
+			per_trade_ratio=per_trade_ratio,
+			max_position_ratio=max_position_ratio,
+			target_margin=target_margin,
+		)
+
+		t_legacy, res_legacy = _best_of(
+			lambda: legacy_simulate_strict_investor(dates, y_test, y_pred, **params)
+		)
+		t_new, res_new = _best_of(
+			lambda: simulate_strict_investor(dates, y_test, y_pred, **params)
+		)
+
+		same_value = res_legacy["final_asset_value"] == res_new["final_asset_value"]
+		try:
+			pd.testing.assert_frame_equal(
+				res_legacy["trade_history"].astype({"profit": float}),
+				res_new["trade_history"],
+				check_dtype=False,
+			)
+			same_trades = True
+		except AssertionError:
+			same_trades = False
+
+		print(
+			f" - fee {fee_rate:.2f} / trade {per_trade_ratio:.2f} / max {max_position_ratio:.2f}"
+			f" / margin {target_margin:.2f}: "
+			f"거래 {len(res_new['ledger']):5d}건, ROI {res_new['roi']:+8.2f}%, "
+			f"legacy {t_legacy * 1000:7.1f} ms → {t_new * 1000:6.1f} ms "
+			f"({t_legacy / t_new:5.1f}x), 동일: {same_value and same_trades}"
+		)
+
+
+if __name__ == "__main__":
+	main()
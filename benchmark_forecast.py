@@ -0,0 +1,105 @@
+# benchmark_forecast.py
+# 미래 예측 roll-out 속도 비교: 기존 pd.concat 방식 vs models/forecast.py ring buffer 엔진
+#
+# 사용법:
+#   python benchmark_forecast.py
+#
+# 1년치 30분봉 합성 데이터(17,520개)로 LightGBM 모델을 학습한 뒤
+# 144 스텝(3일) 예측을 두 방식으로 각각 수행하고 소요 시간을 비교한다.
+
+import time
+
+import numpy as np
+import pandas as pd
+from lightgbm import LGBMRegressor
+
+from features import make_ml_dataset
+from models.forecast import recursive_forecast
+
+
+POINTS_PER_DAY = 48
+HISTORY_DAYS = 365
+FORECAST_STEPS = 144
+REPEAT = 3
+
+
+def make_synthetic_history(days: int = HISTORY_DAYS, seed: int = 42) -> pd.DataFrame:
+	"""일간 주기 + 랜덤워크 형태의 30분봉 가격 데이터"""
+	rng = np.random.default_rng(seed)
+	n = days * POINTS_PER_DAY
+
+	dates = pd.date_range("2025-01-01", periods=n, freq="30min")
+	walk = np.cumsum(rng.normal(0, 30, size=n))
+	daily = 200 * np.sin(np.arange(n) * 2 * np.pi / POINTS_PER_DAY)
+	price = 50_000 + walk + daily
+
+	return pd.DataFrame({"date": dates, "price": price})
+
+
+def legacy_predict_future(model, df_ml: pd.DataFrame, features: list[str], steps: int) -> pd.DataFrame:
+	"""기존 predict_future 구현 (스텝마다 history 복사 + pd.concat)"""
+	history = df_ml.copy().reset_index(drop=True)
+	future_rows = []
+
+	for _ in range(steps):
+		last_row = history.iloc[-1].copy()
+		next_time = last_row["date"] + pd.Timedelta("30min")
+
+		new_row = last_row.copy()
+		new_row["date"] = next_time
+		new_row["hour"] = next_time.hour
+		new_row["day_of_week"] = next_time.dayofweek
+
+		new_row["lag_30m"] = history["price"].iloc[-1]
+		new_row["lag_1h"] = history["price"].iloc[-2]
+		new_row["lag_6h"] = history["price"].iloc[-12]
+		new_row["lag_24h"] = history["price"].iloc[-48]
+
+		X_row = pd.DataFrame([new_row[features]])
+		y_hat = float(model.predict(X_row)[0])
+		new_row["price"] = y_hat
+
+		future_rows.append({"date": next_time, "price": y_hat})
+		history = pd.concat([history, pd.DataFrame([new_row])], ignore_index=True)
+
+	return pd.DataFrame(future_rows)
+
+
+def _best_of(func, repeat: int = REPEAT) -> tuple[float, pd.DataFrame]:
+	best = float("inf")
+	result = None
+	for _ in range(repeat):
+		start = time.perf_counter()
+		result = func()
+		best = min(best, time.perf_counter() - start)
+	return best, result
+
+
+def main():
+	print(f"[1] 합성 데이터 생성 ({HISTORY_DAYS}일, 30분봉)")
+	df_ml, features = make_ml_dataset(make_synthetic_history())
+	print(f" - rows: {len(df_ml)}, features: {features}")
+
+	print("[2] LightGBM 학습")
+	model = LGBMRegressor(n_estimators=200, learning_rate=0.05, random_state=42, verbose=-1)
+	model.fit(df_ml[features], df_ml["price"])
+
+	print(f"[3] {FORECAST_STEPS} 스텝 예측 (best of {REPEAT})")
+	t_legacy, fut_legacy = _best_of(
+		lambda: legacy_predict_future(model, df_ml, features, FORECAST_STEPS)
+	)
+	t_new, fut_new = _best_of(
+		lambda: recursive_forecast(model, df_ml, features, steps=FORECAST_STEPS)
+	)
+
+	max_diff = float(np.max(np.abs(fut_legacy["price"].to_numpy() - fut_new["price"].to_numpy())))
+
+	print(f" - legacy (pd.concat) : {t_legacy * 1000:9.1f} ms")
+	print(f" - ring buffer        : {t_new * 1000:9.1f} ms")
+	print(f" - speedup            : {t_legacy / t_new:9.1f} x")
+	# 새 엔진은 RSI / Bollinger 를 스텝마다 재계산하므로 값이 기존과 다르다
+	print(f" - max |diff|         : {max_diff:,.2f} G (지표 재계산 효과)")
+
+
+if __name__ == "__main__":
+	main()
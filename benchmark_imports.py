@@ -0,0 +1,87 @@
+# benchmark_imports.py
+# 시작(import) 시간 리포트: 페이지별로 최상단 import 만 새 프로세스에서 실행해서 걸린 시간과
+# 무거운 백엔드(TensorFlow / torch / LightGBM / XGBoost / sklearn)가 같이 올라왔는지 확인한다
+#
+# 사용법:
+#   python benchmark_imports.py
+#
+# - 페이지 파일은 실행하면 Streamlit 코드가 돌기 때문에, ast 로 최상단 import 문만 뽑아서 실행한다
+# - 마지막에 models/factory.py 가 모델 키별로 백엔드를 처음 import 할 때 걸린 시간도 출력한다
+#   (container cold start 에서 어떤 모델이 시작 시간을 잡아먹는지 보는 용도)
+
+import ast
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent
+
+ENTRY_POINTS = [
+	"시세_예측_대시보드.py",
+	"pages/투자_시뮬레이션.py",
+	"batch_forecast.py",
+]
+
+HEAVY_MODULES = ["tensorflow", "torch", "neuralprophet", "lightgbm", "xgboost", "sklearn"]
+
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"sec": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+_FACTORY_CHILD = """
+import json
+from models.factory import _MODEL_REGISTRY, get_model_class, import_report
+for key in _MODEL_REGISTRY:
+	get_model_class(key)
+print(json.dumps(import_report()))
+"""
+
+
+def top_level_imports(path: Path) -> list[str]:
+	"""파일 최상단의 import / from-import 문 (소스 그대로)"""
+	source = path.read_text(encoding="utf-8")
+	tree = ast.parse(source)
+	return [
+		ast.get_source_segment(source, node)
+		for node in tree.body
+		if isinstance(node, (ast.Import, ast.ImportFrom))
+	]
+
+
+def _run_child(code: str) -> dict:
+	out = subprocess.run(
+		[sys.executable, "-c", code],
+		cwd=BASE_DIR,
+		capture_output=True,
+		text=True,
+		check=True,
+	)
+	return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+	print("[1] 페이지별 최상단 import 시간 (새 프로세스)")
+	for entry in ENTRY_POINTS:
+		imports = top_level_imports(BASE_DIR / entry)
+		try:
+			result = _run_child(_CHILD.format(imports="\n".join(imports), heavy=HEAVY_MODULES))
+		except subprocess.CalledProcessError as e:
+			print(f" - {entry}: import 실패\n{e.stderr.strip().splitlines()[-1]}")
+			continue
+
+		loaded = ", ".join(result["loaded"]) or "없음"
+		print(f" - {entry:28s} {result['sec']:6.2f}s  (무거운 백엔드: {loaded})")
+
+	print("[2] 모델 키별 백엔드 첫 import 시간 (models/factory.py, 등록 순서대로)")
+	for key, sec in _run_child(_FACTORY_CHILD).items():
+		print(f" - {key:8s} {sec:6.2f}s")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,225 @@
+# cache.py
+# Streamlit 없이 쓰는 데이터 / 리소스 캐시 (data_loader / notice 등 순수 Python 코어용)
+#
+#   1단: 프로세스 메모리 LRU (MemoryLRU)
+#   2단: (선택) 디스크 pickle (DiskCache) - 배치 / 워커 프로세스 / 재시작 후에도 재사용
+#
+# - @cache_data: 인자 값으로 key 를 만들어 결과를 캐시 (st.cache_data 대체)
+#     · 꺼낼 때 DataFrame 은 복사본을 줘서 호출한 쪽이 고쳐도 캐시 원본은 그대로 (st.cache_data 와 같은 의미)
+#     · ttl(초)이 지나면 다시 계산
+# - @cache_resource: 프로세스당 1개만 만드는 객체 (DB engine 등, st.cache_resource 대체)
+# - 디스크 단계는 환경변수 DATA_CACHE_DIR 을 주거나 configure_cache(disk_dir=...) 로 켠다
+#
+# Streamlit 에서는 이 캐시가 프로세스 전역이라 세션끼리 그대로 공유된다 (streamlit_adapter.py 참고)
+
+import functools
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+
+MEMORY_MAX_ITEMS = int(os.getenv("DATA_CACHE_MAX_ITEMS", "64"))
+DATA_CACHE_DIR = os.getenv("DATA_CACHE_DIR")		# 없으면 디스크 단계 없음
+DISK_MAX_AGE = float(os.getenv("DATA_CACHE_DISK_TTL", "1800"))	# 디스크 값은 ttl 이 없어도 이 시간(초)까지만 사용
+
+_MISSING = object()
+MISSING = _MISSING		# MemoryLRU / DiskCache / TieredCache 를 직접 쓰는 쪽(ai_advisor 등)의 "없음" 비교용
+
+
+class MemoryLRU:
+	"""key → (저장 시각, 값). max_items 를 넘으면 가장 오래 안 쓴 것부터 버린다"""
+
+	def __init__(self, max_items: int = MEMORY_MAX_ITEMS):
+		self.max_items = max_items
+		self._items: OrderedDict = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, key, ttl: float | None = None):
+		with self._lock:
+			item = self._items.get(key)
+			if item is None:
+				return _MISSING
+			stored_at, value = item
+			if ttl is not None and time.time() - stored_at > ttl:
+				del self._items[key]
+				return _MISSING
+			self._items.move_to_end(key)
+			return value
+
+	def set(self, key, value):
+		with self._lock:
+			self._items[key] = (time.time(), value)
+			self._items.move_to_end(key)
+			while len(self._items) > self.max_items:
+				self._items.popitem(last=False)
+
+	def clear(self, prefix: str | None = None):
+		with self._lock:
+			if prefix is None:
+				self._items.clear()
+				return
+			for key in [k for k in self._items if k.startswith(prefix)]:
+				del self._items[key]
+
+
+class DiskCache:
+	"""
+	key → <root>/<함수 이름>/<key 해시>.pkl (ttl 은 파일 mtime 기준)
+	DB 조회 결과가 재시작 후에도 영원히 남지 않도록 max_age 를 항상 같이 적용한다
+	"""
+
+	def __init__(self, root: Path, max_age: float | None = DISK_MAX_AGE):
+		self.root = Path(root)
+		self.max_age = max_age
+
+	def _path(self, key: str) -> Path:
+		name, _, _ = key.partition(":")
+		return self.root / name / f"{hashlib.sha1(key.encode()).hexdigest()}.pkl"
+
+	def get(self, key, ttl: float | None = None):
+		path = self._path(key)
+		limits = [t for t in (ttl, self.max_age) if t is not None]
+		try:
+			if limits and time.time() - path.stat().st_mtime > min(limits):
+				return _MISSING
+			with open(path, "rb") as f:
+				return pickle.load(f)
+		except FileNotFoundError:
+			return _MISSING
+		except Exception as e:
+			print(f"[WARN] 디스크 캐시 읽기 실패 ({path}): {e}")
+			return _MISSING
+
+	def set(self, key, value):
+		path = self._path(key)
+		path.parent.mkdir(parents=True, exist_ok=True)
+
+		# 임시 파일에 쓴 뒤 교체 (다른 프로세스가 반쯤 쓴 파일을 읽지 않도록)
+		tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+		try:
+			with open(tmp_path, "wb") as f:
+				pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+			os.replace(tmp_path, path)
+		except Exception as e:
+			tmp_path.unlink(missing_ok=True)
+			print(f"[WARN] 디스크 캐시 저장 실패 ({path}): {e}")
+
+	def clear(self, prefix: str | None = None):
+		target = self.root / prefix.partition(":")[0] if prefix else self.root
+		if not target.exists():
+			return
+		for path in target.rglob("*.pkl"):
+			path.unlink(missing_ok=True)
+
+
+class TieredCache:
+	"""메모리 → (있으면) 디스크 순서로 찾고, 디스크에서 찾으면 메모리에도 올린다"""
+
+	def __init__(self, memory: MemoryLRU, disk: DiskCache | None = None):
+		self.memory = memory
+		self.disk = disk
+
+	def get(self, key, ttl: float | None = None):
+		value = self.memory.get(key, ttl)
+		if value is not _MISSING or self.disk is None:
+			return value
+
+		value = self.disk.get(key, ttl)
+		if value is not _MISSING:
+			self.memory.set(key, value)
+		return value
+
+	def set(self, key, value, persist: bool = True):
+		self.memory.set(key, value)
+		if persist and self.disk is not None:
+			self.disk.set(key, value)
+
+	def clear(self, prefix: str | None = None):
+		self.memory.clear(prefix)
+		if self.disk is not None:
+			self.disk.clear(prefix)
+
+
+_CACHE = TieredCache(MemoryLRU(), DiskCache(DATA_CACHE_DIR) if DATA_CACHE_DIR else None)
+
+
+def configure_cache(
+	max_items: int | None = None,
+	disk_dir: str | Path | None = None,
+	cache: TieredCache | None = None,
+):
+	"""
+	캐시 백엔드 교체.
+	- cache: 직접 만든 TieredCache (테스트 / 다른 저장소)
+	- 아니면 max_items / disk_dir 로 기본 메모리 LRU + 디스크 구성
+	"""
+	global _CACHE
+	if cache is None:
+		cache = TieredCache(
+			MemoryLRU(max_items or MEMORY_MAX_ITEMS),
+			DiskCache(disk_dir) if disk_dir else None,
+		)
+	_CACHE = cache
+
+
+def get_cache() -> TieredCache:
+	return _CACHE
+
+
+def _make_key(name: str, args, kwargs) -> str:
+	return f"{name}:{args!r}:{sorted(kwargs.items())!r}"
+
+
+def _copy_out(value):
+	if isinstance(value, (pd.DataFrame, pd.Series)):
+		return value.copy()
+	return value
+
+
+def cache_data(func=None, *, ttl: float | None = None, persist: bool = True):
+	"""
+	인자 값 기준 결과 캐시. 인자는 repr 로 key 를 만들 수 있는 값(숫자 / 문자열 / tuple 등)이어야 한다.
+
+	- ttl: 초 단위 유효 기간 (None 이면 clear 전까지 유지)
+	- persist: 디스크 단계가 켜져 있을 때 디스크에도 저장할지
+	- func.clear(): 이 함수의 캐시만 비우기
+	"""
+	def decorator(fn):
+		name = f"{fn.__module__}.{fn.__qualname__}"
+
+		@functools.wraps(fn)
+		def wrapper(*args, **kwargs):
+			key = _make_key(name, args, kwargs)
+			value = _CACHE.get(key, ttl)
+			if value is _MISSING:
+				value = fn(*args, **kwargs)
+				_CACHE.set(key, value, persist=persist)
+			return _copy_out(value)
+
+		wrapper.clear = lambda: _CACHE.clear(f"{name}:")
+		return wrapper
+
+	return decorator(func) if func is not None else decorator
+
+
+def cache_resource(fn):
+	"""프로세스당 1개만 만드는 객체 (인자 없는 팩토리용). 메모리에만 두고 복사하지 않는다"""
+	lock = threading.Lock()
+	holder = {}
+
+	@functools.wraps(fn)
+	def wrapper():
+		if "value" not in holder:
+			with lock:
+				if "value" not in holder:
+					holder["value"] = fn()
+		return holder["value"]
+
+	wrapper.clear = holder.clear
+	return wrapper
@@ -1,10 +1,16 @@
 # data_loader.py
+# DB / 스냅샷 로딩 (Streamlit 없이 배치 / 워커 프로세스에서도 그대로 쓰는 순수 Python 코어)
+# 캐시는 cache.py (메모리 LRU + 선택 디스크), 화면 쪽 처리는 streamlit_adapter.py
 
+import json
 import os
+from pathlib import Path
+
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import bindparam, create_engine, text
 from dotenv import load_dotenv
-import streamlit as st
+
+from cache import cache_data, cache_resource
 
 load_dotenv()
 
@@ -14,7 +20,7 @@ DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_NAME = os.getenv("DB_NAME")
 
-@st.cache_resource
+@cache_resource
 def get_engine():
 	db_connection_str = (
 		f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}"
@@ -24,13 +30,109 @@ def get_engine():
 	return engine
 
 
-@st.cache_data
-def load_merged_data():
-	engine = get_engine()
+# ---------------------------------------------------------------------
+# 시세 로그 로컬 스냅샷 (증분 로딩)
+#   - market_price_logs 원본을 Feather 파일로 보관
+#   - watermark(마지막으로 읽은 로그 id) 이후 row만 DB에서 가져와 뒤에 붙인다
+# ---------------------------------------------------------------------
+SNAPSHOT_DIR = Path(__file__).resolve().parent / "data" / "snapshot"
+LOGS_SNAPSHOT_FILE = "market_price_logs.feather"
+LOGS_WATERMARK_FILE = "market_price_logs.watermark.json"
 
-	df_logs = pd.read_sql("SELECT * FROM market_price_logs", engine)
-	df_items = pd.read_sql("SELECT id, name, grade, category_code FROM market_items", engine)
 
+def _read_snapshot(snapshot_dir: Path):
+	"""스냅샷 + watermark 읽기. 없거나 깨졌으면 (None, None)"""
+	data_path = snapshot_dir / LOGS_SNAPSHOT_FILE
+	meta_path = snapshot_dir / LOGS_WATERMARK_FILE
+
+	if not data_path.exists() or not meta_path.exists():
+		return None, None
+
+	try:
+		watermark = json.loads(meta_path.read_text())
+		df_logs = pd.read_feather(data_path)
+	except Exception as e:
+		print(f"[WARN] 시세 스냅샷 읽기 실패, 전체 다시 로드합니다: {e}")
+		return None, None
+
+	if len(df_logs) != watermark.get("rows"):
+		return None, None
+
+	return df_logs, watermark
+
+
+def _write_snapshot(snapshot_dir: Path, df_logs: pd.DataFrame):
+	"""임시 파일에 쓴 뒤 교체 (동시에 읽는 세션이 반쯤 쓴 파일을 보지 않도록)"""
+	snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+	data_path = snapshot_dir / LOGS_SNAPSHOT_FILE
+	meta_path = snapshot_dir / LOGS_WATERMARK_FILE
+
+	tmp_data = data_path.with_suffix(f".{os.getpid()}.tmp")
+	df_logs.reset_index(drop=True).to_feather(tmp_data)
+	os.replace(tmp_data, data_path)
+
+	watermark = {
+		"max_id": int(df_logs["id"].max()) if len(df_logs) else 0,
+		"max_logged_at": str(df_logs["logged_at"].max()) if len(df_logs) else None,
+		"rows": len(df_logs),
+	}
+	tmp_meta = meta_path.with_suffix(f".{os.getpid()}.tmp")
+	tmp_meta.write_text(json.dumps(watermark))
+	os.replace(tmp_meta, meta_path)
+
+
+def _append_sorted(df_old: pd.DataFrame, df_new: pd.DataFrame, key: str = "logged_at") -> pd.DataFrame:
+	"""
+	logged_at 기준으로 정렬된 df_old 뒤에 df_new를 붙인다.
+	신규 row 중 가장 이른 시각 이후 구간(tail)만 다시 정렬한다.
+	"""
+	df_new = df_new.sort_values(key, kind="stable")
+
+	if df_old is None or df_old.empty:
+		return df_new.reset_index(drop=True)
+
+	pos = int(df_old[key].searchsorted(df_new[key].iloc[0], side="right"))
+	tail = pd.concat([df_old.iloc[pos:], df_new]).sort_values(key, kind="stable")
+
+	return pd.concat([df_old.iloc[:pos], tail], ignore_index=True)
+
+
+def sync_price_logs(engine, snapshot_dir: Path = SNAPSHOT_DIR) -> pd.DataFrame:
+	"""
+	로컬 스냅샷을 DB와 동기화하고 market_price_logs 전체(logged_at 정렬)를 반환.
+
+	- 스냅샷이 없으면 전체 SELECT 후 스냅샷 생성
+	- 있으면 id > watermark 인 row만 SELECT 해서 뒤에 붙임
+	"""
+	df_old, watermark = _read_snapshot(snapshot_dir)
+
+	if df_old is None:
+		query = text("SELECT * FROM market_price_logs")
+		params = {}
+	else:
+		query = text("SELECT * FROM market_price_logs WHERE id > :last_id")
+		params = {"last_id": watermark["max_id"]}
+
+	with engine.connect() as conn:
+		df_new = pd.read_sql(query, conn, params=params)
+
+	if df_old is not None and df_new.empty:
+		return df_old
+
+	df_new["logged_at"] = pd.to_datetime(df_new["logged_at"])
+	df_logs = _append_sorted(df_old, df_new)
+
+	try:
+		_write_snapshot(snapshot_dir, df_logs)
+	except Exception as e:
+		print(f"[WARN] 시세 스냅샷 저장 실패: {e}")
+
+	return df_logs
+
+
+def merge_price_logs(df_logs: pd.DataFrame, df_items: pd.DataFrame) -> pd.DataFrame:
+	"""시세 로그 + 아이템 메타 결합 (date / price 컬럼명으로 정리)"""
 	df_merged = pd.merge(
 		df_logs,
 		df_items,
@@ -46,12 +148,97 @@ def load_merged_data():
 	})
 
 	df_final["date"] = pd.to_datetime(df_final["date"])
-	df_final = df_final.sort_values("date")
+	if not df_final["date"].is_monotonic_increasing:
+		df_final = df_final.sort_values("date", kind="stable")
 
 	return df_final
 
 
-@st.cache_data
+@cache_data
+def load_merged_data():
+	engine = get_engine()
+
+	df_logs = sync_price_logs(engine)
+	df_items = pd.read_sql("SELECT id, name, grade, category_code FROM market_items", engine)
+
+	return merge_price_logs(df_logs, df_items)
+
+
+# ---------------------------------------------------------------------
+# 2단 로딩 (대시보드용)
+#   1) 위젯용 아이템 카탈로그: market_items 만 조회 (가벼움)
+#   2) 선택한 아이템의 시세 로그: item_id / 기간 조건으로 DB에서 바로 필터링
+# ---------------------------------------------------------------------
+def query_item_catalog(engine) -> pd.DataFrame:
+	return pd.read_sql(
+		text("SELECT id AS item_id, name, grade, category_code FROM market_items"),
+		engine,
+	)
+
+
+def query_item_history(
+	engine,
+	item_ids,
+	start=None,
+	end=None,
+) -> pd.DataFrame:
+	"""
+	지정한 아이템들의 시세 로그만 조회 (load_merged_data 와 같은 컬럼 구성).
+
+	- item_ids: 조회할 item_id 목록
+	- start / end: logged_at 기간 조건 (start 이상, end 미만, None 이면 제한 없음)
+	"""
+	item_ids = [int(i) for i in item_ids]
+	if len(item_ids) == 0:
+		return pd.DataFrame(columns=["item_id", "price", "date", "name", "grade", "category_code"])
+
+	conditions = ["l.item_id IN :item_ids"]
+	params = {"item_ids": item_ids}
+
+	if start is not None:
+		conditions.append("l.logged_at >= :start")
+		params["start"] = pd.Timestamp(start).to_pydatetime()
+	if end is not None:
+		conditions.append("l.logged_at < :end")
+		params["end"] = pd.Timestamp(end).to_pydatetime()
+
+	query = text(f"""
+		SELECT
+			l.*,
+			i.name,
+			i.grade,
+			i.category_code
+		FROM market_price_logs l
+		JOIN market_items i
+			ON l.item_id = i.id
+		WHERE {" AND ".join(conditions)}
+		ORDER BY l.logged_at
+	""").bindparams(bindparam("item_ids", expanding=True))
+
+	with engine.connect() as conn:
+		df = pd.read_sql(query, conn, params=params)
+
+	df = df.drop(columns=["id"])
+	df = df.rename(columns={
+		"current_min_price": "price",
+		"logged_at": "date"
+	})
+	df["date"] = pd.to_datetime(df["date"])
+
+	return df
+
+
+@cache_data
+def load_item_catalog():
+	return query_item_catalog(get_engine())
+
+
+@cache_data
+def load_item_history(item_ids: tuple[int, ...], start=None, end=None):
+	return query_item_history(get_engine(), item_ids, start=start, end=end)
+
+
+@cache_data
 def load_gpt_scores():
 	engine = get_engine()
 
@@ -72,8 +259,11 @@ def load_gpt_scores():
 	except Exception as e:
 		# 테이블이 아직 없거나 권한 문제일 수도 있으니,
 		# 일단 앱이 죽지 않도록 빈 DF를 리턴한다.
-		st.warning(f"GPT 점수 로딩 중 오류가 발생해서 GPT feature를 비활성화합니다. 상세: {e}")
-		return pd.DataFrame(columns=["item_id", "notice_date", "gpt_score"])
+		# (화면 경고는 streamlit_adapter 가 attrs["error"] 를 보고 띄운다)
+		print(f"[WARN] GPT 점수 로딩 실패 → GPT feature 비활성화: {e}")
+		df_gpt = pd.DataFrame(columns=["item_id", "notice_date", "gpt_score"])
+		df_gpt.attrs["error"] = str(e)
+		return df_gpt
 
 	df_gpt["notice_date"] = pd.to_datetime(df_gpt["notice_date"])
 	return df_gpt
@@ -0,0 +1,215 @@
+# feature_store.py
+# 아이템별 df_ml (30분봉 feature) 디스크 저장소
+#
+#   data/feature_store/
+#     item_id=123/
+#       features.parquet    # build_item_ml_dataset() 결과 (date 정렬)
+#       _meta.json          # watermark / feature 목록 / GPT 점수 해시 등
+#
+# - watermark: 이 시각까지의 봉은 새 데이터가 들어와도 값이 바뀌지 않는 "확정" 구간
+#   (centered 이상치 정제 window 의 오른쪽 절반 + 미완성 30분봉은 확정이 아님)
+# - refresh 시 watermark 이후 봉만 다시 계산한다.
+#   lag_24h(48봉) + 이상치 정제 window(48봉) 만큼 look-back 을 붙여서 계산하므로
+#   전체를 처음부터 다시 만든 것과 같은 값이 나온다.
+# - 결측 / 이상치 봉은 양옆 정상 봉 사이 선형 보간이라, watermark 와 look-back 기준은
+#   정상 봉(원본 로그가 있고 정제로 바뀌지 않은 봉)에 맞춘다 (긴 공백이 경계에 걸쳐도 값이 같도록)
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline import POINTS_PER_DAY, build_item_ml_dataset
+
+
+STORE_VERSION = 2
+
+BASE_DIR = Path(__file__).resolve().parent
+FEATURE_STORE_DIR = BASE_DIR / "data" / "feature_store"
+
+BAR = pd.Timedelta(minutes=30)
+UNSTABLE_BARS = POINTS_PER_DAY // 2 + 1		# 정제 window 오른쪽 절반 + 진행 중인 봉
+LAG_BARS = POINTS_PER_DAY					# lag_24h
+CLEAN_WINDOW_BARS = POINTS_PER_DAY			# 이상치 정제 window
+
+
+def _gpt_signature(df_gpt_item: pd.DataFrame | None) -> str:
+	"""공지 점수가 바뀌면 과거 봉 값도 바뀌므로, 변경 감지용 해시"""
+	if df_gpt_item is None or df_gpt_item.empty:
+		return "none"
+
+	cols = [c for c in ("notice_date", "gpt_score") if c in df_gpt_item.columns]
+	hashed = pd.util.hash_pandas_object(df_gpt_item[cols], index=False)
+	return f"{len(df_gpt_item)}-{int(hashed.sum()) & 0xFFFFFFFFFFFF:x}"
+
+
+def _stable_bounds(df_ml: pd.DataFrame, df_target: pd.DataFrame):
+	"""
+	(watermark, history_start) 계산.
+
+	- watermark: 마지막 UNSTABLE_BARS 개 봉 앞의 마지막 정상 봉
+	  (보간된 봉에 두면 오른쪽 정상 봉이 나중에 바뀔 때 이미 저장한 값이 달라진다)
+	- history_start: watermark 이후 봉의 lag_24h 가 보는 구간 앞의 마지막 정상 봉에서
+	  정제 window 만큼 더 앞 (그 정상 봉의 이상치 판정 / 보간 기준이 전체 재계산과 같아진다)
+	정상 봉을 df_target 안에서 찾지 못하면 (None, None) → 다음 refresh 는 전체 재계산
+	"""
+	if len(df_ml) <= UNSTABLE_BARS:
+		return None, None
+
+	raw = df_target.set_index("date")["price"].resample("30min").mean()
+	dates = df_ml["date"]
+	good = df_ml["price"].to_numpy() == raw.reindex(dates).to_numpy()
+	good[len(df_ml) - UNSTABLE_BARS:] = False
+
+	wm_pos = np.flatnonzero(good)
+	if len(wm_pos) == 0:
+		return None, None
+	watermark = dates.iloc[wm_pos[-1]]
+
+	anchor_pos = np.flatnonzero(good & (dates <= watermark - LAG_BARS * BAR).to_numpy())
+	if len(anchor_pos) == 0:
+		return None, None
+	history_start = dates.iloc[anchor_pos[-1]] - CLEAN_WINDOW_BARS * BAR
+
+	return watermark, history_start
+
+
+class FeatureStore:
+	def __init__(self, root: Path = FEATURE_STORE_DIR):
+		self.root = Path(root)
+
+	# -----------------------------------------------------
+	# 경로 / 메타
+	# -----------------------------------------------------
+	def _item_dir(self, item_id: int) -> Path:
+		return self.root / f"item_id={int(item_id)}"
+
+	def _read_meta(self, item_id: int) -> dict | None:
+		path = self._item_dir(item_id) / "_meta.json"
+		if not path.exists():
+			return None
+		try:
+			meta = json.loads(path.read_text())
+		except Exception:
+			return None
+		if meta.get("version") != STORE_VERSION:
+			return None
+		return meta
+
+	def watermark(self, item_id: int) -> pd.Timestamp | None:
+		meta = self._read_meta(item_id)
+		if meta is None or meta.get("watermark") is None:
+			return None
+		return pd.Timestamp(meta["watermark"])
+
+	def history_start(self, item_id: int, df_gpt_item: pd.DataFrame | None = None) -> pd.Timestamp | None:
+		"""
+		refresh 에 필요한 원본(10분) 로그 시작 시각.
+		저장된 게 없거나 GPT 점수가 바뀌었으면 None (= 전체 히스토리 필요)
+		"""
+		meta = self._read_meta(item_id)
+		if meta is None or meta.get("watermark") is None:
+			return None
+		if df_gpt_item is not None and meta.get("gpt_signature") != _gpt_signature(df_gpt_item):
+			return None
+
+		return pd.Timestamp(meta["history_start"])
+
+	# -----------------------------------------------------
+	# 읽기 / 쓰기
+	# -----------------------------------------------------
+	def read(self, item_id: int):
+		"""저장된 (df_ml, features) 반환. 없으면 None"""
+		meta = self._read_meta(item_id)
+		path = self._item_dir(item_id) / "features.parquet"
+		if meta is None or not path.exists():
+			return None
+
+		df_ml = pd.read_parquet(path)
+		return df_ml, meta["features"]
+
+	def _write(self, item_id: int, df_ml: pd.DataFrame, features: list[str], meta: dict):
+		item_dir = self._item_dir(item_id)
+		item_dir.mkdir(parents=True, exist_ok=True)
+
+		data_path = item_dir / "features.parquet"
+		tmp_data = item_dir / f"features.{os.getpid()}.tmp"
+		df_ml.to_parquet(tmp_data, index=False)
+		os.replace(tmp_data, data_path)
+
+		meta_path = item_dir / "_meta.json"
+		tmp_meta = item_dir / f"_meta.{os.getpid()}.tmp"
+		tmp_meta.write_text(json.dumps({**meta, "version": STORE_VERSION, "features": features}))
+		os.replace(tmp_meta, meta_path)
+
+	# -----------------------------------------------------
+	# 증분 갱신
+	# -----------------------------------------------------
+	def refresh(self, item_id: int, df_target: pd.DataFrame, df_gpt_item: pd.DataFrame | None):
+		"""
+		원본 로그(df_target, 10분)로 저장소를 갱신하고 최신 (df_ml, features) 반환.
+
+		- df_target 은 전체 히스토리여도 되고, history_start(item_id) 이후만 있어도 된다
+		- 저장된 게 없거나 GPT 점수가 바뀌었으면 전체 재계산
+		  (이 경우 df_target 은 전체 히스토리여야 한다)
+		"""
+		df_target = df_target.sort_values("date")
+		last_log = pd.Timestamp(df_target["date"].max())
+		gpt_sig = _gpt_signature(df_gpt_item)
+
+		meta = self._read_meta(item_id)
+		stored = self.read(item_id) if meta is not None else None
+
+		incremental = (
+			stored is not None
+			and meta.get("gpt_signature") == gpt_sig
+			and meta.get("watermark") is not None
+		)
+
+		if incremental:
+			df_stored, features = stored
+
+			# 새 로그가 없으면 저장된 그대로
+			if last_log <= pd.Timestamp(meta["last_log"]):
+				return df_stored, features
+
+			wm = pd.Timestamp(meta["watermark"])
+
+			# watermark 이전 look-back 구간부터만 다시 계산 (30분 경계에서 자르므로 봉 값은 동일)
+			df_recent = df_target[df_target["date"] >= self.history_start(item_id)]
+			df_new, features = build_item_ml_dataset(df_recent, df_gpt_item)
+
+			df_ml = pd.concat(
+				[
+					df_stored[df_stored["date"] <= wm],
+					df_new[df_new["date"] > wm],
+				],
+				ignore_index=True,
+			)
+
+		if not incremental:
+			df_ml, features = build_item_ml_dataset(df_target, df_gpt_item)
+			df_ml = df_ml.reset_index(drop=True)
+
+		# 마지막 UNSTABLE_BARS 개 봉(+ 그 앞의 보간 봉)은 다음 refresh 때 다시 계산
+		watermark, history_start = _stable_bounds(df_ml, df_recent if incremental else df_target)
+
+		try:
+			self._write(
+				item_id,
+				df_ml,
+				features,
+				{
+					"watermark": None if watermark is None else str(watermark),
+					"history_start": None if history_start is None else str(history_start),
+					"last_log": str(last_log),
+					"gpt_signature": gpt_sig,
+					"rows": len(df_ml),
+				},
+			)
+		except Exception as e:
+			print(f"[WARN] feature store 저장 실패 (item {item_id}): {e}")
+
+		return df_ml, features
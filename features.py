@@ -1,6 +1,9 @@
 # features.py
 # 30분 기준 Feature Engineering
 
+from collections import deque
+
+import numpy as np
 import pandas as pd
 
 
@@ -24,6 +27,13 @@ def filter_item(df_final: pd.DataFrame, target_keyword: str, target_grade: str |
 # --------------------------------------------------
 # Technical Indicators
 # --------------------------------------------------
+# 기존 10분 기준:
+# RSI 14 ≈ 2.3시간 → 30분 기준 ≈ 5
+# BB  20 ≈ 3.3시간 → 30분 기준 ≈ 7
+RSI_WINDOW = 5
+BB_WINDOW = 7
+
+
 def calculate_rsi(series: pd.Series, window: int):
 	delta = series.diff()
 	gain = delta.clip(lower=0).rolling(window=window).mean()
@@ -38,6 +48,113 @@ def calculate_bollinger(series: pd.Series, window: int):
 	return sma + (std * 2), sma - (std * 2)
 
 
+# --------------------------------------------------
+# Incremental Indicators (미래 예측 roll-out 용, 스텝당 O(1))
+# --------------------------------------------------
+class IncrementalRSI:
+	"""
+	calculate_rsi 와 같은 값을 가격 1개씩 받아가며 계산.
+	최근 window 개 상승폭/하락폭의 running sum 만 유지한다.
+	"""
+
+	def __init__(self, window: int = RSI_WINDOW):
+		self.window = window
+		self.gains = deque()
+		self.losses = deque()
+		self.gain_sum = 0.0
+		self.loss_sum = 0.0
+		self.prev_price = None
+
+	def seed(self, prices):
+		"""히스토리의 마지막 window+1 개 가격으로 초기 상태 구성"""
+		for price in list(prices)[-(self.window + 1):]:
+			self.update(price)
+		return self
+
+	def update(self, price: float) -> float:
+		price = float(price)
+
+		if self.prev_price is not None:
+			delta = price - self.prev_price
+			gain = max(delta, 0.0)
+			loss = max(-delta, 0.0)
+
+			self.gains.append(gain)
+			self.losses.append(loss)
+			self.gain_sum += gain
+			self.loss_sum += loss
+
+			if len(self.gains) > self.window:
+				self.gain_sum -= self.gains.popleft()
+				self.loss_sum -= self.losses.popleft()
+
+		self.prev_price = price
+		return self.value
+
+	@property
+	def value(self) -> float:
+		if len(self.gains) < self.window:
+			return np.nan
+
+		gain = max(self.gain_sum, 0.0) / self.window
+		loss = max(self.loss_sum, 0.0) / self.window
+
+		# pandas 와 동일하게: loss=0 → 100, gain=loss=0 → NaN
+		if loss == 0.0:
+			return 100.0 if gain > 0.0 else np.nan
+		return 100 - (100 / (1 + gain / loss))
+
+
+class IncrementalBollinger:
+	"""
+	calculate_bollinger 와 같은 (upper, lower)를 가격 1개씩 받아가며 계산.
+	최근 window 개 가격의 합 / 제곱합만 유지한다.
+	(가격 단위가 커서 생기는 오차를 줄이려고 첫 가격 기준으로 평행이동해서 누적)
+	"""
+
+	def __init__(self, window: int = BB_WINDOW):
+		self.window = window
+		self.values = deque()
+		self.shift = None
+		self.total = 0.0
+		self.total_sq = 0.0
+
+	def seed(self, prices):
+		"""히스토리의 마지막 window 개 가격으로 초기 상태 구성"""
+		for price in list(prices)[-self.window:]:
+			self.update(price)
+		return self
+
+	def update(self, price: float) -> tuple[float, float]:
+		price = float(price)
+		if self.shift is None:
+			self.shift = price
+
+		x = price - self.shift
+		self.values.append(x)
+		self.total += x
+		self.total_sq += x * x
+
+		if len(self.values) > self.window:
+			old = self.values.popleft()
+			self.total -= old
+			self.total_sq -= old * old
+
+		return self.value
+
+	@property
+	def value(self) -> tuple[float, float]:
+		n = len(self.values)
+		if n < self.window:
+			return np.nan, np.nan
+
+		mean = self.total / n
+		var = max((self.total_sq - n * mean * mean) / (n - 1), 0.0)
+		std = np.sqrt(var)
+		sma = mean + self.shift
+		return sma + (std * 2), sma - (std * 2)
+
+
 # --------------------------------------------------
 # Main Feature Generator (30분 기준)
 # --------------------------------------------------
@@ -55,14 +172,12 @@ def make_ml_dataset(df_target: pd.DataFrame):
 	# ==================================================
 	# 2️⃣ RSI / Bollinger (시간 의미 보존)
 	# ==================================================
-	# 기존 10분 기준:
-	# RSI 14 ≈ 2.3시간 → 30분 기준 ≈ 5
-	# BB  20 ≈ 3.3시간 → 30분 기준 ≈ 7
+	# 윈도우 크기는 상단 RSI_WINDOW / BB_WINDOW 참고
 
-	df_ml["rsi"] = calculate_rsi(df_ml["price"], window=5)
+	df_ml["rsi"] = calculate_rsi(df_ml["price"], window=RSI_WINDOW)
 	df_ml["bb_upper"], df_ml["bb_lower"] = calculate_bollinger(
 		df_ml["price"],
-		window=7
+		window=BB_WINDOW
 	)
 
 	# ==================================================
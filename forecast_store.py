@@ -0,0 +1,289 @@
+# forecast_store.py
+# 사전 계산된 앙상블 예측 결과 저장소 (SQLite 파일 1개)
+#
+#   data/forecast_store.sqlite
+#     forecasts(item_id, generated_at) → data_until / steps / 가중치 / 지표 / 예측 / 검증 예측
+#
+# - precompute_service.py (또는 batch_forecast.py --store) 가 데이터 갱신 후 아이템별로 쓰고,
+#   대시보드는 latest() 로 가장 최근 결과를 바로 읽는다 (없거나 오래됐으면 그 자리에서 계산)
+# - 예측 / 검증 DataFrame 은 Parquet bytes 로 BLOB 컬럼에 넣는다 (행 단위 테이블보다 읽기 1번으로 끝남)
+# - WAL 모드라 워커가 쓰는 중에도 대시보드 세션들이 같이 읽을 수 있다
+# - 경로는 환경변수 FORECAST_STORE_PATH 로 바꿀 수 있다
+
+import io
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+BASE_DIR = Path(__file__).resolve().parent
+FORECAST_STORE_PATH = Path(os.getenv("FORECAST_STORE_PATH", BASE_DIR / "data" / "forecast_store.sqlite"))
+
+KEEP_RUNS = 3		# 아이템별로 남겨둘 최근 결과 수
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS forecasts (
+	item_id      INTEGER NOT NULL,
+	generated_at TEXT    NOT NULL,
+	data_until   TEXT    NOT NULL,
+	steps        INTEGER NOT NULL,
+	model_keys   TEXT    NOT NULL,
+	weights      TEXT    NOT NULL,
+	metrics      TEXT    NOT NULL,
+	timings      TEXT,
+	forecast     BLOB    NOT NULL,
+	validation   BLOB,
+	PRIMARY KEY (item_id, generated_at)
+)
+"""
+
+
+def _to_blob(df: pd.DataFrame | None) -> bytes | None:
+	if df is None:
+		return None
+	buf = io.BytesIO()
+	df.to_parquet(buf, index=False)
+	return buf.getvalue()
+
+
+def _from_blob(blob: bytes | None) -> pd.DataFrame | None:
+	if blob is None:
+		return None
+	return pd.read_parquet(io.BytesIO(blob))
+
+
+def _metrics(y_true: np.ndarray, y_pred: np.ndarray) -> dict:
+	"""검증 구간 RMSE / R² (sklearn 없이, 대시보드 읽기 경로에서 import 비용을 내지 않도록)"""
+	if len(y_true) == 0:
+		return {"rmse": None, "r2": None}
+
+	err = y_true - y_pred
+	ss_tot = float(((y_true - y_true.mean()) ** 2).sum())
+	return {
+		"rmse": float(np.sqrt(np.mean(err ** 2))),
+		"r2": 1.0 - float((err ** 2).sum()) / ss_tot if ss_tot > 0 else None,
+	}
+
+
+def ensemble_record(ensemble_model, future_df: pd.DataFrame) -> dict:
+	"""
+	학습 + predict_future 가 끝난 EnsemblePriceModel → put() 에 넘길 결과 dict.
+
+	validation: 앙상블 + 멤버별 검증 구간 예측 (long format: model_key, date, actual, pred)
+	→ 대시보드가 검증 모델을 바꿔도 다시 계산하지 않고 같은 결과에서 꺼내 쓴다
+	"""
+	from models.ensemble import _validation_frame
+
+	df = ensemble_model.df
+	price = df["price"].to_numpy(dtype=float)
+	date_index = pd.Index(df["date"])
+
+	frames = {}
+	if ensemble_model.y_pred is not None and len(ensemble_model.y_pred) > 0:
+		frames["ensemble"] = pd.DataFrame({
+			"date": df["date"].to_numpy()[-len(ensemble_model.y_pred):],
+			"price": np.asarray(ensemble_model.y_pred, dtype=float),
+		})
+	for key in ensemble_model.model_keys:
+		frame = _validation_frame(ensemble_model.members[key])
+		if frame is not None:
+			frames[key] = frame
+
+	parts = []
+	metrics = {}
+	for key, frame in frames.items():
+		pos = date_index.get_indexer(frame["date"])
+		frame = frame[pos >= 0]
+		actual = price[pos[pos >= 0]]
+		pred = frame["price"].to_numpy(dtype=float)
+
+		parts.append(pd.DataFrame({
+			"model_key": key,
+			"date": frame["date"].to_numpy(),
+			"actual": actual,
+			"pred": pred,
+		}))
+		metrics[key] = _metrics(actual, pred)
+
+	# 앙상블 지표는 모델이 계산한 값을 그대로 쓴다 (검증 구간 정렬 기준이 같음)
+	if "ensemble" in metrics:
+		metrics["ensemble"] = {"rmse": ensemble_model.rmse, "r2": ensemble_model.r2}
+
+	return {
+		"data_until": df["date"].iloc[-1],
+		"model_keys": list(ensemble_model.model_keys),
+		"weights": dict(ensemble_model.weights),
+		"metrics": metrics,
+		"timings": ensemble_model.timings,
+		"forecast": future_df,
+		"validation": pd.concat(parts, ignore_index=True) if parts else None,
+	}
+
+
+class ForecastStore:
+	def __init__(self, path: Path = FORECAST_STORE_PATH):
+		self.path = Path(path)
+		self._ready = False
+
+	def _connect(self) -> sqlite3.Connection:
+		conn = sqlite3.connect(self.path, timeout=30)
+		if not self._ready:
+			self.path.parent.mkdir(parents=True, exist_ok=True)
+			conn.execute("PRAGMA journal_mode=WAL")
+			conn.execute(_SCHEMA)
+			conn.commit()
+			self._ready = True
+		return conn
+
+	# -----------------------------------------------------
+	# 쓰기
+	# -----------------------------------------------------
+	def put(self, item_id: int, record: dict, generated_at: pd.Timestamp | None = None, keep: int = KEEP_RUNS):
+		"""
+		결과 1건 저장 (record: ensemble_record() 결과).
+		같은 아이템의 결과는 최근 keep 건만 남긴다.
+		"""
+		generated_at = pd.Timestamp(generated_at if generated_at is not None else pd.Timestamp.now())
+		forecast = record["forecast"]
+
+		row = (
+			int(item_id),
+			generated_at.isoformat(),
+			pd.Timestamp(record["data_until"]).isoformat(),
+			len(forecast),
+			json.dumps(record["model_keys"]),
+			json.dumps(record["weights"]),
+			json.dumps(record["metrics"]),
+			json.dumps(record.get("timings"), default=float),
+			_to_blob(forecast),
+			_to_blob(record.get("validation")),
+		)
+
+		conn = self._connect()
+		try:
+			with conn:
+				conn.execute("INSERT OR REPLACE INTO forecasts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+				if keep:
+					conn.execute(
+						"""
+						DELETE FROM forecasts
+						WHERE item_id = ? AND generated_at NOT IN (
+							SELECT generated_at FROM forecasts
+							WHERE item_id = ? ORDER BY generated_at DESC LIMIT ?
+						)
+						""",
+						(int(item_id), int(item_id), keep),
+					)
+		finally:
+			conn.close()
+
+	# -----------------------------------------------------
+	# 읽기
+	# -----------------------------------------------------
+	def latest(
+		self,
+		item_id: int,
+		min_data_until: pd.Timestamp | None = None,
+		min_steps: int = 0,
+	) -> dict | None:
+		"""
+		아이템의 가장 최근 결과. 없거나 조건에 맞지 않으면 None (→ 호출한 쪽이 직접 계산).
+
+		- min_data_until: 이 시각 이후 데이터까지 보고 만든 결과만 (새 봉이 더 들어왔으면 miss)
+		- min_steps: 예측 길이가 이보다 짧으면 miss
+
+		return: {"item_id", "generated_at", "data_until", "steps", "model_keys", "weights",
+		         "metrics", "timings", "forecast", "validation"}
+		"""
+		if not self.path.exists():
+			return None
+
+		conn = self._connect()
+		try:
+			row = conn.execute(
+				"""
+				SELECT item_id, generated_at, data_until, steps, model_keys, weights, metrics, timings, forecast, validation
+				FROM forecasts WHERE item_id = ? ORDER BY generated_at DESC LIMIT 1
+				""",
+				(int(item_id),),
+			).fetchone()
+		finally:
+			conn.close()
+
+		if row is None:
+			return None
+
+		data_until = pd.Timestamp(row[2])
+		if min_data_until is not None and data_until < pd.Timestamp(min_data_until):
+			return None
+		if row[3] < min_steps:
+			return None
+
+		return {
+			"item_id": row[0],
+			"generated_at": pd.Timestamp(row[1]),
+			"data_until": data_until,
+			"steps": row[3],
+			"model_keys": json.loads(row[4]),
+			"weights": json.loads(row[5]),
+			"metrics": json.loads(row[6]),
+			"timings": json.loads(row[7]) if row[7] else None,
+			"forecast": _from_blob(row[8]),
+			"validation": _from_blob(row[9]),
+		}
+
+	def entries(self) -> pd.DataFrame:
+		"""결과 목록 (BLOB 제외). columns: item_id, generated_at, data_until, steps, model_keys"""
+		if not self.path.exists():
+			return pd.DataFrame(columns=["item_id", "generated_at", "data_until", "steps", "model_keys"])
+
+		conn = self._connect()
+		try:
+			df = pd.read_sql_query(
+				"SELECT item_id, generated_at, data_until, steps, model_keys FROM forecasts ORDER BY item_id, generated_at",
+				conn,
+			)
+		finally:
+			conn.close()
+
+		df["generated_at"] = pd.to_datetime(df["generated_at"])
+		df["data_until"] = pd.to_datetime(df["data_until"])
+		return df
+
+	def clear(self) -> int:
+		"""모든 결과 삭제. return: 삭제 건수"""
+		if not self.path.exists():
+			return 0
+
+		conn = self._connect()
+		try:
+			with conn:
+				return conn.execute("DELETE FROM forecasts").rowcount
+		finally:
+			conn.close()
+
+
+def validation_result(record: dict, model_key: str):
+	"""
+	저장된 결과에서 검증 모델 1개의 (y_test, y_pred, rmse, r2) 꺼내기.
+	해당 모델의 검증 예측이 없으면 None.
+	"""
+	df_val = record.get("validation")
+	if df_val is None or model_key not in record["metrics"]:
+		return None
+
+	df_key = df_val[df_val["model_key"] == model_key]
+	if df_key.empty:
+		return None
+
+	metrics = record["metrics"][model_key]
+	return (
+		pd.Series(df_key["actual"].to_numpy()),
+		df_key["pred"].to_numpy(),
+		metrics["rmse"],
+		metrics["r2"],
+	)
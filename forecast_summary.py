@@ -0,0 +1,176 @@
+# forecast_summary.py
+# AI 조언 프롬프트용 예측 요약 (30분봉 전체 표 대신 길이가 정해진 요약 텍스트)
+#
+#   [요약]     시작 / 끝 / 최저 / 최고 (시각 포함)
+#   [전환점]   zigzag 전환점 = 의미 있는 국소 최저 / 최고 (전체 최저 / 최고는 항상 포함)
+#   [추세 구간] 전환점 사이 구간별 방향 / 변화량 / 시간당 기울기
+#   [OHLC]     1시간 → 2시간 → 4시간 → … → 7일 봉 (토큰 예산 안에 들어가는 가장 촘촘한 단위)
+#
+# - token_budget 안에 들어갈 때까지 OHLC 단위와 전환점 기준(가격 범위 대비 %)을 넓혀 가므로
+#   FORECAST_STEPS 가 늘어나도 프롬프트 길이는 예산 근처에서 멈춘다
+# - 토큰 수는 tokenizer 없이 어림한다 (ASCII 4글자 ≈ 1토큰, 한글 등 1글자 ≈ 1토큰)
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+TOKEN_BUDGET = 400
+BUCKET_FREQS = ["1h", "2h", "4h", "8h", "12h", "1D", "2D", "3D", "7D"]
+PIVOT_THRESHOLDS = [0.1, 0.2, 0.35, 0.5]		# 가격 범위(최고 - 최저) 대비 되돌림 비율
+TIME_FMT = "%m/%d %H:%M"
+OHLC_LINE_TOKENS = 9		# OHLC 1줄 추정 토큰 수 (이것만으로 예산을 넘는 단위는 그려보지 않고 건너뜀)
+
+
+def estimate_tokens(text: str) -> int:
+	n_ascii = len(text.encode("ascii", "ignore"))
+	return math.ceil(n_ascii / 4) + (len(text) - n_ascii)
+
+
+def turning_points(values: np.ndarray, threshold: float) -> list[int]:
+	"""
+	zigzag 전환점 index (처음 / 끝 / 전체 최저 / 최고 포함, 시간 순).
+	직전 전환점 이후 극값에서 threshold(가격 단위) 이상 되돌리면 그 극값을 전환점으로 확정한다.
+	"""
+	n = len(values)
+	if n == 0:
+		return []
+
+	pivots = [0]
+	direction = 0			# 1: 상승 중, -1: 하락 중, 0: 아직 모름
+	ext = 0					# 현재 진행 방향의 극값 index
+
+	for i in range(1, n):
+		v = values[i]
+		if direction == 0:
+			if abs(v - values[0]) >= threshold:
+				direction, ext = (1 if v > values[0] else -1), i
+		elif direction == 1:
+			if v >= values[ext]:
+				ext = i
+			elif values[ext] - v >= threshold:
+				pivots.append(ext)
+				direction, ext = -1, i
+		else:
+			if v <= values[ext]:
+				ext = i
+			elif v - values[ext] >= threshold:
+				pivots.append(ext)
+				direction, ext = 1, i
+
+	pivots += [ext, n - 1, int(np.argmin(values)), int(np.argmax(values))]
+	return sorted(set(pivots))
+
+
+def ohlc_buckets(dates: pd.Series, values: np.ndarray, freq: str) -> pd.DataFrame:
+	"""
+	첫 날 00:00 기준 freq 단위 OHLC (columns: date, open, high, low, close).
+	dates 는 시간 순 정렬돼 있어야 한다 (NumPy reduceat, 설정마다 다시 부르므로 resample 보다 가볍게)
+	"""
+	ns = pd.DatetimeIndex(dates).asi8
+	origin = pd.Timestamp(dates.iloc[0]).normalize().value
+	step = pd.Timedelta(freq).value
+
+	bucket = (ns - origin) // step
+	starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+	ends = np.r_[starts[1:], len(values)] - 1
+
+	return pd.DataFrame({
+		"date": pd.to_datetime(origin + bucket[starts] * step),
+		"open": values[starts],
+		"high": np.maximum.reduceat(values, starts),
+		"low": np.minimum.reduceat(values, starts),
+		"close": values[ends],
+	})
+
+
+def _fmt_price(v: float) -> str:
+	return f"{v:,.0f}"
+
+
+def _render(dates: pd.Series, t: np.ndarray, values: np.ndarray, pivots: list[int], ohlc: pd.DataFrame, freq: str) -> str:
+	"""t: dates 를 TIME_FMT 로 미리 바꾼 문자열 (설정을 바꿔 가며 여러 번 그리므로 한 번만 변환)"""
+	i_min, i_max = int(np.argmin(values)), int(np.argmax(values))
+	change = values[-1] / values[0] - 1.0 if values[0] else 0.0
+
+	lines = [
+		"[요약]",
+		f"- 시작 {_fmt_price(values[0])} G ({t[0]}) → 끝 {_fmt_price(values[-1])} G ({t[-1]}), {change:+.1%}",
+		f"- 최저 {_fmt_price(values[i_min])} G ({t[i_min]}) / 최고 {_fmt_price(values[i_max])} G ({t[i_max]})",
+		"[전환점]",
+		" → ".join(f"{t[i]} {_fmt_price(values[i])}" for i in pivots),
+		"[추세 구간] 시작~끝 | 변화 | 시간당",
+	]
+
+	hours_at = (dates - dates.iloc[0]).to_numpy() / np.timedelta64(1, "h")
+	for a, b in zip(pivots[:-1], pivots[1:]):
+		hours = hours_at[b] - hours_at[a]
+		diff = values[b] - values[a]
+		lines.append(
+			f"{t[a]}~{t[b]} | {diff:+,.0f} | {diff / hours if hours else 0.0:+,.0f}/h"
+		)
+
+	lines.append(f"[{freq} OHLC] 시각 | 시가 | 고가 | 저가 | 종가")
+	for row in ohlc.itertuples(index=False):
+		lines.append(
+			f"{row.date:{TIME_FMT}} | {_fmt_price(row.open)} | {_fmt_price(row.high)} | "
+			f"{_fmt_price(row.low)} | {_fmt_price(row.close)}"
+		)
+
+	return "\n".join(lines)
+
+
+def summarize_forecast(
+	df_forecast: pd.DataFrame,
+	token_budget: int = TOKEN_BUDGET,
+	date_col: str = "ds",
+	value_col: str = "forecast",
+) -> tuple[str, dict]:
+	"""
+	예측 시계열 → 토큰 예산 안의 요약 텍스트.
+
+	가장 촘촘한 설정(1시간 OHLC + 작은 전환점 기준)부터 시도해서 예산에 처음 들어가는 것을 쓴다.
+	어느 것도 안 들어가면 가장 성긴 설정 결과를 그대로 쓴다 (요약 / 최저 / 최고는 항상 포함).
+
+	return: (text, info)
+	  info: {"freq", "threshold", "n_pivots", "est_tokens", "min": (시각, 가격), "max": (시각, 가격)}
+	"""
+	df = df_forecast[[date_col, value_col]].dropna().sort_values(date_col)
+	dates = pd.to_datetime(df[date_col]).reset_index(drop=True)
+	values = df[value_col].to_numpy(dtype=float)
+
+	if len(values) == 0:
+		raise ValueError("요약할 예측 데이터가 없습니다.")
+
+	t = dates.dt.strftime(TIME_FMT).to_numpy()
+	price_range = float(values.max() - values.min())
+	pivots_by_ratio = {
+		ratio: turning_points(values, max(price_range * ratio, 1e-9))
+		for ratio in PIVOT_THRESHOLDS
+	}
+	text, freq, ratio, pivots = None, None, None, []
+
+	for freq in BUCKET_FREQS:
+		ohlc = ohlc_buckets(dates, values, freq)
+		if len(ohlc) * OHLC_LINE_TOKENS > token_budget and freq != BUCKET_FREQS[-1]:
+			continue
+		for ratio in PIVOT_THRESHOLDS:
+			pivots = pivots_by_ratio[ratio]
+			text = _render(dates, t, values, pivots, ohlc, freq)
+			if estimate_tokens(text) <= token_budget:
+				break
+		else:
+			continue
+		break
+
+	i_min, i_max = int(np.argmin(values)), int(np.argmax(values))
+	info = {
+		"freq": freq,
+		"threshold": ratio,
+		"n_pivots": len(pivots),
+		"est_tokens": estimate_tokens(text),
+		"min": (dates.iloc[i_min], float(values[i_min])),
+		"max": (dates.iloc[i_max], float(values[i_max])),
+	}
+	return text, info
@@ -0,0 +1,27 @@
+# migrate_models.py
+# 예전 모델 파일(trained_models/*/*.pkl, PriceModel 통째로 joblib) → artifact 디렉터리로 일괄 변환
+#
+# 사용법:
+#   python migrate_models.py
+#
+# - 변환하지 않아도 load_model() 이 처음 로드할 때 아이템별로 자동 변환하지만,
+#   배포 직후 한 번 돌려두면 첫 요청이 느려지지 않는다
+# - NeuralProphet(.pkl)은 artifact 저장을 지원하지 않아서 그대로 둔다
+
+from models.io import MODEL_DIR, migrate_legacy_models
+
+
+def main():
+	print(f"[1] 예전 모델 파일 변환 중... ({MODEL_DIR})")
+	result = migrate_legacy_models()
+
+	print(f" - 변환: {len(result['migrated'])}개")
+	print(f" - 건너뜀: {len(result['skipped'])}개")
+	for path, err in result["failed"].items():
+		print(f"   · 실패 {path}: {err}")
+
+	print("[완료] 모델 파일 변환이 끝났습니다.")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,96 @@
+# models/artifact.py
+# 모델 artifact(디렉터리) 공용 헬퍼
+#
+#   trained_models/lgbm/lgbm_item_123/
+#     meta.json          # format_version / model_key / features / split_idx / 지표 등 작은 값만
+#     booster.txt        # 모델별 native 포맷 (LGBM text, XGB UBJSON, Keras weights, ...)
+#     *.npy              # 스케일러 파라미터 / 검증 예측 같은 배열 → 로드 시 memory-map
+#
+# 학습 데이터(df_ml), 시퀀스 텐서(X_seq) 같은 "히스토리 길이에 비례하는" 값은 저장하지 않는다.
+# (로드 후 io.load_or_train_model 이 최신 df_ml 을 다시 붙인다)
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+ARTIFACT_VERSION = 1
+META_FILE = "meta.json"
+
+# 모든 PriceModel 이 공통으로 갖는 작은 상태 (io 가 meta.json 에 같이 저장)
+COMMON_META = ("features", "split_idx", "rmse", "r2")
+
+
+def to_json_value(value):
+	"""meta.json 에 쓸 수 있는 값으로 변환 (Timestamp / numpy scalar / Timedelta)"""
+	if value is None:
+		return None
+	if isinstance(value, (pd.Timestamp, np.datetime64)):
+		return pd.Timestamp(value).isoformat()
+	if isinstance(value, pd.Timedelta):
+		return value.isoformat()
+	if isinstance(value, np.generic):
+		return value.item()
+	if isinstance(value, (list, tuple)):
+		return [to_json_value(v) for v in value]
+	return value
+
+
+def write_meta(path: Path, meta: dict):
+	(Path(path) / META_FILE).write_text(
+		json.dumps({k: to_json_value(v) for k, v in meta.items()}, ensure_ascii=False, indent=1)
+	)
+
+
+def read_meta(path: Path) -> dict | None:
+	"""meta.json 읽기. 없거나 포맷 버전이 다르면 None"""
+	meta_path = Path(path) / META_FILE
+	if not meta_path.exists():
+		return None
+	try:
+		meta = json.loads(meta_path.read_text())
+	except Exception:
+		return None
+	if meta.get("format_version") != ARTIFACT_VERSION:
+		return None
+	return meta
+
+
+# ---------------------------------------------------------------------
+# 배열 (.npy, 로드 시 memory-map)
+# ---------------------------------------------------------------------
+def save_arrays(path: Path, **arrays):
+	for name, arr in arrays.items():
+		if arr is None:
+			continue
+		np.save(Path(path) / f"{name}.npy", np.asarray(arr), allow_pickle=False)
+
+
+def load_array(path: Path, name: str, mmap: bool = True) -> np.ndarray | None:
+	file = Path(path) / f"{name}.npy"
+	if not file.exists():
+		return None
+	return np.load(file, mmap_mode="r" if mmap else None, allow_pickle=False)
+
+
+# ---------------------------------------------------------------------
+# MinMaxScaler ↔ 배열
+# ---------------------------------------------------------------------
+_SCALER_ARRAYS = ("min_", "scale_", "data_min_", "data_max_", "data_range_")
+
+
+def save_scaler(path: Path, prefix: str, scaler):
+	save_arrays(path, **{f"{prefix}.{attr}": getattr(scaler, attr) for attr in _SCALER_ARRAYS})
+
+
+def load_scaler(path: Path, prefix: str, scaler):
+	"""
+	fit 된 MinMaxScaler 상태 복원 (transform / inverse_transform 에 필요한 값만).
+	작은 배열이라 memory-map 하지 않고 읽는다.
+	"""
+	for attr in _SCALER_ARRAYS:
+		setattr(scaler, attr, load_array(path, f"{prefix}.{attr}", mmap=False))
+	scaler.n_features_in_ = len(scaler.scale_)
+	return scaler
@@ -1,7 +1,30 @@
 from abc import ABC, abstractmethod
 
+import pandas as pd
+
+
+# ---------------------------------------------------------------------
+# warm-start(이어 학습) 공용 설정 - LightGBM / XGBoost
+# ---------------------------------------------------------------------
+UPDATE_TREES = 50			# update() 1회에 추가하는 트리 수
+MAX_TREES = 1500			# 이 이상 쌓이면 update 대신 전체 재학습
+MIN_UPDATE_ROWS = 48		# 새 봉이 하루치(30분봉 48개) 미만이면 update 생략
+
+
+def warm_start_rows(df: pd.DataFrame, train_watermark, split_idx: int) -> pd.DataFrame:
+	"""
+	이어 학습할 구간: train_watermark 이후 ~ split_idx 이전 (뒤 20% 는 계속 검증용으로 남긴다)
+	"""
+	df_train = df.iloc[:split_idx]
+	return df_train[df_train["date"] > pd.Timestamp(train_watermark)]
+
 
 class BasePriceModel(ABC):
+	n_jobs = -1		# 학습 / 예측 스레드 수 (-1: 전체 코어). 앙상블 runner 가 멤버 몫으로 지정한다
+
+	def set_n_jobs(self, n_jobs: int):
+		"""학습 / 예측 스레드 수 지정 (LightGBM / XGBoost 만 사용, 나머지 모델은 값만 기록)"""
+		self.n_jobs = n_jobs
 
 	@abstractmethod
 	def train(self, df, features):
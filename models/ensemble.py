@@ -0,0 +1,438 @@
+# models/ensemble.py
+# 앙상블 구성 모델(lgbm / xgb / np / lstm)을 동시에 학습/로드 + 미래 예측하는 runner
+#
+# - 멤버끼리는 서로 독립이라 ThreadPoolExecutor 로 동시에 돌린다
+#   (LightGBM / XGBoost / torch 모두 연산 중 GIL 을 놓기 때문에 스레드로 충분하고,
+#    NeuralProphet 객체는 프로세스 간에 넘기기엔 너무 크다)
+# - 멤버마다 코어 몫(thread cap)을 나눠서, n_jobs=-1 / torch 기본 스레드 수가
+#   서로 코어를 과하게 잡지 않게 한다
+#     · LightGBM / XGBoost: 모델에 n_jobs 로 직접 지정 (n_jobs=-1 은 fit 때 cpu_count 로 풀려서
+#       threadpoolctl 의 OpenMP 제한을 무시한다)
+#     · NeuralProphet: torch.set_num_threads
+# - EnsemblePriceModel: 위 runner + 가중 평균을 BasePriceModel 인터페이스로 감싼 모델
+#   (factory 에 "ensemble" 로 등록 → 대시보드 / 투자 시뮬레이션이 같은 경로 사용)
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+from .base import BasePriceModel
+
+
+ENSEMBLE_KEYS = ["lgbm", "xgb", "np", "lstm"]
+ENSEMBLE_WEIGHTS = {
+	"lgbm": 4.0,
+	"xgb": 4.5,
+	"np": 1.5,
+	"lstm": 1.0,
+}
+
+
+# ---------------------------------------------------------------------
+# 가중 평균 (NumPy stack)
+# ---------------------------------------------------------------------
+def stack_forecasts(
+	future_by_key: dict[str, pd.DataFrame | None],
+) -> tuple[list[str], pd.DatetimeIndex, np.ndarray]:
+	"""
+	모델별 예측(date, price)을 공통 날짜 index 기준으로 (n_models, n_dates) 배열 1개에 정렬.
+	예측이 없는 모델은 제외하고, 모든 모델에 있는 날짜만 남긴다.
+
+	return: (keys, dates, stack)  (예측 가능한 모델이 없으면 keys 가 빈 리스트)
+	"""
+	keys = [
+		k for k, fut in future_by_key.items()
+		if fut is not None and not fut.empty
+	]
+
+	dates = None
+	for k in keys:
+		idx = pd.DatetimeIndex(future_by_key[k]["date"])
+		dates = idx if dates is None else dates.intersection(idx)
+
+	if dates is None:
+		return [], pd.DatetimeIndex([]), np.empty((0, 0))
+
+	dates = dates.sort_values()
+	stack = np.empty((len(keys), len(dates)), dtype=float)
+	for i, k in enumerate(keys):
+		fut = future_by_key[k]
+		pos = pd.Index(fut["date"]).get_indexer(dates)
+		stack[i] = fut["price"].to_numpy(dtype=float)[pos]
+
+	return keys, dates, stack
+
+
+def weight_vector(keys: list[str], weights: dict[str, float]) -> np.ndarray:
+	"""keys 순서의 가중치 벡터 (합 1로 정규화, 가중치가 없는 모델은 0)"""
+	w = np.array([float(weights.get(k, 0.0)) for k in keys])
+	total = w.sum()
+	if total <= 0:
+		return np.full(len(keys), 1.0 / max(len(keys), 1))
+	return w / total
+
+
+def learn_weights(stack: np.ndarray, y_true: np.ndarray) -> np.ndarray | None:
+	"""
+	검증 구간 예측 stack(n_models, n_dates)으로 y_true 를 가장 잘 맞추는 비음수 가중치 (NNLS, 합 1로 정규화).
+	학습할 수 없으면(데이터 부족 / 전부 0) None.
+	"""
+	from scipy.optimize import nnls
+
+	mask = np.isfinite(stack).all(axis=0) & np.isfinite(y_true)
+	if stack.shape[0] == 0 or mask.sum() < stack.shape[0]:
+		return None
+
+	w, _ = nnls(stack[:, mask].T, y_true[mask])
+	if w.sum() <= 0:
+		return None
+	return w / w.sum()
+
+
+def blend_forecasts(
+	future_by_key: dict[str, pd.DataFrame | None],
+	weights: dict[str, float] = ENSEMBLE_WEIGHTS,
+) -> pd.DataFrame | None:
+	"""
+	모델별 미래 예측(date, price)을 날짜 기준으로 정렬 후 가중 평균.
+	예측이 없는 모델은 제외하고, 남은 모델 가중치만으로 정규화한다.
+
+	return: date + price_{key}... + ensemble_price (예측 가능한 모델이 없으면 None)
+	"""
+	keys, dates, stack = stack_forecasts(future_by_key)
+	if len(keys) == 0:
+		return None
+
+	df_ens = pd.DataFrame({"date": dates})
+	for i, k in enumerate(keys):
+		df_ens[f"price_{k}"] = stack[i]
+
+	df_ens["ensemble_price"] = weight_vector(keys, weights) @ stack
+	return df_ens
+
+
+# ---------------------------------------------------------------------
+# 스레드 예산
+# ---------------------------------------------------------------------
+def member_thread_caps(model_keys: list[str], n_threads: int | None = None) -> dict[str, int]:
+	"""
+	전체 스레드 예산(n_threads, 기본 CPU 코어 수)을 멤버 수로 나눈 몫.
+	나머지는 앞쪽 멤버(보통 lgbm / xgb)부터 1개씩 더 준다. 최소 1.
+	"""
+	n_threads = n_threads or os.cpu_count() or 1
+	n_members = max(len(model_keys), 1)
+
+	base, extra = divmod(n_threads, n_members)
+	return {
+		key: max(1, base + (1 if i < extra else 0))
+		for i, key in enumerate(model_keys)
+	}
+
+
+@contextmanager
+def _torch_threads(n_threads: int):
+	"""torch intra-op 스레드 수 제한 (프로세스 전역 설정이라 끝나면 되돌린다)"""
+	import torch
+
+	prev = torch.get_num_threads()
+	torch.set_num_threads(n_threads)
+	try:
+		yield
+	finally:
+		torch.set_num_threads(prev)
+
+
+def _predict_member(m, steps: int) -> pd.DataFrame | None:
+	"""미래 예측 (predict_future 미구현 모델은 None)"""
+	try:
+		return m.predict_future(steps=steps)
+	except NotImplementedError:
+		return None
+
+
+def _forecast_member(key: str, m, steps: int, n_threads: int):
+	"""이미 학습/로드된 멤버 1개 미래 예측. return: (key, future_df | None, predict_sec)"""
+	torch_cap = _torch_threads(n_threads) if key == "np" else nullcontext()
+
+	m.set_n_jobs(n_threads)
+
+	with threadpool_limits(limits=n_threads, user_api="openmp"), torch_cap:
+		start = time.perf_counter()
+		future = _predict_member(m, steps)
+		predict_sec = time.perf_counter() - start
+
+	return key, future, predict_sec
+
+
+def _run_member(
+	key: str,
+	item_id: int | None,
+	df_ml: pd.DataFrame,
+	features: list[str],
+	steps: int,
+	n_threads: int,
+	forecast: bool,
+	update: bool,
+):
+	"""
+	멤버 1개 학습/로드 + (forecast=True 면) 미래 예측.
+	return: (key, model, status, future_df | None, timing)
+	"""
+	# io → factory → ensemble 순서로 import 되므로 여기서 늦게 import
+	from .io import load_or_train_model
+
+	torch_cap = _torch_threads(n_threads) if key == "np" else nullcontext()
+
+	with threadpool_limits(limits=n_threads, user_api="openmp"), torch_cap:
+		start = time.perf_counter()
+		m, status = load_or_train_model(
+			model_key=key,
+			item_id=item_id,
+			df_ml=df_ml,
+			features=features,
+			update=update,
+			n_jobs=n_threads,
+		)
+		fit_sec = time.perf_counter() - start
+
+		future = _predict_member(m, steps) if forecast else None
+		predict_sec = time.perf_counter() - start - fit_sec
+
+	timing = {
+		"status": status,
+		"threads": n_threads,
+		"fit_sec": fit_sec,
+		"predict_sec": predict_sec,
+	}
+	return key, m, status, future, timing
+
+
+# ---------------------------------------------------------------------
+# runner
+# ---------------------------------------------------------------------
+def run_ensemble_members(
+	item_id: int | None,
+	df_ml: pd.DataFrame,
+	features: list[str],
+	steps: int,
+	model_keys: list[str] = ENSEMBLE_KEYS,
+	weights: dict[str, float] = ENSEMBLE_WEIGHTS,
+	extra_keys: list[str] = (),
+	update: bool = False,
+	n_threads: int | None = None,
+) -> dict:
+	"""
+	앙상블 멤버(model_keys) + 추가 모델(extra_keys, 예: 검증용 단일 모델)을 동시에 학습/로드.
+	model_keys 만 미래 예측 후 가중 평균하고, extra_keys 는 학습/로드까지만 한다.
+	steps=0 이면 미래 예측 없이 학습/로드만 한다 (ensemble_df 는 None).
+
+	return: {
+		"models": {key: PriceModel},
+		"status": {key: "loaded" | "updated" | "trained"},
+		"ensemble_df": date + price_{key}... + ensemble_price (없으면 None),
+		"timings": {key: {"status", "threads", "fit_sec", "predict_sec"}, "total_sec": float},
+	}
+	"""
+	all_keys = list(model_keys) + [k for k in extra_keys if k not in model_keys]
+	caps = member_thread_caps(all_keys, n_threads)
+
+	models: dict[str, object] = {}
+	status: dict[str, str] = {}
+	future: dict[str, pd.DataFrame | None] = {}
+	timings: dict[str, object] = {}
+
+	start = time.perf_counter()
+
+	with ThreadPoolExecutor(max_workers=len(all_keys) or 1) as pool:
+		jobs = [
+			pool.submit(
+				_run_member,
+				key,
+				item_id,
+				df_ml,
+				features,
+				steps,
+				caps[key],
+				steps > 0 and key in model_keys,
+				update,
+			)
+			for key in all_keys
+		]
+
+		# 제출 순서대로 결과 수집 (멤버 하나가 실패하면 예외 그대로 전달)
+		for job in jobs:
+			key, m, member_status, member_future, timing = job.result()
+			models[key] = m
+			status[key] = member_status
+			timings[key] = timing
+			if key in model_keys:
+				future[key] = member_future
+
+	timings["total_sec"] = time.perf_counter() - start
+
+	return {
+		"models": models,
+		"status": status,
+		"ensemble_df": blend_forecasts(future, weights),
+		"timings": timings,
+	}
+
+
+# ---------------------------------------------------------------------
+# BasePriceModel 구현
+# ---------------------------------------------------------------------
+def _validation_frame(m) -> pd.DataFrame | None:
+	"""
+	멤버의 검증 구간 예측 → (date, price).
+	모든 모델의 검증 구간은 데이터 마지막 봉에서 끝나므로 y_pred 길이만큼 뒤에서부터 날짜를 붙인다.
+	(NeuralProphet 은 df_np 기준, 나머지는 df 기준)
+	"""
+	y_pred = getattr(m, "y_pred", None)
+	if y_pred is None or len(y_pred) == 0:
+		return None
+
+	df_np = getattr(m, "df_np", None)
+	dates = df_np["ds"] if df_np is not None else m.df["date"]
+	if len(dates) < len(y_pred):
+		return None
+
+	return pd.DataFrame({
+		"date": dates.iloc[-len(y_pred):].to_numpy(),
+		"price": np.asarray(y_pred, dtype=float).ravel(),
+	})
+
+
+class EnsemblePriceModel(BasePriceModel):
+	"""
+	LightGBM / XGBoost / NeuralProphet / LSTM 가중 평균 앙상블.
+
+	- train: 멤버를 동시에 학습/로드 (io.load_or_train_model → item_id 가 있으면 저장된 모델 재사용)
+	  후 검증 구간 예측을 공통 날짜 기준으로 stack 해서 앙상블 검증 지표 계산
+	- learn_weights=True 면 가중치를 검증 구간 NNLS 로 다시 맞춘다 (실패하면 고정 가중치)
+	- predict_future: 멤버 미래 예측을 동시에 돌린 뒤 같은 가중치 벡터로 blend
+	- 멤버가 각자 artifact 로 저장되므로 앙상블 자체는 저장하지 않는다 (save_artifact 없음)
+	"""
+
+	def __init__(
+		self,
+		model_keys: list[str] = ENSEMBLE_KEYS,
+		weights: dict[str, float] = ENSEMBLE_WEIGHTS,
+		learn_weights: bool = False,
+		item_id: int | None = None,
+		update: bool = False,
+		extra_keys: list[str] = (),
+		n_threads: int | None = None,
+	):
+		self.model_keys = list(model_keys)
+		self.base_weights = {k: float(weights.get(k, 0.0)) for k in self.model_keys}
+		self.learn_weights = learn_weights
+		self.item_id = item_id
+		self.update = update
+		self.extra_keys = list(extra_keys)
+		self.n_threads = n_threads
+
+		self.members: dict[str, object] = {}		# model_keys + extra_keys 학습/로드 결과
+		self.status: dict[str, str] = {}
+		self.timings: dict[str, object] = {}
+		self.weights = dict(self.base_weights)		# 실제 blend 에 쓰는 가중치
+
+		self.df = None
+		self.features = None
+		self.split_idx = None
+		self.y_test = None
+		self.y_pred = None
+		self.rmse = None
+		self.r2 = None
+
+	def train(self, df: pd.DataFrame, features: list[str]):
+		self.df = df
+		self.features = features
+
+		result = run_ensemble_members(
+			item_id=self.item_id,
+			df_ml=df,
+			features=features,
+			steps=0,
+			model_keys=self.model_keys,
+			weights=self.base_weights,
+			extra_keys=self.extra_keys,
+			update=self.update,
+			n_threads=self.n_threads,
+		)
+		self.members = result["models"]
+		self.status = result["status"]
+		self.timings = result["timings"]
+
+		self._evaluate()
+
+	def _evaluate(self):
+		"""멤버 검증 예측 stack → (학습된) 가중치 → 앙상블 y_pred / rmse / r2"""
+		# sklearn 은 import 만 1초 가까이 걸려서, 이 모듈을 import 하는 페이지가 바로 내지 않도록 여기서 import
+		from sklearn.metrics import mean_squared_error, r2_score
+
+		keys, dates, stack = stack_forecasts({
+			k: _validation_frame(self.members[k]) for k in self.model_keys
+		})
+		self.weights = dict(self.base_weights)
+
+		if len(keys) == 0 or len(dates) == 0:
+			self.split_idx = len(self.df)
+			self.y_test = pd.Series([], dtype=float)
+			self.y_pred = np.empty(0)
+			self.rmse = None
+			self.r2 = None
+			return
+
+		pos = pd.Index(self.df["date"]).get_indexer(dates)
+		y_true = self.df["price"].to_numpy(dtype=float)[pos]
+
+		if self.learn_weights:
+			learned = learn_weights(stack, y_true)
+			if learned is not None:
+				self.weights = {k: 0.0 for k in self.model_keys}
+				self.weights.update(zip(keys, learned.tolist()))
+
+		self.split_idx = int(pos[0])
+		self.y_test = pd.Series(y_true, index=self.df.index[pos])
+		self.y_pred = weight_vector(keys, self.weights) @ stack
+		self.rmse = float(np.sqrt(mean_squared_error(y_true, self.y_pred)))
+		self.r2 = float(r2_score(y_true, self.y_pred))
+
+	def predict_test(self):
+		return (
+			self.y_test,
+			self.y_pred,
+			self.split_idx,
+			self.rmse,
+			self.r2,
+		)
+
+	def predict_future(self, steps: int) -> pd.DataFrame | None:
+		"""
+		return: date + price_{key}... + ensemble_price (예측 가능한 멤버가 없으면 None)
+		"""
+		if not self.members:
+			raise ValueError("모델이 아직 학습되지 않았습니다. 먼저 train()을 호출하세요.")
+
+		caps = member_thread_caps(self.model_keys, self.n_threads)
+		future: dict[str, pd.DataFrame | None] = {}
+
+		start = time.perf_counter()
+		with ThreadPoolExecutor(max_workers=len(self.model_keys) or 1) as pool:
+			jobs = [
+				pool.submit(_forecast_member, key, self.members[key], steps, caps[key])
+				for key in self.model_keys
+			]
+			for job in jobs:
+				key, member_future, predict_sec = job.result()
+				future[key] = member_future
+				self.timings[key]["predict_sec"] = predict_sec
+
+		self.timings["total_sec"] = self.timings.get("total_sec", 0.0) + time.perf_counter() - start
+
+		return blend_forecasts(future, self.weights)
@@ -1,24 +1,58 @@
 # models/factory.py
+#
+# 모델 클래스는 처음 get_model() 로 요청될 때 import 한다.
+# (lstm_model → TensorFlow, neuralprophet_model → torch 처럼 import 만으로 수 초가 걸리는 백엔드가 있어서,
+#  차트만 보거나 백테스트만 돌리는 페이지는 이 비용을 내지 않게 한다)
 
-from .random_forest_model import RandomForestPriceModel
-from .lightgbm_model import LightGBMPriceModel
-from .lstm_model import LSTMPriceModel
-from .neuralprophet_model import NeuralProphetPriceModel
-from .xgboost_model import XGBoostPriceModel
+import importlib
+import threading
+import time
 
 _MODEL_REGISTRY = {
-	"rf": RandomForestPriceModel,
-	"lgbm": LightGBMPriceModel,
-	"xgb": XGBoostPriceModel,
-	"lstm": LSTMPriceModel,
-	"np": NeuralProphetPriceModel,
+	"rf": ".random_forest_model.RandomForestPriceModel",
+	"lgbm": ".lightgbm_model.LightGBMPriceModel",
+	"xgb": ".xgboost_model.XGBoostPriceModel",
+	"lstm": ".lstm_model.LSTMPriceModel",
+	"np": ".neuralprophet_model.NeuralProphetPriceModel",
+	"ensemble": ".ensemble.EnsemblePriceModel",
 }
 
+_RESOLVED: dict[str, type] = {}
+_IMPORT_SEC: dict[str, float] = {}
+_LOCK = threading.Lock()		# 앙상블 멤버 스레드가 같은 모듈을 동시에 import 하지 않게
+
+
+def get_model_class(model_name: str) -> type:
+	"""dotted path(models 패키지 기준 상대 경로) → 모델 클래스 (처음 한 번만 import, 걸린 시간은 import_report() 에 남는다)"""
+	model_class = _RESOLVED.get(model_name)
+	if model_class is not None:
+		return model_class
 
-def get_model(model_name: str):
 	try:
-		model_class = _MODEL_REGISTRY[model_name]
+		dotted_path = _MODEL_REGISTRY[model_name]
 	except KeyError:
 		raise ValueError(f"Unknown model: {model_name}")
 
-	return model_class()
+	with _LOCK:
+		if model_name not in _RESOLVED:
+			module_path, class_name = dotted_path.rsplit(".", 1)
+
+			start = time.perf_counter()
+			module = importlib.import_module(module_path, package=__package__)
+			_IMPORT_SEC[model_name] = time.perf_counter() - start
+
+			_RESOLVED[model_name] = getattr(module, class_name)
+
+	return _RESOLVED[model_name]
+
+
+def get_model(model_name: str):
+	return get_model_class(model_name)()
+
+
+def import_report() -> dict[str, float | None]:
+	"""
+	모델 키별 백엔드 import 소요 시간(초). 아직 import 하지 않은 모델은 None.
+	(먼저 import 된 모델이 공용 의존성(sklearn 등)을 끌어오면 뒤에 오는 모델은 그만큼 짧게 잡힌다)
+	"""
+	return {key: _IMPORT_SEC.get(key) for key in _MODEL_REGISTRY}
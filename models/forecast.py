@@ -0,0 +1,171 @@
+# models/forecast.py
+# 트리 기반 모델(RF / LGBM / XGB) + LSTM 공용 auto-regressive 미래 예측 엔진
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from features import BB_WINDOW, RSI_WINDOW, IncrementalBollinger, IncrementalRSI
+
+
+# ---------------------------------------------------------------------
+# lag feature 이름 → 몇 스텝 전 가격인지 (features.make_ml_dataset 과 동일, 30분 기준)
+# ---------------------------------------------------------------------
+LAG_OFFSETS = {
+	"lag_30m": 1,
+	"lag_1h": 2,
+	"lag_6h": 12,
+	"lag_24h": 48,
+}
+
+
+class RecursiveForecaster:
+	"""
+	1-step 모델을 반복 호출해서 multi-step 예측선을 만드는 엔진.
+
+	- 최근 가격은 고정 크기 NumPy ring buffer 에만 유지한다
+	  (스텝마다 history.copy() / pd.concat 하지 않음 → O(steps))
+	- 모델 입력은 미리 할당한 (1, F) 배열 한 개를 제자리에서 갱신한다
+	  · lag_* / hour / day_of_week 슬롯은 스텝마다 갱신
+	  · rsi / bb_upper / bb_lower / is_overbought / is_oversold 는
+	    features.py 의 incremental 지표로 예측 가격을 반영해 스텝마다 재계산
+	  · 그 외 feature(gpt_score 등)는 마지막 row 값 유지
+	- 시퀀스 모델(LSTM)은 _predict_next / _on_step 을 override 해서
+	  같은 feature 갱신 로직 위에 자기 입력 window 를 굴린다
+	"""
+
+	def __init__(self, model, df: pd.DataFrame, features: list[str], freq: str = "30min"):
+		if df is None or len(df) == 0:
+			raise ValueError("미래 예측에 사용할 히스토리 데이터가 없습니다.")
+
+		self.model = model
+		self.features = list(features)
+		self.step = pd.Timedelta(freq)
+
+		prices = df["price"].to_numpy(dtype=float)
+		self.last_date = pd.Timestamp(df["date"].iloc[-1])
+
+		# 1) ring buffer: 가장 긴 lag 만큼만 보관 (히스토리가 짧으면 첫 가격으로 채움)
+		self.capacity = max(LAG_OFFSETS.values())
+		tail = prices[-self.capacity:]
+		self.buffer = np.full(self.capacity, tail[0], dtype=float)
+		self.buffer[self.capacity - len(tail):] = tail
+		self.pos = 0		# 다음에 쓸 위치 (= 가장 오래된 값의 위치)
+
+		# 2) 입력 행: 마지막 row 의 feature 값으로 초기화
+		self.X_row = np.empty((1, len(self.features)), dtype=float)
+		self.X_row[0, :] = df[self.features].iloc[-1].to_numpy(dtype=float)
+
+		# 3) 스텝마다 갱신할 슬롯 인덱스
+		self.lag_slots = [
+			(self.features.index(name), lag)
+			for name, lag in LAG_OFFSETS.items()
+			if name in self.features
+		]
+		self.hour_slot = self.features.index("hour") if "hour" in self.features else None
+		self.dow_slot = (
+			self.features.index("day_of_week") if "day_of_week" in self.features else None
+		)
+
+		# 4) 기술 지표: 히스토리 끝부분으로 running sum 상태 구성
+		self.indicator_slots = {
+			name: self.features.index(name)
+			for name in ("rsi", "bb_upper", "bb_lower", "is_overbought", "is_oversold")
+			if name in self.features
+		}
+		self.rsi = IncrementalRSI(RSI_WINDOW).seed(prices) if "rsi" in self.indicator_slots else None
+		self.bollinger = None
+		if self.indicator_slots.keys() - {"rsi"}:
+			self.bollinger = IncrementalBollinger(BB_WINDOW).seed(prices)
+
+	def _lag(self, k: int) -> float:
+		"""k 스텝 전 가격 (k=1 이 직전 가격)"""
+		return self.buffer[(self.pos - k) % self.capacity]
+
+	def _push(self, price: float):
+		self.buffer[self.pos] = price
+		self.pos = (self.pos + 1) % self.capacity
+
+	def _refresh_indicators(self, price: float):
+		"""새 가격을 반영해 지표 슬롯 갱신 (make_ml_dataset 과 같은 정의)"""
+		slots = self.indicator_slots
+		X_row = self.X_row
+
+		if self.rsi is not None:
+			X_row[0, slots["rsi"]] = self.rsi.update(price)
+
+		if self.bollinger is not None:
+			upper, lower = self.bollinger.update(price)
+			if "bb_upper" in slots:
+				X_row[0, slots["bb_upper"]] = upper
+			if "bb_lower" in slots:
+				X_row[0, slots["bb_lower"]] = lower
+			if "is_overbought" in slots:
+				X_row[0, slots["is_overbought"]] = float(price > upper)
+			if "is_oversold" in slots:
+				X_row[0, slots["is_oversold"]] = float(price < lower)
+
+	def _predict_next(self) -> float:
+		"""현재 입력 행(X_row)으로 다음 봉 가격 예측"""
+		return float(self.model.predict(self.X_row)[0])
+
+	def _on_step(self, price: float):
+		"""예측 가격 / 지표가 반영된 뒤 호출 (X_row = 방금 예측한 봉의 feature 행)"""
+		pass
+
+	def run(self, steps: int) -> pd.DataFrame:
+		"""
+		steps 만큼 미래를 예측해서 DataFrame(date, price) 반환.
+		"""
+		future_dates = pd.date_range(
+			start=self.last_date + self.step,
+			periods=steps,
+			freq=self.step,
+		)
+		hours = future_dates.hour.to_numpy()
+		dows = future_dates.dayofweek.to_numpy()
+
+		preds = np.empty(steps, dtype=float)
+		X_row = self.X_row
+
+		with warnings.catch_warnings():
+			# 학습은 DataFrame, 예측은 ndarray 로 하므로 sklearn feature name 경고 무시
+			warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+			for i in range(steps):
+				# 1) 시간 관련 피처 갱신
+				if self.hour_slot is not None:
+					X_row[0, self.hour_slot] = hours[i]
+				if self.dow_slot is not None:
+					X_row[0, self.dow_slot] = dows[i]
+
+				# 2) lag 피처 갱신
+				for slot, lag in self.lag_slots:
+					X_row[0, slot] = self._lag(lag)
+
+				# 3) 예측 후 ring buffer / 지표에 반영 (다음 스텝 입력으로 사용)
+				y_hat = self._predict_next()
+				preds[i] = y_hat
+				self._push(y_hat)
+				self._refresh_indicators(y_hat)
+				self._on_step(y_hat)
+
+		return pd.DataFrame({
+			"date": future_dates,
+			"price": preds,
+		})
+
+
+def recursive_forecast(
+	model,
+	df: pd.DataFrame,
+	features: list[str],
+	steps: int,
+	freq: str = "30min",
+) -> pd.DataFrame:
+	"""
+	RecursiveForecaster 한 번 쓰고 버리는 헬퍼.
+	각 PriceModel.predict_future 에서 이 함수만 호출하면 된다.
+	"""
+	return RecursiveForecaster(model, df, features, freq=freq).run(steps)
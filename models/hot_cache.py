@@ -0,0 +1,96 @@
+# models/hot_cache.py
+# 프로세스 전역 in-memory 모델 캐시 (Streamlit 세션끼리 공유)
+#
+# - key: (model_key, item_id, artifact 버전) → 역직렬화가 끝난 PriceModel
+#   artifact 를 다시 저장하면 버전(meta.json mtime)이 바뀌므로 예전 객체는 다시 쓰이지 않고 LRU 로 밀려난다
+# - 크기 예산(HOT_MODEL_CACHE_MB)을 넘으면 오래 안 쓴 모델부터 내보낸다
+#   (모델 크기는 artifact 디스크 크기로 어림한다)
+# - 꺼낼 때는 얕은 복사본을 준다: estimator / booster / Keras 모델은 같이 쓰고,
+#   load_or_train_model 이 붙이는 df / 검증 예측 / update() 결과는 복사본에만 들어간다
+#
+# Streamlit 은 같은 프로세스 안에서 모듈을 한 번만 import 하므로,
+# 모듈 전역 HOT_MODELS 가 st.cache_resource 와 같은 역할을 한다 (models/ 는 streamlit 에 의존하지 않음)
+
+import copy
+import os
+import threading
+from collections import OrderedDict
+
+
+HOT_MODEL_CACHE_MB = float(os.getenv("HOT_MODEL_CACHE_MB", "1024"))	# 0 이면 캐시 안 함
+
+# NeuralProphet 은 predict() 가 forecaster 내부 상태(trainer / 데이터 로더)를 바꿔서
+# 세션끼리 같은 객체를 동시에 쓸 수 없다 → 캐시하지 않는다
+HOT_CACHE_KEYS = ("rf", "lgbm", "xgb", "lstm")
+
+# 학습 데이터 / 히스토리에 비례하는 값은 캐시에 넣지 않는다 (꺼낸 쪽에서 최신 df 를 다시 붙임)
+_DROP_ATTRS = ("df", "df_np")
+
+
+class HotModelCache:
+	def __init__(self, max_bytes: float):
+		self.max_bytes = max_bytes
+		self._items: OrderedDict = OrderedDict()		# key → (model, nbytes)
+		self._bytes = 0
+		self._lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+
+	def get(self, key):
+		"""캐시된 모델의 얕은 복사본 (없으면 None)"""
+		with self._lock:
+			item = self._items.get(key)
+			if item is None:
+				self.misses += 1
+				return None
+			self._items.move_to_end(key)
+			self.hits += 1
+			return copy.copy(item[0])
+
+	def put(self, key, price_model, nbytes: int):
+		if self.max_bytes <= 0 or nbytes > self.max_bytes:
+			return
+
+		# 같이 쓸 부분만 남긴 복사본을 보관 (호출한 쪽 객체는 그대로)
+		cached = copy.copy(price_model)
+		for attr in _DROP_ATTRS:
+			if hasattr(cached, attr):
+				setattr(cached, attr, None)
+
+		# LSTM: 컴파일된 추론 함수를 미리 만들어 두면 복사본끼리 trace 결과를 같이 쓴다
+		if hasattr(cached, "_infer_fn"):
+			cached._infer_fn()
+
+		with self._lock:
+			if key in self._items:
+				self._bytes -= self._items.pop(key)[1]
+			self._items[key] = (cached, nbytes)
+			self._bytes += nbytes
+
+			while self._bytes > self.max_bytes and self._items:
+				_, (_, evicted_bytes) = self._items.popitem(last=False)
+				self._bytes -= evicted_bytes
+
+	def discard(self, model_key: str, item_id):
+		"""(model_key, item_id) 의 모든 버전 제거"""
+		with self._lock:
+			for key in [k for k in self._items if k[:2] == (model_key, item_id)]:
+				self._bytes -= self._items.pop(key)[1]
+
+	def clear(self):
+		with self._lock:
+			self._items.clear()
+			self._bytes = 0
+
+	def stats(self) -> dict:
+		with self._lock:
+			return {
+				"n_models": len(self._items),
+				"bytes": self._bytes,
+				"max_bytes": self.max_bytes,
+				"hits": self.hits,
+				"misses": self.misses,
+			}
+
+
+HOT_MODELS = HotModelCache(HOT_MODEL_CACHE_MB * 1024 * 1024)
@@ -1,17 +1,23 @@
 # models/io.py
 
 import os
+import shutil
 from pathlib import Path
 from typing import Optional
 
 import joblib
 
+from .artifact import ARTIFACT_VERSION, COMMON_META, META_FILE, read_meta, write_meta
+from .base import UPDATE_TREES
 from .factory import get_model
+from .hot_cache import HOT_CACHE_KEYS, HOT_MODELS
+from .registry import MODEL_DIR_MAX_MB, ModelRegistry, dir_size, registry_meta, stale_reason
 
 
 # ---------------------------------------------------------------------
 # 1. 모델 저장 기본 경로
-#    예) trained_models/rf/item_123.pkl
+#    예) trained_models/lgbm/lgbm_item_123/  (meta.json + native booster 파일)
+#    예전 포맷: trained_models/lgbm/lgbm_item_123.pkl (PriceModel 통째로 joblib)
 # ---------------------------------------------------------------------
 BASE_DIR = Path(__file__).resolve().parent.parent  # 프로젝트 루트 기준
 MODEL_DIR = BASE_DIR / "trained_models"
@@ -22,9 +28,9 @@ def _ensure_model_dir():
 		MODEL_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def _model_filename(model_key: str, item_id: Optional[int] = None) -> Path:
+def _model_stem(model_key: str, item_id: Optional[int] = None) -> Path:
 	"""
-	모델 키 + 아이템 ID 조합으로 파일 경로 생성.
+	모델 키 + 아이템 ID 조합으로 경로(확장자 제외) 생성.
 	item_id가 없으면 공통 모델로 취급.
 	"""
 	_ensure_model_dir()
@@ -34,48 +40,209 @@ def _model_filename(model_key: str, item_id: Optional[int] = None) -> Path:
 		subdir.mkdir(parents=True, exist_ok=True)
 
 	if item_id is not None:
-		filename = f"{model_key}_item_{item_id}.pkl"
-	else:
-		filename = f"{model_key}_global.pkl"
+		return subdir / f"{model_key}_item_{item_id}"
+	return subdir / f"{model_key}_global"
 
-	return subdir / filename
+
+def _artifact_dir(model_key: str, item_id: Optional[int] = None) -> Path:
+	return _model_stem(model_key, item_id)
+
+
+def _legacy_filename(model_key: str, item_id: Optional[int] = None) -> Path:
+	return _model_stem(model_key, item_id).with_suffix(".pkl")
+
+
+def get_registry() -> ModelRegistry:
+	return ModelRegistry(MODEL_DIR)
+
+
+def artifact_meta(model_key: str, item_id: Optional[int] = None) -> dict | None:
+	"""저장된 artifact 의 meta.json (레지스트리 필드 포함). 없으면 None"""
+	return read_meta(_artifact_dir(model_key, item_id))
+
+
+def _hot_key(model_key: str, item_id: Optional[int], path: Path):
+	"""in-memory 캐시 key. artifact 를 다시 저장하면 meta.json 이 새로 써져서 버전이 바뀐다"""
+	try:
+		version = (path / META_FILE).stat().st_mtime_ns
+	except OSError:
+		return None
+	return (model_key, item_id, version)
+
+
+def _hot_put(model_key: str, item_id: Optional[int], path: Path, price_model, nbytes: int | None = None):
+	if model_key not in HOT_CACHE_KEYS:
+		return
+	key = _hot_key(model_key, item_id, path)
+	if key is None:
+		return
+	if nbytes is None:
+		nbytes = (read_meta(path) or {}).get("size_bytes") or dir_size(path)
+	HOT_MODELS.put(key, price_model, nbytes)
 
 
 # ---------------------------------------------------------------------
 # 2. 저장 / 로드 헬퍼
 # ---------------------------------------------------------------------
-def save_model(model_key: str, item_id: Optional[int], price_model) -> Path:
+def save_model(model_key: str, item_id: Optional[int], price_model) -> Path | None:
 	"""
-	RF / LGBM / XGB / LSTM PriceModel 인스턴스를 그대로 joblib으로 저장.
-	NeuralProphet(np)는 매번 다시 학습하도록 디스크에 저장하지 않는다. (저장한거 불러오는게 메모리 에러남)
+	PriceModel 을 artifact 디렉터리로 저장.
+	- 학습된 estimator(native 포맷) + 스케일러 + feature 목록 + 작은 메타데이터만 저장
+	- 학습 df / 검증 예측 / 시퀀스 텐서처럼 히스토리 길이에 비례하는 값은 저장하지 않는다
+	- NeuralProphet 은 TimeNet state_dict + 설정만 저장한다
+
+	같은 경로에 임시 디렉터리로 다 쓴 뒤 교체하므로, 저장 중 실패해도 기존 artifact 는 남는다.
 	"""
-	path = _model_filename(model_key, item_id)
+	if not hasattr(price_model, "save_artifact"):
+		return None
+
+	path = _artifact_dir(model_key, item_id)
+	tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+	shutil.rmtree(tmp_path, ignore_errors=True)
+	tmp_path.mkdir(parents=True)
+
+	try:
+		extra = price_model.save_artifact(tmp_path)
+
+		meta = {
+			"format_version": ARTIFACT_VERSION,
+			"model_key": model_key,
+			"item_id": item_id,
+		}
+		meta.update({attr: getattr(price_model, attr, None) for attr in COMMON_META})
+		meta.update(registry_meta(price_model))
+		meta.update(extra)
+		meta["size_bytes"] = dir_size(tmp_path)
+		write_meta(tmp_path, meta)
+
+		old_path = path.with_name(f"{path.name}.{os.getpid()}.old")
+		if path.exists():
+			os.replace(path, old_path)
+		os.replace(tmp_path, path)
+		shutil.rmtree(old_path, ignore_errors=True)
+	except Exception:
+		shutil.rmtree(tmp_path, ignore_errors=True)
+		raise
 
-	# 🔹 NeuralProphet은 항상 새로 학습 → 저장 스킵
-	# if model_key == "np":
-	# 	# 필요하면 디버깅용 로그만 남겨도 됨
-	# 	# print(f"[INFO] NeuralProphet 모델은 디스크에 저장하지 않습니다: {path}")
-	# 	return path
+	# 방금 저장한 모델은 다음 요청에서 역직렬화 없이 바로 쓰도록 메모리 캐시에도 넣는다
+	HOT_MODELS.discard(model_key, item_id)
+	_hot_put(model_key, item_id, path, price_model, meta["size_bytes"])
+
+	# 디스크 예산을 넘으면 오래 안 쓴 artifact 부터 정리 (방금 저장한 건 제외)
+	if MODEL_DIR_MAX_MB > 0:
+		registry = get_registry()
+		registry.touch(path)
+		for removed in registry.evict_lru(MODEL_DIR_MAX_MB * 1024 * 1024, keep=[path]):
+			print(f"[INFO] 디스크 예산 초과로 모델 삭제: {removed}")
 
-	joblib.dump(price_model, path)
 	return path
 
 
+def _load_artifact(model_key: str, path: Path):
+	meta = read_meta(path)
+	if meta is None or meta.get("model_key") != model_key:
+		return None
+
+	price_model = get_model(model_key)
+	if not hasattr(price_model, "load_artifact"):
+		return None
+
+	for attr in COMMON_META:
+		setattr(price_model, attr, meta.get(attr))
+	price_model.load_artifact(path, meta)
+	return price_model
+
+
+# NeuralProphet 예전 .pkl 은 학습 데이터 로더까지 통째로 들어 있어서(GB 단위) 읽으면 메모리가 부족하다.
+# 변환하지 않고 무시 → 다음 학습 때 artifact 로 새로 저장된다.
+_SKIP_MIGRATION = ("np",)
+
+# update()(warm-start) 를 지원하는 모델 - drift 는 재학습 대신 이어 학습으로 따라간다
+_UPDATABLE = ("lgbm", "xgb")
+
+
+def _migrate_legacy(model_key: str, item_id: Optional[int], legacy_path: Path):
+	"""
+	예전 .pkl(PriceModel 통째로 joblib) → artifact 디렉터리로 변환 후 .pkl 삭제.
+	return: 변환된 PriceModel (변환 불가면 None)
+	"""
+	price_model = joblib.load(legacy_path)
+
+	if save_model(model_key, item_id, price_model) is None:
+		return None
+
+	legacy_path.unlink()
+	return _load_artifact(model_key, _artifact_dir(model_key, item_id))
+
+
 def load_model(model_key: str, item_id: Optional[int]):
 	"""
 	기존에 저장된 모델을 로드. 없으면 None 반환.
-	NeuralProphet(np)는 항상 새로 학습하므로 로드하지 않는다.
+	- artifact 디렉터리가 있으면 그걸 로드 (booster / 배열은 필요한 만큼만 읽는다)
+	- 예전 .pkl 만 있으면 이번에 artifact 로 변환해서 로드
+	- rf / lgbm / xgb / lstm 은 프로세스 전역 메모리 캐시(models/hot_cache.py)를 먼저 본다
+	  (돌려주는 건 캐시 객체의 얕은 복사본이라 df / 검증 예측을 붙여도 다른 세션에 영향 없음)
 	"""
-	# 🔹 NeuralProphet은 디스크에서 로드하지 않음 → 항상 None
-	if model_key == "np":
-		return None
+	path = _artifact_dir(model_key, item_id)
+	if path.exists():
+		# 같은 버전을 다른 세션이 이미 읽었으면 역직렬화 없이 메모리 캐시에서 꺼낸다
+		key = _hot_key(model_key, item_id, path)
+		price_model = HOT_MODELS.get(key) if key is not None and model_key in HOT_CACHE_KEYS else None
 
-	path = _model_filename(model_key, item_id)
-	if not path.exists():
-		return None
+		if price_model is None:
+			price_model = _load_artifact(model_key, path)
+			if price_model is not None:
+				_hot_put(model_key, item_id, path, price_model)
 
-	price_model = joblib.load(path)
-	return price_model
+		if price_model is not None:
+			get_registry().touch(path)
+		return price_model
+
+	legacy_path = _legacy_filename(model_key, item_id)
+	if legacy_path.exists() and model_key not in _SKIP_MIGRATION:
+		try:
+			return _migrate_legacy(model_key, item_id, legacy_path)
+		except Exception as e:
+			print(f"[WARN] 예전 모델 파일 변환 실패 ({legacy_path}): {e}")
+
+	return None
+
+
+def migrate_legacy_models(model_dir: Path | None = None) -> dict:
+	"""
+	trained_models/*/*.pkl 전체를 artifact 포맷으로 변환.
+	NeuralProphet .pkl 은 변환하지 않는다 (_SKIP_MIGRATION).
+
+	return: {"migrated": [...], "skipped": [...], "failed": {path: error}}
+	"""
+	model_dir = Path(model_dir or MODEL_DIR)
+	result = {"migrated": [], "skipped": [], "failed": {}}
+
+	for legacy_path in sorted(model_dir.glob("*/*.pkl")):
+		model_key = legacy_path.parent.name
+		stem = legacy_path.stem
+
+		if stem == f"{model_key}_global":
+			item_id = None
+		elif stem.startswith(f"{model_key}_item_"):
+			item_id = int(stem[len(f"{model_key}_item_"):])
+		else:
+			result["skipped"].append(str(legacy_path))
+			continue
+
+		if model_key in _SKIP_MIGRATION:
+			result["skipped"].append(str(legacy_path))
+			continue
+
+		try:
+			if _migrate_legacy(model_key, item_id, legacy_path) is None:
+				result["skipped"].append(str(legacy_path))
+			else:
+				result["migrated"].append(str(legacy_path))
+		except Exception as e:
+			result["failed"][str(legacy_path)] = str(e)
+
+	return result
 
 
 
@@ -88,10 +255,54 @@ def load_or_train_model(
 	df_ml,
 	features,
 	force_retrain: bool = False,
+	update: bool = False,
+	update_trees: int = UPDATE_TREES,
+	n_jobs: Optional[int] = None,
 ):
+	"""
+	저장된 모델 로드 / 이어 학습 / 새로 학습.
+
+	- update=True 이고 모델이 update() 를 지원하면(LGBM / XGB)
+	  저장된 booster 에 train_watermark 이후 새 봉만 update_trees 개 트리로 이어 학습 후 저장
+	- warm-start 가 불가능하면(예전 pkl, feature 변경, 트리 수 초과) 전체 재학습
+	- n_jobs 를 주면 학습 / 이어 학습 / 검증 예측 전에 모델에 스레드 수를 지정 (LightGBM / XGBoost)
+	- 저장된 artifact 가 stale 이면(registry.stale_reason: 오래됨 / feature 변경 / 데이터 drift) 로드하지 않고 재학습
+	  (drift 는 update 가능한 모델이면 재학습 대신 이어 학습으로 따라간다)
+
+	return: (price_model, "loaded" | "updated" | "trained")
+	"""
+	# 0) 저장된 artifact 신선도 확인 (meta.json 만 읽음)
+	if not force_retrain:
+		reason = stale_reason(artifact_meta(model_key, item_id), df_ml, features)
+		can_follow = update and model_key in _UPDATABLE and reason in ("drift_rows", "drift_price")
+
+		if reason is not None and not can_follow:
+			print(f"[INFO] 저장된 모델이 stale({reason}) → 재학습 ({model_key}, item {item_id})")
+			force_retrain = True
+
 	# 1) 기존 모델이 있으면 우선 로드
 	if not force_retrain:
 		existing = load_model(model_key, item_id)
+		if existing is not None and n_jobs is not None:
+			existing.set_n_jobs(n_jobs)
+
+		# 🔹 LGBM / XGB: 새 봉만 이어 학습
+		if existing is not None and update and hasattr(existing, "update"):
+			try:
+				n_rows = existing.update(df_ml, features, n_trees=update_trees)
+			except ValueError as e:
+				print(f"[INFO] warm-start 불가 → 전체 재학습 ({model_key}, item {item_id}): {e}")
+				existing = None
+			else:
+				if n_rows == 0:
+					return existing, "loaded"
+
+				try:
+					save_model(model_key, item_id, existing)
+				except Exception as e:
+					print(f"[WARN] 모델 저장 실패: {e}")
+				return existing, "updated"
+
 		if existing is not None:
 			# 🔹 공통: 최신 데이터 프레임 / 피처 연결
 			if hasattr(existing, "df"):
@@ -99,24 +310,27 @@ def load_or_train_model(
 			if hasattr(existing, "features"):
 				existing.features = features
 
-			# 🔹 NeuralProphet 전용: df_np / backtest 갱신
-			#    - _build_np_df, _compute_backtest_metrics 는 우리가 앞에서 구현한 메서드
+			# 🔹 NeuralProphet 전용: df_np 를 새 df_ml 기준으로 다시 만들고 split 도 새 길이에 맞춘다
+			#    (검증 예측은 아래 _evaluate 에서 새 df_np 로 다시 계산)
 			if hasattr(existing, "_build_np_df"):
 				try:
 					existing.df_np = existing._build_np_df(df_ml)
-
-					# split 기준도 새 길이에 맞춰서 다시 설정
-					if hasattr(existing, "_compute_backtest_metrics"):
-						n_np = len(existing.df_np)
-						existing.split_idx = int(n_np * 0.8)
-						existing._compute_backtest_metrics()
+					existing.split_idx = int(len(existing.df_np) * 0.8)
 				except Exception as e:
-					print(f"[WARN] NeuralProphet df_np / backtest 갱신 실패: {e}")
+					print(f"[WARN] NeuralProphet df_np 갱신 실패: {e}")
+
+			# 🔹 공통: artifact 의 검증 예측은 저장 당시 데이터 기준이므로 저장된 split_idx 기준으로 다시 계산
+			if hasattr(existing, "_evaluate"):
+				if existing.split_idx is None or existing.split_idx >= len(df_ml):
+					existing.split_idx = int(len(df_ml) * 0.8)
+				existing._evaluate()
 
 			return existing, "loaded"
 
 	# 2) 기존 모델이 없거나 강제 재학습이면 새로 학습
 	price_model = get_model(model_key)
+	if n_jobs is not None:
+		price_model.set_n_jobs(n_jobs)
 	price_model.train(df_ml, features)
 
 	try:
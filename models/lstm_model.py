@@ -1,22 +1,100 @@
 # models/lstm_model.py
 
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.metrics import mean_squared_error, r2_score
 
+import tensorflow as tf
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense
 from tensorflow.keras.callbacks import EarlyStopping
+from tensorflow.keras.utils import PyDataset
 
+from .artifact import load_array, load_scaler, save_arrays, save_scaler
 from .base import BasePriceModel
+from .forecast import RecursiveForecaster
+from .sequence import n_batches, sliding_windows, window_batch
+
+
+BATCH_SIZE = 64
+VALIDATION_SPLIT = 0.1		# 학습 구간 뒤 10% 를 EarlyStopping 검증용으로 사용
+
+
+class _WindowBatches(PyDataset):
+	"""
+	strided window view → Keras 입력.
+	전체 시퀀스 텐서를 만들지 않고, 요청받은 batch 만 연속 메모리로 복사해서 넘긴다.
+	"""
+
+	def __init__(self, windows: np.ndarray, y: np.ndarray | None = None, batch_size: int = BATCH_SIZE):
+		super().__init__()
+		self.windows = windows
+		self.y = y
+		self.batch_size = batch_size
+
+	def __len__(self):
+		return n_batches(len(self.windows), self.batch_size)
+
+	def __getitem__(self, index):
+		X_batch = window_batch(self.windows, index, self.batch_size)
+		if self.y is None:
+			return (X_batch,)
+		return X_batch, window_batch(self.y, index, self.batch_size)
+
+
+class _LSTMRollout(RecursiveForecaster):
+	"""
+	LSTM 1-step roll-out.
+
+	- 다음 봉의 feature 행(lag / 시간 / RSI / Bollinger)은 RecursiveForecaster 가 트리 모델과 똑같이 갱신
+	- LSTM 입력은 (1, window, F) 버퍼 1개를 제자리에서 한 칸씩 밀고, 맨 뒤에 방금 예측한 봉의 스케일된 행을 넣는다
+	- 스텝마다 Keras predict() 대신 컴파일된 tf.function 을 호출한다 (predict 는 호출당 오버헤드가 크다)
+	"""
+
+	def __init__(self, price_model: "LSTMPriceModel", freq: str = "30min"):
+		super().__init__(price_model.model, price_model.df, price_model.features, freq=freq)
+
+		self.infer = price_model._infer_fn()
+		self.x_scale = price_model.scaler_X.scale_.astype(np.float32)
+		self.x_min = price_model.scaler_X.min_.astype(np.float32)
+		self.y_scale = float(price_model.scaler_y.scale_[0])
+		self.y_min = float(price_model.scaler_y.min_[0])
+
+		lstm_features = price_model._lstm_features()
+		self.window = price_model._last_window()				# (1, window, F)
+		self.row = np.empty(len(lstm_features), dtype=np.float32)
+		self.feature_pos = [lstm_features.index(f) for f in self.features]
+		self.price_pos = price_model.price_feat_index
+
+	def _predict_next(self) -> float:
+		y_scaled = float(self.infer(self.window)[0, 0])
+		return (y_scaled - self.y_min) / self.y_scale
+
+	def _on_step(self, price: float):
+		# 방금 예측한 봉의 행 = (갱신된 feature 행 + 예측 가격) → MinMax 스케일
+		self.row[self.feature_pos] = self.X_row[0]
+		self.row[self.price_pos] = price
+
+		window = self.window[0]
+		window[:-1] = window[1:]
+		window[-1] = self.row * self.x_scale + self.x_min
 
 
 class LSTMPriceModel(BasePriceModel):
-	def __init__(self, window_size: int = 48):
+	def __init__(self, window_size: int = 48, horizon: int = 1):
+		"""
+		window_size: 입력으로 보는 과거 봉 수
+		horizon: 1 이면 1-step 모델 (미래 예측은 roll-out),
+		         2 이상이면 한 번의 forward 로 horizon 스텝을 한꺼번에 내는 multi-horizon head
+		"""
 		# 하이퍼파라미터
 		self.window_size = window_size
+		self.horizon = horizon
 
 		# 데이터/모델 관련 상태
 		self.model = None
@@ -26,10 +104,7 @@ class LSTMPriceModel(BasePriceModel):
 		self.scaler_X = MinMaxScaler()
 		self.scaler_y = MinMaxScaler()
 
-		self.X_seq = None
-		self.y_seq_scaled = None
-		self.y_seq_real = None
-		self.date_seq = None
+		self._infer = None		# 컴파일된 추론 함수 (tf.function, 저장하지 않음)
 
 		# 평가 정보
 		self.split_idx = None		# 원본 df 기준 split index
@@ -44,6 +119,13 @@ class LSTMPriceModel(BasePriceModel):
 		self.last_date = None			# 마지막 시점
 
 
+	def _lstm_features(self) -> list[str]:
+		"""LSTM 입력 컬럼: 외부 features (+ price 가 없으면 맨 뒤에 추가)"""
+		if "price" in self.features:
+			return list(self.features)
+		return list(self.features) + ["price"]
+
+
 	def train(self, df: pd.DataFrame, features: list[str]):
 		"""
 		df: feature + price + date 를 포함한 전체 데이터프레임
@@ -51,84 +133,67 @@ class LSTMPriceModel(BasePriceModel):
 		"""
 		self.df = df
 		self.features = features
+		self._infer = None
 
 		# 0. LSTM 전용 feature 세트 구성
 		#    - 외부 features에는 price가 없어도 됨
 		#    - LSTM 내부 입력에는 price를 추가해서 사용
-		if "price" in features:
-			lstm_features = features
-			self.price_feat_index = features.index("price")
-		else:
-			lstm_features = features + ["price"]
-			self.price_feat_index = len(lstm_features) - 1	
+		lstm_features = self._lstm_features()
+		self.price_feat_index = lstm_features.index("price")
 
 		# 1. raw 값 추출
 		# X_raw = df[features].values			# (N, F)
 		X_raw = df[lstm_features].values			# (N, F_lstm)
 		y_raw = df["price"].values			# (N,)
-		dates = df["date"].values			# 시각화용
 
-		# 2. 스케일링
-		X_scaled = self.scaler_X.fit_transform(X_raw)					# (N, F)
+		# 2. 스케일링 (Keras 가 어차피 float32 로 바꾸므로 window 원본도 float32 로 1번만 변환)
+		X_scaled = self.scaler_X.fit_transform(X_raw).astype(np.float32)	# (N, F)
 		y_scaled = self.scaler_y.fit_transform(y_raw.reshape(-1, 1)).flatten()	# (N,)
 
 		# 3. 시퀀스(Window) 생성
+		#    - X_seq 는 X_scaled 위의 strided view (window 수만큼 복사하지 않음)
+		#    - i 번째 window = X_scaled[i : i + window_size] → 타깃 y[i + window_size]
+		#      (multi-horizon 이면 y[i + window_size : i + window_size + horizon])
 		window_size = self.window_size
+		horizon = self.horizon
+
+		X_seq = sliding_windows(X_scaled, window_size)		# (N_seq, window, F) view
+		y_seq_scaled = y_scaled[window_size:]
+		y_seq_real = y_raw[window_size:]
+
+		if horizon > 1:
+			y_target = sliding_window_view(y_seq_scaled, horizon)	# (N_seq - horizon + 1, horizon) view
+		else:
+			y_target = y_seq_scaled
 
-		X_seq = []
-		y_seq_scaled = []
-		y_seq_real = []
-		date_seq = []
-
-		for i in range(window_size, len(df)):
-			# 과거 window_size 개 시점
-			X_seq.append(X_scaled[i - window_size : i, :])		# (window_size, F)
-			y_seq_scaled.append(y_scaled[i])					# scaled target
-			y_seq_real.append(y_raw[i])							# 원래 price
-			date_seq.append(dates[i])
-
-		X_seq = np.array(X_seq)				# (N_seq, window, F)
-		y_seq_scaled = np.array(y_seq_scaled)
-		y_seq_real = np.array(y_seq_real)
-		date_seq = np.array(date_seq)
-
-		self.X_seq = X_seq
-		self.y_seq_scaled = y_seq_scaled
-		self.y_seq_real = y_seq_real
-		self.date_seq = date_seq
-
-		# 4. Train/Test 분리 (시계열: 앞 80% / 뒤 20%)
+		# 4. Train/Test 분리 (시계열: 앞 80% / 뒤 20%) - view 를 인덱싱만 한다
 		n_seq = len(X_seq)
 		split_idx_seq = int(n_seq * 0.8)		# 시퀀스 기준 split
 
-		X_train_seq = X_seq[:split_idx_seq]
+		# multi-horizon 타깃이 테스트 구간으로 넘어가지 않는 window 까지만 학습
+		n_train = split_idx_seq - horizon + 1
+
+		X_train_seq = X_seq[:n_train]
 		X_test_seq = X_seq[split_idx_seq:]
 
-		y_train_scaled = y_seq_scaled[:split_idx_seq]
-		y_test_scaled = y_seq_scaled[split_idx_seq:]
+		y_train_scaled = y_target[:n_train]
 
 		# 평가 & 시각화용 real 값
 		y_test_real = y_seq_real[split_idx_seq:]
-		test_dates_seq = date_seq[split_idx_seq:]
 
 		# 원본 df 기준 split index (window offset 고려)
 		# self.split_idx = window_size + split_idx_seq
 		self.split_idx = len(df) - len(y_test_real)
 
+		# 학습 구간 뒤 10% 는 EarlyStopping 검증용 (예전 validation_split=0.1 과 같은 구간)
+		n_fit = int(n_train * (1.0 - VALIDATION_SPLIT))
+
 
 		# 5. LSTM 모델 정의
 		timesteps = X_train_seq.shape[1]
 		feature_dim = X_train_seq.shape[2]
 
-		model = Sequential(
-			[
-				LSTM(64, input_shape=(timesteps, feature_dim)),
-				Dense(32, activation="relu"),
-				Dense(1),
-			]
-		)
-
-		model.compile(optimizer="adam", loss="mse")
+		model = self._build_network(timesteps, feature_dim, horizon)
 
 		early_stopping = EarlyStopping(
 			monitor="val_loss",
@@ -136,28 +201,43 @@ class LSTMPriceModel(BasePriceModel):
 			restore_best_weights=True,
 		)
 
-		# 6. 학습
+		# 6. 학습 (batch 단위로만 복사해서 넘긴다, 순서 유지)
 		history = model.fit(
-			X_train_seq,
-			y_train_scaled,
-			validation_split=0.1,
+			_WindowBatches(X_train_seq[:n_fit], y_train_scaled[:n_fit]),
+			validation_data=_WindowBatches(X_train_seq[n_fit:], y_train_scaled[n_fit:]),
 			epochs=50,
-			batch_size=64,
 			callbacks=[early_stopping],
-			shuffle=False,
+			shuffle=False,		# PyDataset 은 기본값이면 batch 순서를 섞는다
 			verbose=0,		# Streamlit 로그 과한 출력 방지
 		)
 
 		self.model = model
 
-		# 7. 테스트 구간 예측 및 역스케일링
-		y_pred_scaled = model.predict(X_test_seq).flatten()
-		y_pred_lstm = (
+		# 7. 테스트 구간 예측 (1-step 기준) 및 성능 지표
+		self._set_test_metrics(y_test_real, self._predict_windows(X_test_seq))
+
+		# ---- 여기부터 추가: 시계열 간격(frequency) 및 마지막 시점 저장 ----
+		dates_dt = pd.to_datetime(df["date"])
+		freq = dates_dt.diff().median()
+		# 데이터가 너무 적거나 이상하면 fallback
+		if pd.isna(freq):
+			freq = pd.Timedelta(minutes=10)
+
+		self.freq = freq
+		self.last_date = dates_dt.iloc[-1]
+
+
+	def _predict_windows(self, windows: np.ndarray) -> np.ndarray:
+		"""window 묶음 → 1-step 예측 가격 (원래 단위). multi-horizon 이면 첫 스텝 출력 사용"""
+		y_pred_scaled = self.model.predict(_WindowBatches(windows), verbose=0)[:, 0]
+		return (
 			self.scaler_y.inverse_transform(y_pred_scaled.reshape(-1, 1))
 			.flatten()
 		)
 
-		# 8. 성능 지표 (원래 단위 기준)
+
+	def _set_test_metrics(self, y_test_real: np.ndarray, y_pred_lstm: np.ndarray):
+		# 성능 지표 (원래 단위 기준)
 		rmse_lstm = np.sqrt(mean_squared_error(y_test_real, y_pred_lstm))
 		r2_lstm = r2_score(y_test_real, y_pred_lstm)
 
@@ -166,117 +246,146 @@ class LSTMPriceModel(BasePriceModel):
 		self.rmse = rmse_lstm
 		self.r2 = r2_lstm
 
-		# ---- 여기부터 추가: 시계열 간격(frequency) 및 마지막 시점 저장 ----
-		dates_dt = pd.to_datetime(df["date"])
-		freq = dates_dt.diff().median()
-		# 데이터가 너무 적거나 이상하면 fallback
-		if pd.isna(freq):
-			freq = pd.Timedelta(minutes=10)
-
-		self.freq = freq
-		self.last_date = dates_dt.iloc[-1]		
-
 
-	def predict_test(self):
+	def _evaluate(self):
 		"""
-		검증 구간 예측 결과 반환
-		(RandomForestPriceModel / LightGBMPriceModel 과 인터페이스 동일)
+		저장된 스케일러 / split_idx 기준으로 현재 df 의 검증 구간을 다시 예측.
+		(artifact 로드 후 io.load_or_train_model 이 최신 df_ml 을 붙이고 호출한다)
 		"""
-		return (
-			self.y_test,
-			self.y_pred,
-			self.split_idx,
-			self.rmse,
-			self.r2,
-		)
+		X_scaled = self.scaler_X.transform(
+			self.df[self._lstm_features()].to_numpy(dtype=float)
+		).astype(np.float32)
+		X_seq = sliding_windows(X_scaled, self.window_size)
 
+		start = min(max(self.split_idx - self.window_size, 0), max(len(X_seq) - 1, 0))
+		y_test_real = self.df["price"].to_numpy(dtype=float)[self.window_size + start:]
+		self.split_idx = len(self.df) - len(y_test_real)
 
-	def predict_future(self, steps: int):
-		"""
-		공식적으로는 LSTM을 '백테스트/시계열 패턴 분석용'으로만 사용하고,
-		미래 예측은 트리 기반 모델(RF/LightGBM)에 맡기기로 했음.
+		self._set_test_metrics(y_test_real, self._predict_windows(X_seq[start:]))
 
-		※ 아래에 _predict_future_naive()로 실험용 구현은 남겨두었지만,
-		   실제 앱에서는 사용하지 않고, 이 메서드는 항상 NotImplementedError를 던진다.
-		"""
-		raise NotImplementedError(
-			"LSTM 모델은 현재 미래 예측 기능(predict_future)이 비활성화되어 있습니다.\n"
-			"백테스트 및 과거 구간 예측 평가용으로만 사용하세요."
+
+	@staticmethod
+	def _build_network(timesteps: int, feature_dim: int, horizon: int = 1) -> Sequential:
+		model = Sequential(
+			[
+				LSTM(64, input_shape=(timesteps, feature_dim)),
+				Dense(32, activation="relu"),
+				Dense(horizon),
+			]
 		)
 
+		model.compile(optimizer="adam", loss="mse")
+		return model
+
 
-	# def predict_future(self, steps: int):
-	def predict_future_naive(self, steps: int):		# 구현했던 기록 남겨놓는 용도. 현재 사용하지 않습니다. (개판이라)
+	def _infer_fn(self):
+		"""
+		단일 forward 용 컴파일된 추론 함수.
+		입력 shape 이 (1, window, F) 로 고정이라 처음 1번만 trace 된다.
 		"""
-		[실험용] LSTM naive roll-out 기반 미래 예측 구현.
+		if self._infer is None:
+			model = self.model
+
+			@tf.function(reduce_retracing=True)
+			def infer(x):
+				return model(x, training=False)
 
-		- 실제 앱에서는 사용하지 않는다.
-		- 추후 연구/실험용으로 사용할 수 있도록 남겨둔 코드.
+			self._infer = infer
+		return self._infer
 
-		※ 문제점
-		  - price만 업데이트하고 기타 feature(RSI, Bollinger 등)는 고정이라
-		    멀티스텝 예측에서 예측선이 평균값 근처로 수렴/붕괴하는 현상이 발생.
-		  - 제대로 쓰려면 step마다 feature 재계산이 필요함.
 
-		return: DataFrame(date, price)
+	def _last_window(self) -> np.ndarray:
+		"""마지막 window_size 개 봉 (스케일 적용) → (1, window, F) float32 버퍼"""
+		X_last = self.df[self._lstm_features()].iloc[-self.window_size:].to_numpy(dtype=float)
+		return self.scaler_X.transform(X_last).astype(np.float32)[None]
+
+
+	def save_artifact(self, path: Path) -> dict:
 		"""
-		# 0. 사전 체크
-		if self.model is None or self.X_seq is None:
-			raise RuntimeError("먼저 train()을 호출해야 합니다.")
-
-		if self.price_feat_index is None:
-			# price가 feature에 포함되어 있지 않으면, 현재 로직으로는 미래 예측 불가
-			raise NotImplementedError(
-				"'price' 컬럼이 features 목록에 없어 LSTM 미래 예측을 수행할 수 없습니다."
-			)
+		Keras 가중치(.weights.h5) + 스케일러 + 검증 구간 예측만 저장.
+		시퀀스 텐서(X_seq, N × window × F)와 학습 df 는 저장하지 않는다.
+		"""
+		path = Path(path)
+		self.model.save_weights(str(path / "lstm.weights.h5"))
 
-		if self.freq is None or self.last_date is None:
-			raise RuntimeError("시계열 간격(freq) 또는 last_date 정보가 없습니다. train()이 제대로 수행됐는지 확인하세요.")
+		save_scaler(path, "scaler_X", self.scaler_X)
+		save_scaler(path, "scaler_y", self.scaler_y)
+		save_arrays(path, y_test=self.y_test, y_pred=self.y_pred)
 
-		# 1. 마지막 시퀀스를 복사해서 시작점으로 사용
-		#    shape: (window_size, feature_dim)
-		last_seq = self.X_seq[-1].copy()
-		window_size, feature_dim = last_seq.shape
+		return {
+			"window_size": self.window_size,
+			"horizon": self.horizon,
+			"feature_dim": int(self.model.input_shape[-1]),
+			"price_feat_index": self.price_feat_index,
+			"freq": self.freq,
+			"last_date": self.last_date,
+		}
 
-		future_scaled = []
-		future_real = []
-		future_dates = []
 
-		current_date = self.last_date
+	def load_artifact(self, path: Path, meta: dict):
+		path = Path(path)
 
-		for step in range(steps):
-			# 2-1. 현재 window로 다음 시점 예측 (scaled space)
-			input_batch = last_seq.reshape(1, window_size, feature_dim)
-            # model.predict 결과: shape (1, 1)
-			next_scaled = self.model.predict(input_batch, verbose=0).flatten()[0]
+		self.window_size = meta["window_size"]
+		self.horizon = meta.get("horizon", 1)
+		self.price_feat_index = meta["price_feat_index"]
+		self.freq = pd.Timedelta(meta["freq"]) if meta.get("freq") else None
+		self.last_date = pd.Timestamp(meta["last_date"]) if meta.get("last_date") else None
 
-			# 2-2. 역스케일링해서 실제 가격 단위로 변환
-			next_real = (
-				self.scaler_y.inverse_transform(np.array([[next_scaled]]))
-				.flatten()[0]
-			)
+		self.model = self._build_network(self.window_size, meta["feature_dim"], self.horizon)
+		self.model.load_weights(str(path / "lstm.weights.h5"))
+		self._infer = None
+
+		load_scaler(path, "scaler_X", self.scaler_X)
+		load_scaler(path, "scaler_y", self.scaler_y)
+
+		# 검증 구간 값은 memory-map 으로 연다 (대시보드 그래프용)
+		y_test = load_array(path, "y_test")
+		y_pred = load_array(path, "y_pred")
+		self.y_test = pd.Series(y_test) if y_test is not None else None
+		self.y_pred = pd.Series(y_pred) if y_pred is not None else None
+
+
+	def predict_test(self):
+		"""
+		검증 구간 예측 결과 반환
+		(RandomForestPriceModel / LightGBMPriceModel 과 인터페이스 동일)
+		"""
+		return (
+			self.y_test,
+			self.y_pred,
+			self.split_idx,
+			self.rmse,
+			self.r2,
+		)
 
-			# 2-3. 날짜 갱신
-			current_date = current_date + self.freq
 
-			future_scaled.append(next_scaled)
-			future_real.append(next_real)
-			future_dates.append(current_date)
+	def predict_future(self, steps: int, freq: str = "30min") -> pd.DataFrame:
+		"""
+		향후 steps(30분 단위) 시점 예측선. return: DataFrame(date, price)
 
-			# 2-4. window roll:
-			#      - 앞의 것 한 칸씩 땡기고
-			#      - 맨 뒤 row 를 "최근 상태"로 채운 후, price 차원만 업데이트
-			new_seq = np.roll(last_seq, shift=-1, axis=0)  # 위로 한 칸씩 당김
-			new_seq[-1] = new_seq[-2]                       # 마지막 row 를 직전 row로 복사
-			new_seq[-1, self.price_feat_index] = next_scaled  # price 차원을 새 예측값으로 교체
+		- horizon == 1: 1-step roll-out (_LSTMRollout)
+		  다음 봉의 lag / 시간 / RSI / Bollinger 는 트리 모델과 같은 엔진(models/forecast.py)이 갱신하므로
+		  예전 naive roll-out 처럼 price 외 feature 가 고정돼서 예측선이 무너지지 않는다
+		- horizon > 1: 마지막 window 로 forward 1번 → horizon 스텝을 한꺼번에 낸다
+		  (steps 가 horizon 보다 길면 ValueError: 짧은 예측선이 앙상블에서 다른 멤버와 조용히 섞이지 않도록)
+		"""
+		if self.model is None or self.df is None or self.features is None:
+			raise ValueError("모델이 아직 학습되지 않았습니다. 먼저 train()을 호출하세요.")
 
-			last_seq = new_seq
+		if self.horizon == 1:
+			return _LSTMRollout(self, freq=freq).run(steps)
 
-		# 3. 결과 DataFrame 생성 (대시보드에서 기대하는 형태)
-		future_df = pd.DataFrame({
-			"date": future_dates,
-			"price": future_real,
-		})
+		if steps > self.horizon:
+			raise ValueError(
+				f"horizon={self.horizon} 인 LSTM 은 {self.horizon} 스텝까지만 예측할 수 있습니다 (요청 {steps} 스텝)."
+			)
 
-		return future_df
+		y_scaled = np.asarray(self._infer_fn()(self._last_window()))[0, :steps]
+		prices = self.scaler_y.inverse_transform(y_scaled.reshape(-1, 1)).flatten()
 
+		step = pd.Timedelta(freq)
+		last_date = pd.Timestamp(self.df["date"].iloc[-1])
+		return pd.DataFrame({
+			"date": pd.date_range(start=last_date + step, periods=len(prices), freq=step),
+			"price": prices,
+		})
@@ -1,22 +1,51 @@
 # models/neuralprophet_model.py
 
+import os
+from pathlib import Path
+
+import joblib
 import numpy as np
 import pandas as pd
+import torch
 
 from neuralprophet import NeuralProphet
+from neuralprophet.logger import MetricsLogger
 
+from .artifact import load_array, save_arrays
 from .base import BasePriceModel
 
 
+# NeuralProphet 객체에서 artifact 에 넣지 않는 속성.
+# TimeNet / Trainer 는 학습 데이터 로더까지 물고 있어서 pickle 하면 GB 단위가 된다
+# (예전에 "저장한거 불러오면 메모리 에러" 의 원인). TimeNet 은 state_dict 만 따로 저장한다.
+_NP_RUNTIME_ATTRS = ("model", "trainer", "metrics_logger")
+
+
+def _predict(m: NeuralProphet, df: pd.DataFrame) -> pd.DataFrame:
+	"""
+	m.predict 는 입력의 future regressor(GPT_Score)가 한 값뿐이면 그 regressor 를 모델 설정에서 영구히 지운다
+	(TimeNet 가중치는 남아 있어서, 이후 예측에서 regressor 가 빠지고 저장한 artifact 는 다시 로드되지 않는다).
+	호출 전 설정을 되돌려 놓아 예측마다 같은 모델 상태에서 시작하게 한다.
+	"""
+	regressors = m.config_regressors.regressors
+	saved = None if regressors is None else regressors.copy()
+	try:
+		return m.predict(df)
+	finally:
+		m.config_regressors.regressors = saved
+
+
 class NeuralProphetPriceModel(BasePriceModel):
 	def __init__(
 		self,
 		forecast_horizon: int = 144,  # 3일(30분단위) = 3 * 24 * 2 = 144
 		n_lags: int = 240,           # 과거 5일(30분단위) = 5 * 24 * 2 = 240
+		epochs: int | None = None,   # None 이면 NeuralProphet 이 데이터 크기로 결정 (테스트에서 작게 지정)
 	):
 		# 하이퍼파라미터
 		self.forecast_horizon = forecast_horizon
 		self.n_lags = n_lags
+		self.epochs = epochs
 
 		# RF / LGBM / LSTM 과 공통 필드
 		self.model = None
@@ -85,7 +114,6 @@ class NeuralProphetPriceModel(BasePriceModel):
 		self.split_idx = int(n * 0.8)
 
 		df_train = df_np.iloc[: self.split_idx].copy()
-		df_full = df_np.copy()  # 전체 구간 예측용
 
 		# 모델 정의
 		m = NeuralProphet(
@@ -98,6 +126,7 @@ class NeuralProphetPriceModel(BasePriceModel):
 			yearly_seasonality=False,
 			learning_rate=0.01,
 			growth="off",
+			epochs=getattr(self, "epochs", None),
 		)
 
 		# GPT_Score regressor 등록
@@ -112,33 +141,45 @@ class NeuralProphetPriceModel(BasePriceModel):
 		)
 
 		self.model = m
+		self._evaluate()
 
-		# -------------------------------------------------
-		# 테스트 구간 평가 (다른 모델들과 동일하게 "뒤 20%" 사용)
-		# -------------------------------------------------
+	def _evaluate(self):
+		"""
+		뒤 20% 검증 구간(df_np[split_idx:]) 1-step 예측 / RMSE / R2 갱신.
+		artifact 로드 후에도 새 df_np 기준으로 다시 호출된다 (저장된 예측을 새 날짜에 붙이지 않도록).
+		"""
 		try:
 			from sklearn.metrics import mean_squared_error, r2_score
 
-			# 전체 구간에 대해 예측 (history + pseudo-forecast)
-			fc_hist = m.predict(df_full)
+			m: NeuralProphet = self.model
 
-			# y: 실제 값
-			y_all = fc_hist["y"].values
+			# 검증 구간 + 그 앞 n_lags 개 봉(AR 입력)만 예측한다.
+			# predict(df) 는 마지막 n_forecasts 개 봉의 예측을 돌려주지 않으므로
+			# 미래 구간을 붙인 future df(n_historic_predictions=True)로 검증 구간 끝까지 1-step 예측을 받는다
+			start = max(self.split_idx - self.n_lags, 0)
+			future = m.make_future_dataframe(
+				self.df_np.iloc[start:],
+				periods=self.forecast_horizon,
+				n_historic_predictions=True,
+				regressors_df=pd.DataFrame({"GPT_Score": [0.0] * self.forecast_horizon}),
+			)
+			fc_hist = _predict(m, future)
 
 			# yhat1: 1-step-ahead 예측으로 간주
 			if "yhat1" in fc_hist.columns:
-				yhat1_all = fc_hist["yhat1"].values
+				yhat_col = "yhat1"
 			else:
 				# 혹시 yhat1이 없는 구조라면, 첫 번째 yhat 계열을 사용
 				yhat_cols = [c for c in fc_hist.columns if c.startswith("yhat")]
 				if not yhat_cols:
 					raise RuntimeError("NeuralProphet 결과에 yhat 계열 컬럼이 없습니다.")
-				yhat1_all = fc_hist[yhat_cols[0]].values
+				yhat_col = yhat_cols[0]
 
 			# split_idx 이후를 테스트 구간으로 사용
-			test_start = self.split_idx
-			y_test = y_all[test_start:]
-			y_pred = yhat1_all[test_start:]
+			# (NeuralProphet 이 빠진 봉을 채워 넣어 행 수가 달라질 수 있으므로 ds 로 맞춘다)
+			df_test = self.df_np.iloc[self.split_idx:]
+			y_test = df_test["y"].to_numpy()
+			y_pred = fc_hist.set_index("ds")[yhat_col].reindex(df_test["ds"]).to_numpy()
 
 			if len(y_test) > 0:
 				rmse = float(np.sqrt(mean_squared_error(y_test, y_pred)))
@@ -161,6 +202,59 @@ class NeuralProphetPriceModel(BasePriceModel):
 			self.rmse = None
 			self.r2 = None
 
+	def save_artifact(self, path: Path) -> dict:
+		"""
+		TimeNet state_dict + NeuralProphet 설정(정규화 파라미터 / 시즌성 / changepoint 등)만 저장.
+		df / df_np / Lightning Trainer 는 저장하지 않는다.
+		"""
+		path = Path(path)
+		m: NeuralProphet = self.model
+
+		torch.save(m.model.state_dict(), path / "timenet.pt")
+		joblib.dump(
+			{k: v for k, v in m.__dict__.items() if k not in _NP_RUNTIME_ATTRS},
+			path / "forecaster.joblib",
+		)
+		save_arrays(path, y_test=self.y_test, y_pred=self.y_pred)
+
+		return {
+			"forecast_horizon": self.forecast_horizon,
+			"n_lags": self.n_lags,
+			"trained_until": self.trained_until,
+		}
+
+	def load_artifact(self, path: Path, meta: dict):
+		"""
+		설정으로 빈 TimeNet 을 다시 만든 뒤 state_dict 를 채운다.
+		state_dict 는 mmap 으로 열어서 파라미터에 복사하는 만큼만 읽는다.
+		"""
+		path = Path(path)
+
+		self.forecast_horizon = meta["forecast_horizon"]
+		self.n_lags = meta["n_lags"]
+		if meta.get("trained_until") is not None:
+			self.trained_until = pd.Timestamp(meta["trained_until"])
+
+		m = NeuralProphet.__new__(NeuralProphet)
+		m.__dict__.update(joblib.load(path / "forecaster.joblib"))
+		m.metrics_logger = MetricsLogger(save_dir=os.getcwd())
+
+		m._init_model()
+		state = torch.load(path / "timenet.pt", map_location="cpu", weights_only=True, mmap=True)
+		if m.config_regressors.regressors is None:
+			# 예전 artifact: 예측 중 regressor 설정이 지워진 채 저장돼 TimeNet 에 없는 가중치가 남아 있다
+			state = {k: v for k, v in state.items() if not k.startswith("future_regressors.")}
+		m.model.load_state_dict(state)
+		m.model.eval()
+		m.restore_trainer()
+
+		self.model = m
+
+		y_test = load_array(path, "y_test")
+		y_pred = load_array(path, "y_pred")
+		self.y_test = pd.Series(y_test) if y_test is not None else pd.Series([], dtype=float)
+		self.y_pred = pd.Series(y_pred) if y_pred is not None else pd.Series([], dtype=float)
+
 	def predict_test(self):
 		"""
 		RandomForestPriceModel / LightGBMPriceModel / LSTMPriceModel 과
@@ -186,7 +280,10 @@ class NeuralProphetPriceModel(BasePriceModel):
 			raise RuntimeError("NeuralProphet 모델이 학습되지 않았습니다. 먼저 train()을 호출하세요.")
 
 		m: NeuralProphet = self.model
-		df_np = self.df_np
+
+		# 미래 구간 입력은 마지막 n_lags 개 봉만 쓰므로, 전체 히스토리 대신 끝부분만 넘긴다
+		# (결측 보간 여유로 n_lags 만큼 더 붙임)
+		df_np = self.df_np.iloc[-2 * self.n_lags:]
 
 		# 미래 GPT 스코어 (공지사항 없음 가정 → 0.0)
 		future_regressors = pd.DataFrame({
@@ -201,7 +298,7 @@ class NeuralProphetPriceModel(BasePriceModel):
 			regressors_df=future_regressors,
 		)
 
-		forecast = m.predict(future)
+		forecast = _predict(m, future)
 
 		# y가 NaN인 행만 미래 구간
 		future_rows = forecast[forecast["y"].isnull()].copy()
@@ -0,0 +1,261 @@
+# models/registry.py
+# trained_models/ 아래 artifact 목록 관리: 신선도(stale) 판정 + 디스크 예산 기준 LRU 정리
+#
+# 별도 인덱스 파일 없이 artifact 마다 이미 있는 meta.json 을 그대로 레지스트리로 쓴다.
+# (배치 예측 워커 여러 개가 동시에 저장해도 공용 파일을 고쳐 쓰는 경합이 없다)
+#
+#   trained_models/lgbm/lgbm_item_123/
+#     meta.json        # + registry 필드: trained_until / data_until / n_rows / price_ref / feature_hash / saved_at / size_bytes
+#     .last_access     # 빈 파일, mtime = 마지막 로드 시각 (LRU 기준)
+#
+# - stale: 저장한 지 max_age 가 지났거나, feature 구성이 바뀌었거나,
+#          학습 이후 새 봉 비율 / 가격 수준 변화(drift)가 기준을 넘은 모델
+# - evict_lru: 전체 크기가 max_bytes 를 넘으면 오래 안 쓴 artifact 부터 지운다
+#   (예전 .pkl 도 파일 mtime 을 접근 시각으로 보고 같이 정리)
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .artifact import META_FILE, read_meta
+
+
+ACCESS_FILE = ".last_access"
+
+STALE_MAX_AGE = pd.Timedelta(days=7)		# 저장 후 이 기간이 지나면 재학습
+STALE_MAX_NEW_ROWS = 0.25					# 저장 이후 새 봉이 저장 당시 데이터의 25% 를 넘으면 drift
+STALE_MAX_PRICE_DRIFT = 0.30				# 최근 가격 수준이 학습 당시 기준가 대비 ±30% 넘게 변하면 drift
+PRICE_REF_ROWS = 48							# 기준가: 저장 당시 데이터 마지막 하루치 중앙값
+
+# 디스크 예산 (MB). 환경변수로 조정, 0 이면 LRU 정리 안 함
+MODEL_DIR_MAX_MB = float(os.getenv("MODEL_DIR_MAX_MB", "2048"))
+
+
+def feature_hash(features) -> str | None:
+	if features is None:
+		return None
+	return hashlib.sha1(json.dumps(list(features)).encode()).hexdigest()[:12]
+
+
+def dir_size(path: Path) -> int:
+	path = Path(path)
+	if path.is_file():
+		return path.stat().st_size
+	return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def registry_meta(price_model) -> dict:
+	"""
+	save_model() 이 meta.json 에 같이 저장할 레지스트리 필드.
+	학습 df 가 붙어 있지 않은 모델(예: 예전 pkl 변환)은 데이터 관련 값이 None.
+	"""
+	df = getattr(price_model, "df", None)
+	features = getattr(price_model, "features", None)
+
+	meta = {
+		"feature_hash": feature_hash(features),
+		"saved_at": pd.Timestamp.now(),
+		"trained_until": None,
+		"data_until": None,
+		"n_rows": None,
+		"price_ref": None,
+	}
+
+	if df is not None and len(df) > 0 and "date" in df.columns:
+		# trained_until: 실제 학습에 쓴 마지막 봉 (split_idx 앞쪽, warm-start 모델은 train_watermark)
+		# data_until / n_rows / price_ref: 저장 시점에 모델이 본 데이터 전체 (검증 구간 포함) → drift 기준
+		split_idx = min(int(getattr(price_model, "split_idx", None) or len(df)), len(df))
+
+		meta["trained_until"] = getattr(price_model, "train_watermark", None) or df["date"].iloc[split_idx - 1]
+		meta["data_until"] = df["date"].iloc[-1]
+		meta["n_rows"] = len(df)
+		meta["price_ref"] = float(np.median(df["price"].to_numpy(dtype=float)[-PRICE_REF_ROWS:]))
+
+	return meta
+
+
+def stale_reason(
+	meta: dict | None,
+	df_ml: pd.DataFrame,
+	features,
+	max_age: pd.Timedelta = STALE_MAX_AGE,
+	max_new_rows: float = STALE_MAX_NEW_ROWS,
+	max_price_drift: float = STALE_MAX_PRICE_DRIFT,
+) -> str | None:
+	"""
+	저장된 artifact 를 지금 데이터에 그대로 써도 되는지 판정.
+
+	return: None(사용 가능) | "features" | "age" | "drift_rows" | "drift_price"
+	(레지스트리 필드가 없는 예전 artifact 는 판정할 근거가 없어서 None)
+	"""
+	if meta is None:
+		return None
+
+	if meta.get("feature_hash") is not None and meta["feature_hash"] != feature_hash(features):
+		return "features"
+
+	saved_at = meta.get("saved_at")
+	if saved_at is not None and pd.Timestamp.now() - pd.Timestamp(saved_at) > max_age:
+		return "age"
+
+	data_until = meta.get("data_until")
+	n_rows = meta.get("n_rows")
+	if data_until is None or not n_rows:
+		return None
+
+	df_new = df_ml[df_ml["date"] > pd.Timestamp(data_until)]
+	if len(df_new) > n_rows * max_new_rows:
+		return "drift_rows"
+
+	price_ref = meta.get("price_ref")
+	if price_ref and len(df_new) > 0:
+		price_now = float(np.median(df_new["price"].to_numpy(dtype=float)[-PRICE_REF_ROWS:]))
+		if abs(price_now / price_ref - 1.0) > max_price_drift:
+			return "drift_price"
+
+	return None
+
+
+class ModelRegistry:
+	"""trained_models/ 디렉터리의 artifact 목록 조회 / 접근 기록 / 정리"""
+
+	def __init__(self, model_dir: Path):
+		self.model_dir = Path(model_dir)
+
+	# -----------------------------------------------------
+	# 조회
+	# -----------------------------------------------------
+	def touch(self, path: Path):
+		"""로드 시 호출: 마지막 접근 시각 갱신 (LRU 기준)"""
+		try:
+			(Path(path) / ACCESS_FILE).touch()
+		except OSError:
+			pass
+
+	def _last_access(self, path: Path) -> float:
+		access = path / ACCESS_FILE
+		if access.exists():
+			return access.stat().st_mtime
+		meta = path / META_FILE
+		return (meta if meta.exists() else path).stat().st_mtime
+
+	def entries(self) -> pd.DataFrame:
+		"""
+		artifact 1개당 1행.
+		columns: model_key, item_id, path, format("artifact" | "pkl"), size_bytes,
+		         saved_at, last_access, trained_until, n_rows, feature_hash
+		"""
+		rows = []
+		if not self.model_dir.exists():
+			return pd.DataFrame(rows)
+
+		for path in sorted(self.model_dir.glob("*/*")):
+			# 저장 중인 임시 디렉터리(.tmp / .old)는 건너뜀
+			if path.suffix in (".tmp", ".old"):
+				continue
+
+			if path.is_dir():
+				meta = read_meta(path) or {}
+				rows.append({
+					"model_key": meta.get("model_key", path.parent.name),
+					"item_id": meta.get("item_id"),
+					"path": str(path),
+					"format": "artifact",
+					"size_bytes": meta.get("size_bytes") or dir_size(path),
+					"saved_at": meta.get("saved_at"),
+					"last_access": self._last_access(path),
+					"trained_until": meta.get("trained_until"),
+					"n_rows": meta.get("n_rows"),
+					"feature_hash": meta.get("feature_hash"),
+				})
+			elif path.suffix == ".pkl":
+				stat = path.stat()
+				prefix = f"{path.parent.name}_item_"
+				rows.append({
+					"model_key": path.parent.name,
+					"item_id": int(path.stem[len(prefix):]) if path.stem.startswith(prefix) else None,
+					"path": str(path),
+					"format": "pkl",
+					"size_bytes": stat.st_size,
+					"saved_at": None,
+					"last_access": stat.st_mtime,
+					"trained_until": None,
+					"n_rows": None,
+					"feature_hash": None,
+				})
+
+		df = pd.DataFrame(rows)
+		if not df.empty:
+			df["last_access"] = pd.to_datetime(df["last_access"], unit="s")
+			df["saved_at"] = pd.to_datetime(df["saved_at"])
+		return df
+
+	def total_bytes(self) -> int:
+		df = self.entries()
+		return int(df["size_bytes"].sum()) if not df.empty else 0
+
+	# -----------------------------------------------------
+	# 정리
+	# -----------------------------------------------------
+	@staticmethod
+	def remove(path) -> bool:
+		path = Path(path)
+		try:
+			if path.is_dir():
+				shutil.rmtree(path)
+			elif path.exists():
+				path.unlink()
+			else:
+				return False
+		except OSError as e:
+			print(f"[WARN] 모델 삭제 실패 ({path}): {e}")
+			return False
+		return True
+
+	def evict_lru(self, max_bytes: float, keep=()) -> list[str]:
+		"""
+		전체 크기가 max_bytes 이하가 될 때까지 마지막 접근이 오래된 artifact 부터 삭제.
+		keep: 지우면 안 되는 경로 (방금 저장한 artifact 등)
+
+		return: 삭제한 경로 목록
+		"""
+		df = self.entries()
+		if df.empty or max_bytes <= 0:
+			return []
+
+		total = int(df["size_bytes"].sum())
+		keep = {str(Path(p)) for p in keep}
+		removed = []
+
+		for row in df.sort_values("last_access").itertuples():
+			if total <= max_bytes:
+				break
+			if row.path in keep:
+				continue
+			if self.remove(row.path):
+				total -= int(row.size_bytes)
+				removed.append(row.path)
+
+		return removed
+
+	def evict_older_than(self, max_age: pd.Timedelta) -> list[str]:
+		"""max_age 동안 한 번도 로드되지 않은 artifact 삭제"""
+		df = self.entries()
+		if df.empty:
+			return []
+
+		cutoff = pd.Timestamp(time.time(), unit="s") - max_age
+		return [row.path for row in df[df["last_access"] < cutoff].itertuples() if self.remove(row.path)]
+
+	def clear(self) -> int:
+		"""모든 artifact 삭제 (모델 종류별 하위 디렉터리는 남긴다). return: 삭제 개수"""
+		df = self.entries()
+		if df.empty:
+			return 0
+		return sum(self.remove(p) for p in df["path"])
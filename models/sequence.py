@@ -0,0 +1,34 @@
+# models/sequence.py
+# LSTM 입력 시퀀스(window) 헬퍼
+#
+# (N, F) 배열을 (N - window, window, F) 시퀀스로 "복사 없이" 보여준다.
+# - sliding_window_view 는 stride 만 바꾼 view 라서 window 수만큼 메모리가 늘지 않는다
+# - 실제 복사는 모델에 넘기는 batch 1개(batch_size × window × F) 크기만큼만 일어난다
+# (예전에는 window 를 list 에 쌓은 뒤 np.array 로 한 번 더 복사해서 피크 메모리가 2배였다)
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def sliding_windows(X: np.ndarray, window_size: int) -> np.ndarray:
+	"""
+	X: (N, F) → (N - window_size, window_size, F) read-only view
+
+	i 번째 window = X[i : i + window_size], 타깃은 i + window_size 번째 행
+	(예전 for 루프의 X[i - window_size : i] → y[i] 와 같은 짝)
+	"""
+	X = np.asarray(X)
+	if len(X) <= window_size:
+		return np.empty((0, window_size, X.shape[1]), dtype=X.dtype)
+
+	# (N - window_size, F, window_size) view → 축만 바꿔서 (.., window, F)
+	return sliding_window_view(X[:-1], window_size, axis=0).transpose(0, 2, 1)
+
+
+def window_batch(windows: np.ndarray, index: int, batch_size: int) -> np.ndarray:
+	"""index 번째 batch 만 연속 메모리로 복사 (Keras / TF 에 넘길 입력)"""
+	return np.ascontiguousarray(windows[index * batch_size : (index + 1) * batch_size])
+
+
+def n_batches(n_rows: int, batch_size: int) -> int:
+	return (n_rows + batch_size - 1) // batch_size
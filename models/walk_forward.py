@@ -0,0 +1,190 @@
+# models/walk_forward.py
+# Walk-forward (rolling-origin) 평가: 모델마다 K 개의 expanding window 로 학습 → 검증 반복
+#
+# - 모든 모델의 train() 은 "앞 80% 학습 / 뒤 20% 검증" 고정 split 이라,
+#   fold 는 df_ml 의 앞부분(prefix)을 잘라서 만든다
+#     fold k 의 길이 = n × 0.8^(K-1-k)  → fold k 의 검증 구간(뒤 20%)이 fold k-1 의 끝에서 이어진다
+#     (마지막 fold = 전체 df_ml = 대시보드에 표시되는 RMSE / R² 와 같은 구간)
+# - fold 데이터는 make_ml_dataset() 이 끝난 df_ml 을 한 번만 잘라서 모든 모델이 같이 쓴다
+#   (lag / RSI 등은 과거 값만 보므로 prefix 를 잘라도 feature 를 다시 계산할 필요가 없다)
+# - 모델끼리는 ThreadPoolExecutor 로 동시에 돌리고, 코어 몫은 앙상블 runner 와 같은 방식으로 나눈다
+# - LGBM / XGB 는 warm_start=True 면 첫 fold 만 학습하고 이후 fold 는 update() 로 새 봉만 이어 학습
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from threadpoolctl import threadpool_limits
+
+from .ensemble import _torch_threads, member_thread_caps
+from .factory import get_model
+
+
+WALK_FORWARD_KEYS = ["rf", "lgbm", "xgb", "lstm", "np"]
+TRAIN_RATIO = 0.8			# 각 모델 train() 의 고정 split 비율
+MIN_FOLD_ROWS = 300			# 대시보드와 같은 최소 학습 데이터 수
+
+
+def fold_lengths(n_rows: int, n_folds: int, min_rows: int = MIN_FOLD_ROWS) -> list[int]:
+	"""
+	expanding window fold 별 prefix 길이 (오름차순).
+	min_rows 보다 짧은 fold 는 버린다.
+	"""
+	lengths = [int(n_rows * TRAIN_RATIO ** (n_folds - 1 - k)) for k in range(n_folds)]
+	return [n for n in lengths if n >= min_rows]
+
+
+def make_folds(df_ml: pd.DataFrame, n_folds: int, min_rows: int = MIN_FOLD_ROWS) -> list[dict]:
+	"""
+	fold 데이터 캐시: df_ml 을 fold 마다 한 번만 잘라 두고 모든 모델이 같은 DataFrame 을 쓴다.
+
+	return: [{"fold", "n_rows", "split_idx", "test_start", "test_end", "df"}, ...]
+	"""
+	folds = []
+	for k, n in enumerate(fold_lengths(len(df_ml), n_folds, min_rows)):
+		split_idx = int(n * TRAIN_RATIO)
+		folds.append({
+			"fold": k,
+			"n_rows": n,
+			"split_idx": split_idx,
+			"test_start": df_ml["date"].iloc[split_idx],
+			"test_end": df_ml["date"].iloc[n - 1],
+			"df": df_ml.iloc[:n].reset_index(drop=True),
+		})
+	return folds
+
+
+def _fold_metrics(m) -> dict:
+	"""predict_test() 결과 → rmse / mae / r2 (NaN 예측은 제외)"""
+	y_test, y_pred, _, _, _ = m.predict_test()
+
+	y_true = np.asarray(y_test, dtype=float).ravel()
+	y_hat = np.asarray(y_pred, dtype=float).ravel()
+	mask = np.isfinite(y_true) & np.isfinite(y_hat)
+
+	if not mask.any():
+		return {"n_test": 0, "rmse": np.nan, "mae": np.nan, "r2": np.nan}
+
+	y_true, y_hat = y_true[mask], y_hat[mask]
+	return {
+		"n_test": int(mask.sum()),
+		"rmse": float(np.sqrt(mean_squared_error(y_true, y_hat))),
+		"mae": float(mean_absolute_error(y_true, y_hat)),
+		"r2": float(r2_score(y_true, y_hat)) if len(y_true) > 1 else np.nan,
+	}
+
+
+def _run_model_folds(
+	key: str,
+	folds: list[dict],
+	features: list[str],
+	n_threads: int,
+	warm_start: bool,
+) -> list[dict]:
+	"""
+	모델 1개를 fold 순서대로 학습(또는 이어 학습) + 검증.
+	fold 하나가 실패해도 나머지 fold 는 계속 진행하고 error 컬럼에 남긴다.
+	"""
+	torch_cap = _torch_threads(n_threads) if key == "np" else nullcontext()
+
+	rows = []
+	m = None
+
+	with threadpool_limits(limits=n_threads, user_api="openmp"), torch_cap:
+		for fold in folds:
+			row = {
+				"model": key,
+				"fold": fold["fold"],
+				"n_train": fold["split_idx"],
+				"test_start": fold["test_start"],
+				"test_end": fold["test_end"],
+				"threads": n_threads,
+			}
+
+			start = time.perf_counter()
+			try:
+				mode = "trained"
+				if warm_start and m is not None and hasattr(m, "update"):
+					try:
+						# 새 봉이 MIN_UPDATE_ROWS 미만이면 트리 추가 없이 검증만 다시 한다
+						mode = "updated" if m.update(fold["df"], features) else "reused"
+					except ValueError:
+						m = None
+
+				if mode == "trained":
+					m = get_model(key)
+					m.set_n_jobs(n_threads)
+					m.train(fold["df"], features)
+
+				row["fit_sec"] = time.perf_counter() - start
+				row["mode"] = mode
+				row.update(_fold_metrics(m))
+
+			except Exception as e:
+				m = None
+				row["fit_sec"] = time.perf_counter() - start
+				row["error"] = str(e)
+
+			rows.append(row)
+
+	return rows
+
+
+def run_walk_forward(
+	df_ml: pd.DataFrame,
+	features: list[str],
+	model_keys: list[str] = WALK_FORWARD_KEYS,
+	n_folds: int = 5,
+	warm_start: bool = True,
+	n_threads: int | None = None,
+	min_rows: int = MIN_FOLD_ROWS,
+) -> pd.DataFrame:
+	"""
+	model_keys 각각을 n_folds 개 expanding window 로 평가.
+
+	return: (모델, fold) 당 1행 DataFrame
+	  model, fold, mode("trained" | "updated" | "reused"), n_train, n_test, test_start, test_end,
+	  rmse, mae, r2, fit_sec, threads (+ 실패한 fold 는 error)
+	"""
+	folds = make_folds(df_ml, n_folds, min_rows)
+	if not folds:
+		raise ValueError(f"fold 를 만들 데이터가 부족합니다. ({len(df_ml)}개, 최소 {min_rows}개)")
+
+	caps = member_thread_caps(model_keys, n_threads)
+
+	with ThreadPoolExecutor(max_workers=len(model_keys) or 1) as pool:
+		jobs = [
+			pool.submit(_run_model_folds, key, folds, features, caps[key], warm_start)
+			for key in model_keys
+		]
+		rows = [row for job in jobs for row in job.result()]
+
+	columns = [
+		"model", "fold", "mode", "n_train", "n_test", "test_start", "test_end",
+		"rmse", "mae", "r2", "fit_sec", "threads",
+	]
+	df = pd.DataFrame(rows)
+	return df.reindex(columns=columns + [c for c in df.columns if c not in columns])
+
+
+def summarize_walk_forward(df_folds: pd.DataFrame) -> pd.DataFrame:
+	"""
+	모델별 요약: fold 평균 / 표준편차 RMSE, 평균 R², 평균 / 합계 학습 시간.
+	RMSE 평균 오름차순 (정확도 vs 비용 비교용)
+	"""
+	return (
+		df_folds.groupby("model")
+		.agg(
+			n_folds=("rmse", "count"),
+			rmse_mean=("rmse", "mean"),
+			rmse_std=("rmse", "std"),
+			mae_mean=("mae", "mean"),
+			r2_mean=("r2", "mean"),
+			fit_sec_mean=("fit_sec", "mean"),
+			fit_sec_total=("fit_sec", "sum"),
+		)
+		.sort_values("rmse_mean")
+	)
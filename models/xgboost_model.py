@@ -1,11 +1,15 @@
 # models/xgboost_model.py
 
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
+import xgboost as xgb
 from xgboost import XGBRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 
-from .base import BasePriceModel
+from .base import MAX_TREES, MIN_UPDATE_ROWS, UPDATE_TREES, BasePriceModel, warm_start_rows
+from .forecast import recursive_forecast
 
 
 class XGBoostPriceModel(BasePriceModel):
@@ -18,6 +22,42 @@ class XGBoostPriceModel(BasePriceModel):
 		self.y_pred = None
 		self.rmse = None
 		self.r2 = None
+		self.train_watermark = None		# 마지막으로 학습에 쓴 봉의 date (warm-start 기준)
+
+	def _make_regressor(self, n_estimators: int = 500) -> XGBRegressor:
+		return XGBRegressor(
+			n_estimators=n_estimators,
+			learning_rate=0.05,
+			max_depth=6,
+			subsample=0.8,
+			colsample_bytree=0.8,
+			random_state=42,
+			n_jobs=self.n_jobs,
+			tree_method="hist",		# CPU/메모리 부담 줄이기용
+		)
+
+	def set_n_jobs(self, n_jobs: int):
+		"""
+		학습 / 예측 스레드 수 지정 (XGBoost nthread, threadpoolctl 에 기대지 않고 직접 넘긴다).
+		로드한 모델은 hot cache 의 다른 세션과 booster 를 같이 쓰므로,
+		값이 다르면 제자리에서 바꾸지 않고 booster 를 복사한 regressor 로 교체한다.
+		"""
+		self.n_jobs = n_jobs
+		if self.model is not None and self.model.get_params()["n_jobs"] != n_jobs:
+			model = self._make_regressor()
+			model.load_model(bytearray(self.model.get_booster().save_raw("json")))
+			self.model = model
+
+	def _evaluate(self):
+		"""뒤 20% 검증 구간 예측 / RMSE / R2 갱신"""
+		X_test = self.df[self.features].iloc[self.split_idx:]
+		y_test = self.df["price"].iloc[self.split_idx:]
+
+		self.y_test = y_test
+		self.y_pred = self.model.predict(X_test)
+
+		self.rmse = np.sqrt(mean_squared_error(y_test, self.y_pred))
+		self.r2 = r2_score(y_test, self.y_pred)
 
 	def train(self, df: pd.DataFrame, features: list[str]):
 		"""
@@ -29,35 +69,68 @@ class XGBoostPriceModel(BasePriceModel):
 		self.df = df
 		self.features = features
 
-		X = df[features]
-		y = df["price"]
-
 		# 시계열 유지: 앞 80% train, 뒤 20% test
 		self.split_idx = int(len(df) * 0.8)
 
-		X_train = X.iloc[:self.split_idx]
-		y_train = y.iloc[:self.split_idx]
-		X_test = X.iloc[self.split_idx:]
-		y_test = y.iloc[self.split_idx:]
+		X_train = df[features].iloc[:self.split_idx]
+		y_train = df["price"].iloc[:self.split_idx]
 
-		self.model = XGBRegressor(
-			n_estimators=500,
-			learning_rate=0.05,
-			max_depth=6,
-			subsample=0.8,
-			colsample_bytree=0.8,
-			random_state=42,
-			n_jobs=-1,
-			tree_method="hist",		# CPU/메모리 부담 줄이기용
+		self.model = self._make_regressor()
+		self.model.fit(X_train, y_train)
+
+		self.train_watermark = df["date"].iloc[self.split_idx - 1]
+		self._evaluate()
+
+	def update(self, df: pd.DataFrame, features: list[str], n_trees: int = UPDATE_TREES) -> int:
+		"""
+		저장된 booster 에서 이어서(xgb_model), train_watermark 이후 새 봉만으로 트리 n_trees 개 추가 학습.
+		LightGBMPriceModel.update 와 규칙 동일.
+
+		XGBRegressor.fit 은 hist 일 때 QuantileDMatrix 를 써서, 기존 트리 예측값이
+		새 데이터의 bin 경계 기준으로 어긋난다 (이어 학습 결과가 크게 틀어짐).
+		그래서 일반 DMatrix + xgb.train 으로 이어 학습한 뒤 regressor 에 다시 싣는다.
+
+		return: 추가 학습에 사용한 row 수
+		"""
+		if self.model is None or getattr(self, "train_watermark", None) is None:
+			raise ValueError("warm-start 할 학습 상태가 없습니다. 먼저 train()을 호출하세요.")
+		if list(features) != list(self.features):
+			raise ValueError("feature 구성이 바뀌어 warm-start 할 수 없습니다.")
+		if self.model.get_booster().num_boosted_rounds() + n_trees > MAX_TREES:
+			raise ValueError(f"트리 수가 {MAX_TREES}개를 넘어 전체 재학습이 필요합니다.")
+
+		self.df = df
+		self.split_idx = int(len(df) * 0.8)
+
+		df_new = warm_start_rows(df, self.train_watermark, self.split_idx)
+		if len(df_new) < MIN_UPDATE_ROWS:
+			self._evaluate()
+			return 0
+
+		model = self._make_regressor(n_estimators=n_trees)
+		booster = xgb.train(
+			model.get_xgb_params(),
+			xgb.DMatrix(df_new[features], label=df_new["price"]),
+			num_boost_round=n_trees,
+			xgb_model=self.model.get_booster(),
 		)
+		model.load_model(bytearray(booster.save_raw("json")))
+		self.model = model
 
-		self.model.fit(X_train, y_train)
+		self.train_watermark = df_new["date"].iloc[-1]
+		self._evaluate()
+		return len(df_new)
 
-		self.y_test = y_test
-		self.y_pred = self.model.predict(X_test)
+	def save_artifact(self, path: Path) -> dict:
+		"""booster 를 XGBoost UBJSON 포맷으로 저장. return: meta.json 에 추가할 값"""
+		self.model.save_model(str(Path(path) / "booster.ubj"))
+		return {"train_watermark": getattr(self, "train_watermark", None)}
 
-		self.rmse = np.sqrt(mean_squared_error(y_test, self.y_pred))
-		self.r2 = r2_score(y_test, self.y_pred)
+	def load_artifact(self, path: Path, meta: dict):
+		self.model = self._make_regressor()
+		self.model.load_model(str(Path(path) / "booster.ubj"))
+		if meta.get("train_watermark") is not None:
+			self.train_watermark = pd.Timestamp(meta["train_watermark"])
 
 	def predict_test(self):
 		"""
@@ -72,7 +145,7 @@ class XGBoostPriceModel(BasePriceModel):
 			self.r2,
 		)
 
-	def predict_future(self, steps: int, freq: str = "30T") -> pd.DataFrame:
+	def predict_future(self, steps: int, freq: str = "30min") -> pd.DataFrame:
 		"""
 		간단한 auto-regressive 방식의 미래 예측.
 
@@ -80,77 +153,16 @@ class XGBoostPriceModel(BasePriceModel):
 		- self.features: 모델이 사용하는 feature 컬럼 리스트
 		- steps: 앞으로 예측할 스텝 수 (30분 단위 기준 1일=48, 3일=144)
 		- freq: 시간 간격 (기본 30분)
+
+		실제 roll-out 은 models/forecast.py 의 공용 엔진(ring buffer 기반)이 담당한다.
 		"""
 		if self.model is None or self.df is None or self.features is None:
 			raise ValueError("모델이 아직 학습되지 않았습니다. 먼저 train()을 호출하세요.")
 
-		model: XGBRegressor = self.model
-		df_ml: pd.DataFrame = self.df
-		features = self.features
-
-		# 히스토리 복사 (index 정리)
-		history = df_ml.copy().reset_index(drop=True)
-
-		future_rows: list[dict] = []
-
-		for _ in range(steps):
-			last_row = history.iloc[-1].copy()
-
-			# 다음 시점 시간 계산
-			next_time = last_row["date"] + pd.Timedelta(freq)
-
-			# ---- 새 row 베이스 만들기 ----
-			new_row = last_row.copy()
-			new_row["date"] = next_time
-
-			# 1) 시간 관련 피처 갱신
-			if "hour" in new_row.index:
-				new_row["hour"] = next_time.hour
-			if "day_of_week" in new_row.index:
-				new_row["day_of_week"] = next_time.dayofweek
-
-			# 2) lag 피처 갱신 (있을 때만)
-			if "lag_30m" in new_row.index:
-				new_row["lag_30m"] = history["price"].iloc[-1]
-
-			if "lag_1h" in new_row.index:
-				if len(history) >= 2:
-					new_row["lag_1h"] = history["price"].iloc[-2]
-				else:
-					new_row["lag_1h"] = history["price"].iloc[0]
-
-			if "lag_6h" in new_row.index:
-				if len(history) >= 12:
-					new_row["lag_6h"] = history["price"].iloc[-12]
-				else:
-					new_row["lag_6h"] = history["price"].iloc[0]
-
-			if "lag_24h" in new_row.index:
-				if len(history) >= 48:
-					new_row["lag_24h"] = history["price"].iloc[-48]
-				else:
-					new_row["lag_24h"] = history["price"].iloc[0]
-
-			# 3) 그 외 feature들은 일단 직전 값 유지 (RSI, Bollinger 등)
-
-			# 4) 모델 입력용 X_row 구성
-			X_row = pd.DataFrame([new_row[features]])
-
-			# 5) 예측
-			y_hat = float(model.predict(X_row)[0])
-
-			# 6) price 갱신 및 기록
-			new_row["price"] = y_hat
-
-			future_rows.append(
-				{
-					"date": next_time,
-					"price": y_hat,
-				}
-			)
-
-			# 히스토리에 새 row 추가 (다음 스텝을 위해)
-			history = pd.concat([history, pd.DataFrame([new_row])], ignore_index=True)
-
-		future_df = pd.DataFrame(future_rows)
-		return future_df
+		return recursive_forecast(
+			self.model,
+			self.df,
+			self.features,
+			steps=steps,
+			freq=freq,
+		)
@@ -1,29 +1,13 @@
 # notice.py
+# 공지사항(raw_notices) 로딩 - data_loader 와 같은 DB engine / 캐시(cache.py) 사용
 
-import os
 import pandas as pd
-from sqlalchemy import create_engine
-from dotenv import load_dotenv
-import streamlit as st
-
-load_dotenv()
-
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = int(os.getenv("DB_PORT", 3306))
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_NAME = os.getenv("DB_NAME")
-
-@st.cache_resource
-def get_engine():
-	db_connection_str = (
-		f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}"
-		f"@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-	)
-	engine = create_engine(db_connection_str)
-	return engine
-
-@st.cache_data
+
+from cache import cache_data
+from data_loader import get_engine
+
+
+@cache_data
 def load_notice_all():
 	engine = get_engine()
 	
@@ -31,7 +15,7 @@ def load_notice_all():
 
 	return df_notice
 
-@st.cache_data
+@cache_data
 def load_notice_content():
 	engine = get_engine()
 	
@@ -39,10 +23,7 @@ def load_notice_content():
 
 	return df_notice_content
 
-# if __name__ == "__main__":
-# 	df = load_notice()
-# 	print(df.head())
-# 	print("rows:", len(df))
 
-notice = load_notice_content()
-print(notice)
+if __name__ == "__main__":
+	notice = load_notice_content()
+	print(notice)
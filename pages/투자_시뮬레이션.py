@@ -3,13 +3,15 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import altair as alt
 
-from ai_advisor import get_ai_advice
-from data_loader import load_merged_data
-from features import filter_item, make_ml_dataset
+from ai_advisor import ai_advice_key, request_ai_advice
+from streamlit_adapter import load_gpt_scores, load_item_catalog, load_item_history
+from features import filter_item
 # from models_old import train_random_forest
-from models.factory import get_model
-from backtest import simulate_strict_investor
+from models.ensemble import EnsemblePriceModel
+from pipeline import build_item_ml_dataset
+from backtest import simulate_strict_investor, sweep_pivot, sweep_strict_investor
 
 st.set_page_config(
 	page_title="투자 시뮬레이션",
@@ -95,13 +97,19 @@ with st.sidebar:
 		/ 100.0
 	)
 
+	run_sweep = st.checkbox(
+		"파라미터 스윕 (히트맵)",
+		value=False,
+		help="같은 예측 결과로 매수 비율 / 최대 투자 비율 / 기대 수익률 조합 전체를 한 번에 백테스트합니다. (수수료율은 위 설정값 고정)",
+	)
+
 	if not use_session:
 		st.markdown("---")
 		st.subheader("아이템 선택")
 
-		df_final = load_merged_data()
+		df_catalog = load_item_catalog()
 
-		grade_list = sorted(df_final["grade"].dropna().unique())
+		grade_list = sorted(df_catalog["grade"].dropna().unique())
 		grade_options = ["전체"] + grade_list
 
 		target_grade = st.selectbox(
@@ -115,6 +123,12 @@ with st.sidebar:
 			value="원한",
 		)
 
+		learn_weights = st.checkbox(
+			"검증 구간으로 앙상블 가중치 학습",
+			value=False,
+			help="체크하면 고정 가중치 대신, 검증 구간(뒤 20%) 오차가 가장 작아지는 가중치로 앙상블합니다.",
+		)
+
 	run_button = st.button("시뮬레이션 실행")
 
 
@@ -160,16 +174,28 @@ if use_session and has_session_result:
 else:
 	# 세션 재사용이 불가능한 경우: 여기서 다시 전체 파이프라인 실행
 	with st.spinner("데이터 필터링 중..."):
-		result = filter_item(df_final, target_keyword, target_grade)
+		# 카탈로그에서 후보 item_id만 고른 뒤, 해당 아이템 시세 로그만 조회
+		mask = df_catalog["name"].str.contains(target_keyword, regex=False, na=False)
+		if target_grade and target_grade != "전체":
+			mask = mask & (df_catalog["grade"] == target_grade)
+
+		target_item_ids = tuple(int(i) for i in df_catalog.loc[mask, "item_id"])
+		df_item_logs = load_item_history(target_item_ids)
+		result = filter_item(df_item_logs, target_keyword, target_grade)
 
 	if result is None:
 		st.error(f"'{target_keyword}' (등급: {target_grade}) 에 해당하는 데이터가 없습니다.")
 		st.stop()
 
 	df_target, top_item = result
+	item_id = int(df_target["item_id"].iloc[0])
 
+	# 메인 대시보드와 같은 전처리(30분봉 + GPT 점수 + 이상치 정제)
+	# → 대시보드에서 저장한 앙상블 멤버 모델을 그대로 재사용할 수 있다
 	with st.spinner("Feature Engineering 처리 중..."):
-		df_ml, features = make_ml_dataset(df_target)
+		df_gpt_all = load_gpt_scores()
+		df_gpt_item = df_gpt_all[df_gpt_all["item_id"] == item_id].copy()
+		df_ml, features = build_item_ml_dataset(df_target, df_gpt_item)
 
 	if len(df_ml) < 300:
 		st.warning(f"Feature 생성 후 데이터가 {len(df_ml)}개입니다. (최소 300개 이상일 때가 더 안정적)")
@@ -178,8 +204,12 @@ else:
 	# with st.spinner("RandomForest 학습 & 예측 중..."):
 	# 	model, y_test, y_pred, split_idx, rmse, r2 = train_random_forest(df_ml, features)
 
-	with st.spinner("모델 학습 & 예측 중..."):
-		price_model = get_model("rf")  # 나중에 "ensemble", "lstm" 등으로 교체만 하면 됨
+	with st.spinner("앙상블 모델 학습 / 로드 & 예측 중..."):
+		price_model = EnsemblePriceModel(
+			item_id=item_id,
+			update=True,
+			learn_weights=learn_weights,
+		)
 		price_model.train(df_ml, features)
 
 		y_test, y_pred, split_idx, rmse, r2 = price_model.predict_test()
@@ -219,6 +249,58 @@ if trade_df.empty:
 else:
 	st.dataframe(trade_df.sort_values("date"))
 
+# -------------------------------------------------------------------------
+# 🧪 파라미터 스윕: 같은 y_test / y_pred 로 조합 전체를 한 번에 백테스트
+# -------------------------------------------------------------------------
+SWEEP_PER_TRADE = [0.01, 0.02, 0.05, 0.10, 0.20, 0.30, 0.50]
+SWEEP_MAX_POSITION = [0.10, 0.30, 0.50, 1.00]
+SWEEP_MARGIN = [0.01, 0.02, 0.03, 0.05, 0.07, 0.10, 0.15, 0.20, 0.30]
+
+if run_sweep:
+	st.markdown("#### 🧪 파라미터 스윕")
+
+	with st.spinner("파라미터 조합 백테스트 중..."):
+		df_sweep = sweep_strict_investor(
+			y_test,
+			y_pred,
+			initial_balance=initial_balance,
+			fee_rates=fee_rate,
+			per_trade_ratios=sorted(set(SWEEP_PER_TRADE) | {per_trade_ratio}),
+			max_position_ratios=sorted(set(SWEEP_MAX_POSITION) | {max_position_ratio}),
+			target_margins=sorted(set(SWEEP_MARGIN) | {target_margin}),
+			# Streamlit 서버 프로세스 안에서는 process pool 을 띄우지 않는다
+			# (rerun 때 pool 이 고아가 되기 쉽고, 이 격자 크기는 직렬로도 1초 안에 끝남)
+			max_workers=1,
+		)
+
+	# 최대 투자 비율 축은 가장 좋은 ROI 로 접어서 (기대 수익률 × 1회 매수 비율) 히트맵
+	df_heat = (
+		sweep_pivot(df_sweep, index="target_margin", columns="per_trade_ratio", value="roi")
+		.stack()
+		.rename("roi")
+		.reset_index()
+	)
+	df_heat["target_margin"] = (df_heat["target_margin"] * 100).round(1)
+	df_heat["per_trade_ratio"] = (df_heat["per_trade_ratio"] * 100).round(1)
+
+	heatmap = (
+		alt.Chart(df_heat)
+		.mark_rect()
+		.encode(
+			x=alt.X("per_trade_ratio:O", title="1회 매수 비율 (%)"),
+			y=alt.Y("target_margin:O", title="매수 기준 기대 수익률 (%)"),
+			color=alt.Color("roi:Q", title="ROI (%)", scale=alt.Scale(scheme="redyellowgreen", domainMid=0)),
+			tooltip=["target_margin", "per_trade_ratio", alt.Tooltip("roi:Q", format="+.2f")],
+		)
+	)
+	st.altair_chart(heatmap, use_container_width=True)
+	st.caption(
+		f"수수료율 {fee_rate * 100:.1f}% 고정, 칸마다 최대 투자 비율 중 가장 좋은 ROI 표시 "
+		f"(총 {len(df_sweep)}개 조합)"
+	)
+
+	st.dataframe(df_sweep.sort_values("roi", ascending=False).head(10).reset_index(drop=True))
+
 # -------------------------------------------------------------------------
 # 📌 현재 전략 기준 투자 판단 (세션 기반)
 # -------------------------------------------------------------------------
@@ -347,6 +429,18 @@ else:
 # -------------------------------------------------------------------------
 # 4. AI 투자 전략 가이드
 # -------------------------------------------------------------------------
+@st.fragment(run_every=1.0)
+def _poll_ai_advice(advice_job):
+	"""
+	조언이 끝날 때까지 이 영역만 1초마다 다시 그리고, 끝나면 결과를 이 자리에 바로 표시.
+	(페이지 전체 rerun 은 [시뮬레이션 실행] 버튼 값이 False 로 돌아가서 결과 화면이 사라지므로 쓰지 않는다)
+	"""
+	if advice_job.done():
+		st.info(advice_job.result(), icon="📊")
+	else:
+		st.info("AI 전략 분석 중... (나머지 화면은 먼저 표시됩니다)", icon="⏳")
+
+
 st.markdown("---")
 st.subheader("📊 AI 투자 전략 가이드")
 
@@ -385,22 +479,20 @@ if use_session and has_session_result:
 			min_pred = int(df_forecast["forecast"].min())
 			max_pred = int(df_forecast["forecast"].max())
 
-			# 🔹 AI 응답 캐시 (아이템 단위)
-			if "ai_advice_cache" not in st.session_state:
-				st.session_state.ai_advice_cache = {}
-
-			cache_key = top_item
-			if cache_key not in st.session_state.ai_advice_cache:
-				with st.spinner("AI 전략 분석 중..."):
-					# ai_advisor.py 시그니처에 맞게 전달
-					advice_text = get_ai_advice(
-						top_item,
-						current_price,
-						df_forecast,
-					)
-					st.session_state.ai_advice_cache[cache_key] = advice_text
-
-			cached_advice = st.session_state.ai_advice_cache[cache_key]
+			# 🔹 AI 조언은 백그라운드로 요청 (프롬프트 해시 기준 영구 캐시, 같은 예측이면 호출 없이 바로)
+			#    실패 / 시간 초과 결과는 이 세션에서만 기억해서 rerun 마다 다시 호출하지 않는다
+			if "ai_advice_jobs" not in st.session_state:
+				st.session_state.ai_advice_jobs = {}
+
+			advice_key = ai_advice_key(top_item, current_price, df_forecast)
+			advice_job = st.session_state.ai_advice_jobs.get(advice_key)
+			if advice_job is None:
+				advice_key, advice_job = request_ai_advice(
+					top_item,
+					current_price,
+					df_forecast,
+				)
+				st.session_state.ai_advice_jobs[advice_key] = advice_job
 
 			# 🔹 메트릭 + AI 텍스트 출력
 			c1, c2, c3 = st.columns(3)
@@ -420,7 +512,11 @@ if use_session and has_session_result:
 					delta=f"{max_pred - current_price:,.0f} G",
 				)
 
-			st.info(cached_advice, icon="📊")
+			if advice_job.done():
+				st.info(advice_job.result(), icon="📊")
+			else:
+				_poll_ai_advice(advice_job)
+
 			st.caption(
 				"※ 본 AI 가이드는 과거 시세와 예측 결과를 바탕으로 생성된 참고용 의견이며, "
 				"실제 게임 내 거래 결정에 따른 책임은 플레이어 본인에게 있습니다."
@@ -0,0 +1,48 @@
+# pipeline.py
+# 아이템 1개 기준 "전처리 → Feature" 파이프라인
+# (대시보드 / 배치 예측이 같은 로직을 쓰도록 분리, 앙상블 예측은 models/ensemble.py EnsemblePriceModel)
+
+import pandas as pd
+
+from features import make_ml_dataset
+from preprocess import apply_gpt_scores, clean_outliers_rolling, resample_to_30min_for_app
+
+
+POINTS_PER_DAY = 48		# 30분 단위 기준 하루
+
+
+def build_item_ml_dataset(df_target: pd.DataFrame, df_gpt_item: pd.DataFrame | None):
+	"""
+	10분 단위 원본(df_target) → 30분봉 → GPT 점수 매핑 → 이상치 정제 → df_ml
+
+	return: (df_ml, features)
+	"""
+	# 1) 30분봉으로 변환
+	df_target_30 = resample_to_30min_for_app(df_target)
+
+	# 2) GPT 점수 매핑 (date index 기준)
+	df_target_for_ml = (
+		df_target_30
+		.sort_values("date")
+		.set_index("date")
+	)
+
+	df_target_with_gpt = apply_gpt_scores(
+		df_target_for_ml,
+		df_gpt_item,
+		score_col="gpt_score",
+	)
+
+	# 3) 이상치 정제 (하루 기준 window)
+	df_target_clean = clean_outliers_rolling(
+		df_target_with_gpt,
+		column="price",
+		window=POINTS_PER_DAY,
+		sigma=3.0,
+	)
+
+	df_target_clean = df_target_clean.reset_index()
+
+	# 4) Feature Engineering
+	return make_ml_dataset(df_target_clean)
+
@@ -0,0 +1,133 @@
+# precompute_service.py
+# 헤드리스 예측 사전 계산 워커
+#
+# 사용법:
+#   python precompute_service.py --interval 600          # 10분마다 새 데이터 확인 후 갱신 (상주)
+#   python precompute_service.py --once                  # 1번만 실행 (cron / 스케줄러용)
+#   python precompute_service.py --once --grade 유물 --keyword 각인서
+#
+# - 시세 데이터를 다시 읽어서 마지막 로그 시각이 지난 실행보다 늦으면(=데이터 갱신)
+#   최근 active_days 안에 거래 로그가 있는 아이템 전체를 batch_forecast 와 같은 경로로 예측한다
+# - 결과는 forecast_store.py 저장소에 (item_id, generated_at) 키로 저장
+#   → 대시보드는 "AI 예측 시작" 때 저장된 최신 결과를 바로 읽고, 없거나 오래됐을 때만 직접 계산
+# - 대시보드와 같은 모델 저장소(trained_models/)를 쓰므로 LGBM / XGB 는 새 봉만 이어 학습한다
+
+import argparse
+import time
+
+import pandas as pd
+
+from batch_forecast import FORECAST_STEPS, run_batch_forecast
+from forecast_store import FORECAST_STORE_PATH, ForecastStore
+
+
+ACTIVE_DAYS = 3		# 최근 이 기간 안에 로그가 있는 아이템만 대상
+
+
+def active_item_ids(
+	df_final: pd.DataFrame,
+	active_days: float = ACTIVE_DAYS,
+	grade: str | None = None,
+	keyword: str | None = None,
+) -> list[int]:
+	"""최근 active_days 안에 시세 로그가 있는 아이템 (등급 / 이름 키워드로 추가 필터)"""
+	cutoff = df_final["date"].max() - pd.Timedelta(days=active_days)
+	mask = df_final["date"] >= cutoff
+
+	if keyword:
+		mask &= df_final["name"].str.contains(keyword, regex=False)
+	if grade and grade != "전체":
+		mask &= df_final["grade"] == grade
+
+	return sorted(df_final.loc[mask, "item_id"].dropna().astype(int).unique())
+
+
+def run_once(
+	store: ForecastStore,
+	last_seen: pd.Timestamp | None = None,
+	active_days: float = ACTIVE_DAYS,
+	grade: str | None = None,
+	keyword: str | None = None,
+	max_workers: int | None = None,
+	steps: int = FORECAST_STEPS,
+) -> pd.Timestamp | None:
+	"""
+	데이터를 다시 읽고, 마지막 로그 시각이 last_seen 보다 늦으면 대상 아이템 전체 예측 → store 저장.
+
+	return: 이번에 본 마지막 로그 시각 (다음 호출의 last_seen)
+	"""
+	from data_loader import load_gpt_scores, load_merged_data
+
+	# 상주 실행 중에는 매번 DB 와 다시 동기화해야 하므로 프로세스 캐시를 비운다
+	load_merged_data.clear()
+	load_gpt_scores.clear()
+
+	df_final = load_merged_data()
+	data_until = df_final["date"].max()
+
+	if last_seen is not None and data_until <= last_seen:
+		print(f"[SKIP] 새 데이터 없음 (마지막 로그 {data_until})")
+		return last_seen
+
+	item_ids = active_item_ids(df_final, active_days, grade, keyword)
+	print(f"[RUN] 마지막 로그 {data_until} · 대상 아이템 {len(item_ids)}개")
+
+	summary = run_batch_forecast(
+		item_ids,
+		df_final,
+		load_gpt_scores(),
+		output_path=None,
+		max_workers=max_workers,
+		steps=steps,
+		store=store,
+	)
+
+	print(
+		f" - 성공: {summary['n_ok']} / {summary['n_items']} · "
+		f"{summary['elapsed_sec']:.1f}s ({summary['items_per_sec']:.2f} items/s)"
+	)
+	for item_id, err in summary["errors"].items():
+		print(f"   · item {item_id}: {err}")
+
+	return data_until
+
+
+def main():
+	parser = argparse.ArgumentParser(description="활성 아이템 앙상블 예측 사전 계산 워커")
+	parser.add_argument("--store", default=str(FORECAST_STORE_PATH), help="예측 결과 저장소 (SQLite)")
+	parser.add_argument("--interval", type=float, default=600, help="새 데이터 확인 주기 (초)")
+	parser.add_argument("--once", action="store_true", help="1번만 실행하고 종료")
+	parser.add_argument("--active-days", type=float, default=ACTIVE_DAYS)
+	parser.add_argument("--grade", default=None, help="아이템 등급 (기본: 전체)")
+	parser.add_argument("--keyword", default=None, help="아이템 이름 키워드 (기본: 전체)")
+	parser.add_argument("--workers", type=int, default=None)
+	parser.add_argument("--steps", type=int, default=FORECAST_STEPS)
+	args = parser.parse_args()
+
+	store = ForecastStore(args.store)
+	last_seen = None
+
+	while True:
+		try:
+			last_seen = run_once(
+				store,
+				last_seen=last_seen,
+				active_days=args.active_days,
+				grade=args.grade,
+				keyword=args.keyword,
+				max_workers=args.workers,
+				steps=args.steps,
+			)
+		except Exception as e:
+			if args.once:
+				raise
+			# DB 일시 장애 등으로 상주 워커가 죽지 않도록 다음 주기에 다시 시도
+			print(f"[WARN] 사전 계산 실패: {e}")
+
+		if args.once:
+			break
+		time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+	main()
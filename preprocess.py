@@ -1,7 +1,6 @@
 # preprocess.py
 import pandas as pd
 import numpy as np
-from datetime import timedelta
 
 # =========================================================
 # 1. 원본 가격 데이터 정제 + 30분봉 변환	# 사용 안함
@@ -66,6 +65,141 @@ from datetime import timedelta
 # =========================================================
 # 2. Rolling Z-Score 기반 이상치 제거
 # =========================================================
+class RollingOutlierCleaner:
+	"""
+	centered rolling mean/std Z-score 이상치 제거를 스트리밍으로 수행.
+
+	- push(series): 새로 들어온 봉(datetime index)을 추가하고,
+	  window 가 닫혀서 값이 확정된 봉만 정제된 Series 로 반환한다
+	- 이상치는 NaN 처리 후, 오른쪽 정상값이 들어오면 선형 보간해서 내보낸다
+	- 내부에는 최근 window 개 원본값 + 아직 확정 안 된 봉만 들고 있어서
+	  push 비용은 새 봉 개수에만 비례한다 (누적합 기반 rolling 통계)
+	- flush(): 더 들어올 데이터가 없을 때 남은 봉을 배치 방식과 같게 마무리
+	  (window 가 끝까지 안 닫힌 마지막 반 구간은 이상치 판정 없이 원본 유지)
+	"""
+
+	def __init__(self, window: int = 48, sigma: float = 3.0):
+		self.window = window
+		self.sigma = sigma
+
+		# pandas rolling(center=True) 과 같은 중심 위치
+		self.left = window // 2
+		self.right = window - 1 - self.left
+
+		self.n_seen = 0			# push 된 봉 개수
+		self.n_decided = 0		# 이상치 여부가 확정된 봉 개수
+		self.n_emitted = 0		# 정제값을 내보낸 봉 개수
+		self.n_outliers = 0
+
+		self.raw_tail = np.empty(0, dtype=float)	# 최근 window-1 개 원본값
+		self.labels = None							# n_emitted 이후 봉들의 index
+		self.anchor = None							# 마지막으로 확정된 정상값
+		self.n_pending = 0							# anchor 뒤에서 보간을 기다리는 봉 수
+
+	# -----------------------------------------------------
+	# 내부: 확정된 값(이상치/결측=NaN)을 보간 단계로 넘김
+	# -----------------------------------------------------
+	def _interpolate(self, decided: np.ndarray, final: bool = False) -> np.ndarray:
+		prefix = [] if self.anchor is None else [self.anchor]
+		arr = np.concatenate([prefix, np.full(self.n_pending, np.nan), decided])
+
+		good = np.flatnonzero(~np.isnan(arr))
+
+		if len(good) == 0:
+			if self.anchor is None:
+				# 앞쪽 결측은 보간 기준이 없어서 NaN 그대로 확정
+				self.n_pending = 0
+				return arr
+			self.n_pending = len(arr) - 1
+			return np.empty(0)
+
+		last_good = good[-1]
+		positions = np.arange(last_good + 1)
+		out = np.interp(positions, good, arr[good])
+		out[: good[0]] = np.nan		# 첫 정상값 앞(선행 결측)은 NaN 유지
+
+		if final:
+			# 뒤에 정상값이 더 없으면 마지막 정상값으로 채움 (pandas interpolate 와 동일)
+			out = np.concatenate([out, np.full(len(arr) - last_good - 1, arr[last_good])])
+			self.n_pending = 0
+		else:
+			self.n_pending = len(arr) - last_good - 1
+
+		self.anchor = arr[last_good]
+		return out[len(prefix):]
+
+	def _emit(self, values: np.ndarray) -> pd.Series:
+		if self.labels is None:
+			return pd.Series([], dtype=float)
+
+		labels = self.labels[: len(values)]
+		self.labels = self.labels[len(values):]
+		self.n_emitted += len(values)
+		return pd.Series(values, index=labels, dtype=float)
+
+	# -----------------------------------------------------
+	# 공개 API
+	# -----------------------------------------------------
+	def push(self, series: pd.Series) -> pd.Series:
+		new = series.to_numpy(dtype=float)
+		self.labels = series.index if self.labels is None else self.labels.append(series.index)
+
+		buf = np.concatenate([self.raw_tail, new])
+		buf_start = self.n_seen - len(self.raw_tail)		# buf[0] 의 전체 기준 위치
+		self.n_seen += len(new)
+
+		# 1) 이번에 확정 가능한 중심 위치 [c0, c1)
+		c0 = self.n_decided
+		c1 = max(self.n_seen - self.right, c0)
+		centers = np.arange(c0, c1)
+		values = buf[centers - buf_start]
+
+		# 2) rolling mean / std (누적합, 결측 포함 window 는 통계 없음)
+		is_nan = np.isnan(buf)
+		shift = buf[~is_nan][0] if (~is_nan).any() else 0.0
+		x = np.where(is_nan, 0.0, buf - shift)
+
+		cs = np.concatenate([[0.0], np.cumsum(x)])
+		cs2 = np.concatenate([[0.0], np.cumsum(x * x)])
+		cn = np.concatenate([[0], np.cumsum(is_nan)])
+
+		outliers = np.zeros(len(centers), dtype=bool)
+		has_stats = centers >= self.left
+		if has_stats.any():
+			end = centers[has_stats] + self.right - buf_start + 1		# window 끝 (exclusive, buf 기준)
+			begin = end - self.window
+
+			w = self.window
+			total = cs[end] - cs[begin]
+			total_sq = cs2[end] - cs2[begin]
+			full = (cn[end] - cn[begin]) == 0
+
+			mean = total / w
+			var = np.maximum((total_sq - w * mean * mean) / (w - 1), 0.0)
+			std = np.sqrt(var)
+
+			x_c = values[has_stats] - shift
+			upper = mean + self.sigma * std
+			lower = mean - self.sigma * std
+			outliers[has_stats] = full & ((x_c > upper) | (x_c < lower))
+
+		self.n_outliers += int(outliers.sum())
+		self.n_decided = c1
+		self.raw_tail = buf[-(self.window - 1):] if self.window > 1 else np.empty(0)
+
+		decided = np.where(outliers, np.nan, values)
+		return self._emit(self._interpolate(decided))
+
+	def flush(self) -> pd.Series:
+		"""남은 봉 전부 확정 (window 가 안 닫힌 구간은 원본 유지)"""
+		c0 = self.n_decided
+		buf_start = self.n_seen - len(self.raw_tail)
+		decided = self.raw_tail[c0 - buf_start:] if self.n_seen > c0 else np.empty(0)
+		self.n_decided = self.n_seen
+
+		return self._emit(self._interpolate(decided, final=True))
+
+
 def clean_outliers_rolling(
 	df: pd.DataFrame,
 	column: str = "Price_Mean",
@@ -74,22 +208,21 @@ def clean_outliers_rolling(
 ) -> pd.DataFrame:
 	"""
 	- rolling mean/std 기반 Z-score 방식 이상치 제거
-	- 이상치는 NaN 처리 후 선형 보간
+	- 이상치 / 결측 봉은 NaN 처리 후 선형 보간
+	- 실제 계산은 RollingOutlierCleaner 에 한 번에 넣고 flush 한 결과
+
+	결측 봉은 이상치가 있든 없든 항상 보간한다.
+	(예전에는 이상치가 하나도 없으면 결측을 그대로 뒀는데, 그러면 같은 봉이라도
+	 어느 구간을 잘라서 정제했느냐에 따라 값이 달라져 feature_store 증분 갱신이 전체 재계산과 어긋났다)
 	"""
 
 	df_clean = df.copy()
 
-	rolling_mean = df_clean[column].rolling(window=window, center=True).mean()
-	rolling_std = df_clean[column].rolling(window=window, center=True).std()
-
-	upper = rolling_mean + sigma * rolling_std
-	lower = rolling_mean - sigma * rolling_std
-
-	outliers = (df_clean[column] > upper) | (df_clean[column] < lower)
-
-	if outliers.any():
-		df_clean.loc[outliers, column] = np.nan
-		df_clean[column] = df_clean[column].interpolate(method="linear")
+	cleaner = RollingOutlierCleaner(window=window, sigma=sigma)
+	df_clean[column] = np.concatenate([
+		cleaner.push(df_clean[column]).to_numpy(),
+		cleaner.flush().to_numpy(),
+	])
 
 	return df_clean
 
@@ -97,33 +230,125 @@ def clean_outliers_rolling(
 # =========================================================
 # 3. GPT 공지 점수 매핑
 # =========================================================
+GPT_OVERLAP_POLICIES = ("last", "max", "sum", "decay")
+
+
+def _notice_windows(notice_dates: pd.Series):
+	"""공지일 10:00 ~ +7일 06:00 구간 (start, end) 계산"""
+	day = pd.to_datetime(notice_dates).dt.normalize()
+	start = day + pd.Timedelta(hours=10)
+	end = day + pd.Timedelta(days=7, hours=6)
+	return start, end
+
+
 def apply_gpt_scores(
 	df_price: pd.DataFrame,
 	df_gpt: pd.DataFrame | None,
 	score_col: str = "GPT_Score",
+	overlap: str = "last",
+	half_life_hours: float = 48.0,
 ) -> pd.DataFrame:
 	"""
 	- df_price: datetime index를 가진 가격 데이터
 	- df_gpt: notice_date, gpt_score 컬럼을 가진 공지 데이터
 	- 공지일 10:00 ~ +7일 06:00 구간에 gpt_score 적용
+
+	- 두 데이터 모두 item_id 컬럼이 있으면 같은 item_id 끼리만 매핑한다
+	  (load_gpt_scores() 전체 결과 + 여러 아이템 가격을 한 번에 처리 가능)
+	- overlap: 공지 구간이 겹칠 때 처리 방식
+	  · "last"  : df_gpt 에서 나중 row 의 점수 (기존 동작)
+	  · "max"   : 가장 큰 점수
+	  · "sum"   : 점수 합
+	  · "decay" : 공지 시작 후 half_life_hours 마다 절반으로 줄어드는 점수의 합
+
+	공지마다 전체 index 를 mask 하지 않고, 정렬된 시간축에서 searchsorted 로
+	구간 [lo, hi) 위치만 찾은 뒤 한 번에 채운다.
 	"""
+	if overlap not in GPT_OVERLAP_POLICIES:
+		raise ValueError(f"Unknown overlap policy: {overlap}")
 
 	df = df_price.copy()
 	df[score_col] = 0.0
 
-	if df_gpt is None or df_gpt.empty:
+	if df_gpt is None or df_gpt.empty or len(df) == 0:
 		return df
 
-	for _, row in df_gpt.iterrows():
-		notice_date = pd.to_datetime(row["notice_date"])
-		score = row["gpt_score"]
+	n_rows = len(df)
+	n_notices = len(df_gpt)
+
+	# ------------------------------------------------------------------
+	# 1) (item, 시각) 을 int64 정렬 키 하나로 합치기 (초 단위)
+	#    - 공지 경계는 항상 정각이라 row 시각을 초 단위로 내림해도 비교 결과가 같다
+	# ------------------------------------------------------------------
+	start, end = _notice_windows(df_gpt["notice_date"])
+
+	row_sec = df.index.values.astype("datetime64[s]").astype("int64")
+	start_sec = start.values.astype("datetime64[s]").astype("int64")
+	end_sec = end.values.astype("datetime64[s]").astype("int64")
+
+	base = min(row_sec.min(), start_sec.min())
+	stride = max(row_sec.max(), end_sec.max()) - base + 1
 
-		start = notice_date.replace(hour=10, minute=0, second=0)
-		end = (notice_date + timedelta(days=7)).replace(hour=6, minute=0, second=0)
+	if "item_id" in df.columns and "item_id" in df_gpt.columns:
+		codes, _ = pd.factorize(
+			np.concatenate([
+				df["item_id"].to_numpy(dtype=float),
+				df_gpt["item_id"].to_numpy(dtype=float),
+			])
+		)
+		codes = codes.astype("int64") + 1		# NaN(-1) → 0
+		row_group = codes[:n_rows]
+		notice_group = codes[n_rows:]
+	else:
+		row_group = np.zeros(n_rows, dtype="int64")
+		notice_group = np.zeros(n_notices, dtype="int64")
+
+	row_key = row_group * stride + (row_sec - base)
+	order = np.argsort(row_key, kind="stable")
+	row_key_sorted = row_key[order]
+
+	lo = np.searchsorted(row_key_sorted, notice_group * stride + (start_sec - base), side="left")
+	hi = np.searchsorted(row_key_sorted, notice_group * stride + (end_sec - base), side="left")
+	lengths = np.maximum(hi - lo, 0)
+
+	if lengths.sum() == 0:
+		return df
 
-		mask = (df.index >= start) & (df.index < end)
-		if mask.any():
-			df.loc[mask, score_col] = score
+	# ------------------------------------------------------------------
+	# 2) 공지별 구간 [lo, hi) 를 (row 위치, 공지 번호) 쌍으로 펼치기
+	# ------------------------------------------------------------------
+	notice_idx = np.repeat(np.arange(n_notices), lengths)
+	offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+	pos = np.repeat(lo, lengths) + offsets
+
+	scores = df_gpt["gpt_score"].to_numpy(dtype=float)
+	pair_scores = scores[notice_idx]
+
+	# ------------------------------------------------------------------
+	# 3) 겹침 정책별 집계 (정렬된 위치 기준)
+	# ------------------------------------------------------------------
+	if overlap == "last":
+		last_notice = np.full(n_rows, -1, dtype="int64")
+		np.maximum.at(last_notice, pos, notice_idx)
+		covered = last_notice >= 0
+		out_sorted = np.where(covered, scores[np.maximum(last_notice, 0)], 0.0)
+
+	elif overlap == "max":
+		out_sorted = np.full(n_rows, -np.inf)
+		np.maximum.at(out_sorted, pos, pair_scores)
+		out_sorted[np.isneginf(out_sorted)] = 0.0
+
+	elif overlap == "sum":
+		out_sorted = np.bincount(pos, weights=pair_scores, minlength=n_rows)
+
+	else:  # decay
+		elapsed_hours = (row_key_sorted[pos] - (notice_group * stride + (start_sec - base))[notice_idx]) / 3600.0
+		weights = pair_scores * np.power(0.5, elapsed_hours / half_life_hours)
+		out_sorted = np.bincount(pos, weights=weights, minlength=n_rows)
+
+	out = np.empty(n_rows, dtype=float)
+	out[order] = out_sorted
+	df[score_col] = out
 
 	return df
 
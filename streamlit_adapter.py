@@ -0,0 +1,38 @@
+# streamlit_adapter.py
+# 대시보드 / 페이지 전용 얇은 Streamlit 어댑터
+#
+# - 실제 로딩 / 캐시는 data_loader.py + cache.py (Streamlit 없이 배치 / 워커에서도 같은 코드)
+# - 여기서는 코어가 돌려준 결과를 화면용으로만 처리한다 (경고 표시 등)
+# - 코어 캐시는 프로세스 전역이라 세션끼리 공유된다 (st.cache_data 로 한 번 더 감싸지 않음)
+
+import streamlit as st
+
+import data_loader
+from cache import get_cache
+
+
+def load_item_catalog():
+	return data_loader.load_item_catalog()
+
+
+def load_item_history(item_ids: tuple[int, ...], start=None, end=None):
+	return data_loader.load_item_history(item_ids, start=start, end=end)
+
+
+def load_merged_data():
+	return data_loader.load_merged_data()
+
+
+def load_gpt_scores():
+	df_gpt = data_loader.load_gpt_scores()
+
+	error = df_gpt.attrs.get("error")
+	if error:
+		st.warning(f"GPT 점수 로딩 중 오류가 발생해서 GPT feature를 비활성화합니다. 상세: {error}")
+
+	return df_gpt
+
+
+def clear_data_cache():
+	"""데이터 캐시 전체 비우기 (메모리 + 디스크)"""
+	get_cache().clear()
@@ -0,0 +1,101 @@
+# tests/test_ai_advisor.py
+# ai_advisor.request_ai_advice 캐시 / 중복 호출 합치기 / 시간 초과 처리 (FakeLLMClient, 네트워크 없음)
+#
+#   python -m pytest -q tests/
+
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ai_advisor
+from ai_advisor import FakeLLMClient, cached_advice, request_ai_advice
+from cache import DiskCache, MemoryLRU, TieredCache
+
+
+class BlockingLLMClient(FakeLLMClient):
+    """release 될 때까지 응답을 붙잡아 두는 가짜 LLM (동시 요청이 진행 중인 Future 를 같이 쓰는지 확인용)"""
+
+    def __init__(self):
+        super().__init__(response="🤖 (fake) 같이 쓰는 조언")
+        self.release = threading.Event()
+
+    def complete(self, messages, model, temperature, max_tokens, timeout):
+        self.release.wait(timeout)
+        return super().complete(messages, model, temperature, max_tokens, timeout)
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """저장소의 data/ai_advice/ 대신 테스트마다 빈 캐시"""
+    monkeypatch.setattr(ai_advisor, "_ADVICE_CACHE", TieredCache(MemoryLRU(16), DiskCache(tmp_path)))
+
+
+def make_forecast(seed: int = 0, steps: int = 144) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "ds": pd.date_range("2025-01-01 00:30", periods=steps, freq="30min"),
+        "forecast": 50_000 + np.cumsum(rng.normal(0, 80, steps)),
+    })
+
+
+def test_same_prompt_hits_cache():
+    client = FakeLLMClient()
+    df = make_forecast()
+
+    key, job = request_ai_advice("테스트 아이템", 50_000, df, client=client)
+    assert job.result(timeout=5) == client.response
+
+    key_again, job_again = request_ai_advice("테스트 아이템", 50_000, df.copy(), client=client)
+
+    assert key_again == key
+    assert job_again.done() and job_again.result() == client.response
+    assert len(client.calls) == 1
+
+    # 예측이 바뀌면 key 도 바뀌어서 다시 호출한다
+    other_key, other_job = request_ai_advice("테스트 아이템", 50_000, make_forecast(seed=1), client=client)
+    other_job.result(timeout=5)
+    assert other_key != key
+    assert len(client.calls) == 2
+
+
+def test_concurrent_requests_share_one_future():
+    client = BlockingLLMClient()
+    df = make_forecast()
+
+    key_a, job_a = request_ai_advice("테스트 아이템", 50_000, df, client=client)
+    key_b, job_b = request_ai_advice("테스트 아이템", 50_000, df, client=client)
+
+    assert key_a == key_b
+    assert job_b is job_a
+    assert not job_a.done()
+
+    client.release.set()
+    assert job_a.result(timeout=5) == client.response
+    assert len(client.calls) == 1
+
+
+def test_timeout_is_not_cached():
+    slow = FakeLLMClient(delay=1.0)
+    df = make_forecast()
+
+    key, job = request_ai_advice("테스트 아이템", 50_000, df, client=slow, timeout=0.05)
+    result = job.result(timeout=5)
+
+    assert result.startswith("🤖 AI 분석 실패")
+    assert cached_advice(key) is None
+
+    # 다음 요청은 캐시된 실패 문구 대신 다시 호출한다
+    fast = FakeLLMClient()
+    key_retry, job_retry = request_ai_advice("테스트 아이템", 50_000, df, client=fast, timeout=0.05)
+
+    assert key_retry == key
+    assert job_retry.result(timeout=5) == fast.response
+    assert len(fast.calls) == 1
+    assert cached_advice(key) == fast.response
+
+
+def test_llm_client_is_abstract():
+    with pytest.raises(TypeError):
+        ai_advisor.LLMClient()
@@ -0,0 +1,70 @@
+# tests/test_feature_store.py
+# FeatureStore.refresh (증분 갱신) 결과가 전체 재계산(build_item_ml_dataset)과 같은지 확인
+#
+#   python -m pytest -q tests/
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_store import FeatureStore
+from pipeline import build_item_ml_dataset
+
+
+ITEM_ID = 1
+START = pd.Timestamp("2025-01-01")
+
+
+def make_logs(days: int = 12, gaps=(), outliers=(), seed: int = 0) -> pd.DataFrame:
+	"""
+	10분 로그 (일간 주기 + 랜덤워크).
+	gaps: [(시작, 끝)] 구간 로그 제거, outliers: [시각] 에 가격 5배 튀는 로그
+	"""
+	rng = np.random.default_rng(seed)
+	dates = pd.date_range(START, periods=days * 144, freq="10min")
+	price = 50_000 + np.cumsum(rng.normal(0, 30, len(dates))) + 500 * np.sin(np.arange(len(dates)) * 2 * np.pi / 144)
+
+	df = pd.DataFrame({"date": dates, "price": price, "item_id": ITEM_ID, "name": "테스트", "grade": "유물"})
+	for ts in outliers:
+		df.loc[df["date"] == pd.Timestamp(ts), "price"] *= 5
+	for a, b in gaps:
+		df = df[(df["date"] < pd.Timestamp(a)) | (df["date"] >= pd.Timestamp(b))]
+	return df.reset_index(drop=True)
+
+
+def refresh_until(store: FeatureStore, df_logs: pd.DataFrame, until: pd.Timestamp):
+	"""대시보드처럼 history_start 이후 로그만 넘겨서 refresh"""
+	df_target = df_logs[df_logs["date"] < until]
+	since = store.history_start(ITEM_ID)
+	if since is not None:
+		df_target = df_target[df_target["date"] >= since]
+	return store.refresh(ITEM_ID, df_target, None)
+
+
+@pytest.mark.parametrize(
+	"gaps, outliers",
+	[
+		# 앞쪽 이상치 1개 + 새 데이터 구간의 4시간 공백
+		([("2025-01-10 03:00", "2025-01-10 07:00")], ["2025-01-02 12:00"]),
+		# 이상치 없이 공백만
+		([("2025-01-10 03:00", "2025-01-10 07:00")], []),
+		# refresh 경계(watermark) 근처에 걸친 공백 + 뒤쪽 이상치
+		([("2025-01-08 20:00", "2025-01-09 02:00")], ["2025-01-09 03:00", "2025-01-11 05:00"]),
+		# 하루 넘게 이어지는 공백
+		([("2025-01-07 10:00", "2025-01-08 16:00")], ["2025-01-03 08:00"]),
+	],
+)
+def test_refresh_matches_full_rebuild(tmp_path, gaps, outliers):
+	df_logs = make_logs(gaps=gaps, outliers=outliers)
+	store = FeatureStore(tmp_path)
+
+	for until in pd.date_range("2025-01-06", "2025-01-13", freq="7h"):
+		df_ml, features = refresh_until(store, df_logs, until)
+		df_full, features_full = build_item_ml_dataset(df_logs[df_logs["date"] < until], None)
+
+		assert features == features_full
+		pd.testing.assert_frame_equal(
+			df_ml.reset_index(drop=True),
+			df_full.reset_index(drop=True),
+			check_dtype=False,
+		)
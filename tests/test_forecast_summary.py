@@ -0,0 +1,104 @@
+# tests/test_forecast_summary.py
+# AI 조언 프롬프트용 예측 요약(forecast_summary.py)이 최저 / 최고를 그대로 보존하는지 확인
+#
+#   python -m pytest -q tests/
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai_advisor import build_prompt
+from forecast_summary import BUCKET_FREQS, PIVOT_THRESHOLDS, TIME_FMT, TOKEN_BUDGET, estimate_tokens, summarize_forecast
+
+
+def make_forecast(steps: int, seed: int) -> pd.DataFrame:
+	"""30분봉 예측 형태의 합성 데이터 (랜덤워크 + 일간 주기 + 가끔 급등/급락)"""
+	rng = np.random.default_rng(seed)
+	walk = np.cumsum(rng.normal(0, 60, steps))
+	daily = 300 * np.sin(np.arange(steps) * 2 * np.pi / 48 + rng.uniform(0, 2 * np.pi))
+	jumps = np.cumsum(rng.normal(0, 800, steps) * (rng.random(steps) < 0.02))
+
+	return pd.DataFrame({
+		"ds": pd.date_range("2025-01-01 00:30", periods=steps, freq="30min"),
+		"forecast": 50_000 + walk + daily + jumps,
+	})
+
+
+def assert_extrema_preserved(df_forecast: pd.DataFrame, text: str, info: dict):
+	"""info / 요약 본문 / 전환점 목록의 최저 / 최고가 실제 예측과 같은지"""
+	df = df_forecast.dropna(subset=["ds", "forecast"])
+	for label, idx, (ts, price) in (
+		("최저", df["forecast"].idxmin(), info["min"]),
+		("최고", df["forecast"].idxmax(), info["max"]),
+	):
+		true_ts = df.loc[idx, "ds"]
+		true_price = float(df.loc[idx, "forecast"])
+
+		assert (ts, price) == (true_ts, true_price), label
+		assert f"{true_price:,.0f} G ({true_ts:{TIME_FMT}})" in text, f"요약 본문에 {label} 없음"
+		assert f"{true_ts:{TIME_FMT}} {true_price:,.0f}" in text.split("[추세 구간]")[0], f"전환점에 {label} 없음"
+
+
+@pytest.mark.parametrize("steps", [48, 144, 288, 576, 1440])
+@pytest.mark.parametrize("seed", range(8))
+def test_extrema_preserved_within_budget(steps, seed):
+	df = make_forecast(steps, seed)
+	text, info = summarize_forecast(df)
+
+	assert_extrema_preserved(df, text, info)
+	assert info["est_tokens"] == estimate_tokens(text) <= TOKEN_BUDGET
+
+
+@pytest.mark.parametrize("steps, seed", [(144, 0), (1440, 1)])
+def test_prompt_facts_match_summary(steps, seed):
+	df = make_forecast(steps, seed)
+	prompt = build_prompt("테스트 아이템", 50_000.0, df)
+
+	for i in (df["forecast"].idxmin(), df["forecast"].idxmax()):
+		ts, price = df.loc[i, "ds"], float(df.loc[i, "forecast"])
+		assert f"{int(price)} G (찍은 시각: {ts:{TIME_FMT}})" in prompt
+
+
+def test_single_row():
+	df = make_forecast(1, seed=0)
+	text, info = summarize_forecast(df)
+
+	assert info["n_pivots"] == 1
+	assert info["min"] == info["max"] == (df["ds"].iloc[0], float(df["forecast"].iloc[0]))
+	assert_extrema_preserved(df, text, info)
+
+
+def test_unsorted_input_matches_sorted():
+	df = make_forecast(288, seed=3)
+	shuffled = df.sample(frac=1.0, random_state=0)
+
+	assert summarize_forecast(shuffled) == summarize_forecast(df)
+
+
+def test_nan_rows_are_ignored():
+	df = make_forecast(288, seed=4)
+	with_nan = df.copy()
+	with_nan.loc[[0, 50, 51, 287], "forecast"] = np.nan
+	text, info = summarize_forecast(with_nan)
+
+	assert_extrema_preserved(with_nan, text, info)
+	assert summarize_forecast(with_nan) == summarize_forecast(with_nan.dropna())
+
+
+def test_all_nan_raises():
+	df = make_forecast(10, seed=0)
+	df["forecast"] = np.nan
+
+	with pytest.raises(ValueError):
+		summarize_forecast(df)
+
+
+def test_falls_back_to_coarsest_setting_when_nothing_fits():
+	df = make_forecast(1440, seed=5)
+	text, info = summarize_forecast(df, token_budget=10)
+
+	# 어느 설정도 예산에 안 들어가면 가장 성긴 설정 결과를 그대로 쓴다 (최저 / 최고는 여전히 포함)
+	assert info["freq"] == BUCKET_FREQS[-1]
+	assert info["threshold"] == PIVOT_THRESHOLDS[-1]
+	assert info["est_tokens"] > 10
+	assert_extrema_preserved(df, text, info)
@@ -0,0 +1,74 @@
+# tests/test_neuralprophet_artifact.py
+# NeuralProphet artifact 저장 → 로드 후 미래 예측 / 검증 지표가 원래 모델과 같은지 확인
+#
+#   python -m pytest -q tests/
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("neuralprophet")
+
+from features import make_ml_dataset
+from models.neuralprophet_model import NeuralProphetPriceModel
+
+
+STEPS = 12
+
+
+def make_ml(days: int = 10, seed: int = 0):
+	"""30분봉 합성 데이터 (일간 주기 + 랜덤워크 + 가끔 바뀌는 GPT 점수) → (df_ml, features)"""
+	rng = np.random.default_rng(seed)
+	dates = pd.date_range("2025-01-01", periods=days * 48, freq="30min")
+	price = 50_000 + np.cumsum(rng.normal(0, 40, len(dates))) + 400 * np.sin(np.arange(len(dates)) * 2 * np.pi / 48)
+
+	df = pd.DataFrame({
+		"date": dates,
+		"price": price,
+		"gpt_score": np.repeat(rng.integers(0, 3, days), 48).astype(float),
+	})
+	return make_ml_dataset(df)
+
+
+@pytest.fixture(scope="module")
+def trained(tmp_path_factory):
+	"""작은 설정(짧은 lag / horizon, 몇 epoch)으로 학습한 모델 1개를 테스트끼리 같이 쓴다"""
+	workdir = tmp_path_factory.mktemp("np_logs")
+	with pytest.MonkeyPatch.context() as mp:
+		mp.chdir(workdir)		# lightning_logs 가 저장소에 생기지 않도록
+		df_ml, features = make_ml()
+		model = NeuralProphetPriceModel(forecast_horizon=STEPS, n_lags=24, epochs=3)
+		model.train(df_ml, features)
+	return model, df_ml, features
+
+
+def test_artifact_roundtrip_reproduces_forecast_and_metrics(trained, tmp_path, monkeypatch):
+	model, df_ml, features = trained
+	monkeypatch.chdir(tmp_path)
+
+	meta = model.save_artifact(tmp_path)
+
+	loaded = NeuralProphetPriceModel()
+	loaded.load_artifact(tmp_path, meta)
+
+	# models/io.py load_or_train_model 과 같은 순서로 데이터 연결 → 검증 재계산
+	loaded.df = df_ml
+	loaded.features = features
+	loaded.df_np = loaded._build_np_df(df_ml)
+	loaded.split_idx = int(len(loaded.df_np) * 0.8)
+	loaded._evaluate()
+
+	assert (loaded.forecast_horizon, loaded.n_lags) == (model.forecast_horizon, model.n_lags)
+	assert loaded.trained_until == model.trained_until
+
+	assert model.rmse is not None
+	assert loaded.rmse == pytest.approx(model.rmse, rel=1e-5)
+	assert loaded.r2 == pytest.approx(model.r2, rel=1e-5)
+	np.testing.assert_allclose(loaded.y_pred.to_numpy(), model.y_pred.to_numpy(), rtol=1e-5)
+
+	expected = model.predict_future(STEPS)
+	actual = loaded.predict_future(STEPS)
+
+	assert len(actual) == STEPS
+	pd.testing.assert_series_equal(actual["date"], expected["date"])
+	np.testing.assert_allclose(actual["price"].to_numpy(dtype=float), expected["price"].to_numpy(dtype=float), rtol=1e-5)
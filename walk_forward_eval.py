@@ -0,0 +1,86 @@
+# walk_forward_eval.py
+# 아이템 1개에 대해 모델별 walk-forward(rolling-origin) 정확도 / 학습 비용 비교 스크립트
+#
+# 사용법:
+#   python walk_forward_eval.py --grade 유물 --keyword 원한 --folds 5 --output walk_forward.csv
+#
+# - 대시보드와 같은 전처리(pipeline.build_item_ml_dataset)로 df_ml 을 한 번만 만든 뒤
+#   models/walk_forward.py 로 rf / lgbm / xgb / lstm / np 를 K 개 expanding window 에서 평가
+# - fold 별 RMSE / MAE / R² / 학습 시간을 CSV 로 저장하고, 모델별 요약을 출력한다
+#   (앙상블 가중치를 정하기 전에 "정확도 vs 비용" 을 비교하는 용도)
+
+import argparse
+import time
+
+import pandas as pd
+
+from models.walk_forward import WALK_FORWARD_KEYS, run_walk_forward, summarize_walk_forward
+from pipeline import build_item_ml_dataset
+
+
+def main():
+	parser = argparse.ArgumentParser(description="모델별 walk-forward 평가")
+	parser.add_argument("--grade", default="유물", help="아이템 등급 ('전체'면 등급 무관)")
+	parser.add_argument("--keyword", default="원한", help="아이템 이름 키워드")
+	parser.add_argument("--folds", type=int, default=5)
+	parser.add_argument("--models", default=",".join(WALK_FORWARD_KEYS), help="쉼표로 구분한 모델 키")
+	parser.add_argument("--threads", type=int, default=None, help="전체 스레드 예산 (기본: CPU 코어 수)")
+	parser.add_argument(
+		"--no-warm-start",
+		action="store_true",
+		help="LGBM / XGB 도 fold 마다 처음부터 다시 학습",
+	)
+	parser.add_argument("--output", default="walk_forward.csv")
+	args = parser.parse_args()
+
+	from data_loader import load_gpt_scores, load_item_catalog, load_item_history
+	from features import filter_item
+
+	print("[1] 아이템 시세 / GPT 점수 로드 중...")
+	df_catalog = load_item_catalog()
+	mask = df_catalog["name"].str.contains(args.keyword, regex=False, na=False)
+	if args.grade and args.grade != "전체":
+		mask &= df_catalog["grade"] == args.grade
+
+	df_logs = load_item_history(tuple(int(i) for i in df_catalog.loc[mask, "item_id"]))
+	result = filter_item(df_logs, args.keyword, args.grade)
+	if result is None:
+		print(f"'{args.keyword}' (등급: {args.grade}) 에 해당하는 데이터가 없습니다.")
+		return
+
+	df_target, top_item = result
+	item_id = int(df_target["item_id"].iloc[0])
+
+	df_gpt = load_gpt_scores()
+	df_ml, features = build_item_ml_dataset(df_target, df_gpt[df_gpt["item_id"] == item_id].copy())
+	print(f" - 대상 아이템: {top_item} (item {item_id}), df_ml {len(df_ml):,}행")
+
+	model_keys = [k.strip() for k in args.models.split(",") if k.strip()]
+	print(f"[2] walk-forward 평가 중... (모델 {model_keys}, fold {args.folds}개)")
+	start = time.perf_counter()
+	df_folds = run_walk_forward(
+		df_ml,
+		features,
+		model_keys=model_keys,
+		n_folds=args.folds,
+		warm_start=not args.no_warm_start,
+		n_threads=args.threads,
+	)
+	elapsed = time.perf_counter() - start
+
+	df_folds.insert(0, "item_id", item_id)
+	df_folds.to_csv(args.output, index=False)
+
+	with pd.option_context("display.width", 160, "display.max_columns", 20):
+		print(summarize_walk_forward(df_folds).round(3))
+
+		if "error" in df_folds.columns:
+			for row in df_folds.dropna(subset=["error"]).itertuples():
+				print(f"   · {row.model} fold {row.fold}: {row.error}")
+
+	print(f" - 소요 시간: {elapsed:.1f}s")
+	print(f"[완료] {args.output}")
+
+
+if __name__ == "__main__":
+	main()
@@ -5,14 +5,18 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import altair as alt
-import os
-import shutil
 
-from data_loader import load_merged_data, load_gpt_scores
-from features import filter_item, make_ml_dataset
-from models.io import load_or_train_model
+from streamlit_adapter import load_gpt_scores, load_item_catalog, load_item_history
+from features import filter_item
 from backtest import simulate_strict_investor
-from preprocess import apply_gpt_scores, clean_outliers_rolling, resample_to_30min_for_app
+from pipeline import build_item_ml_dataset
+from models.ensemble import EnsemblePriceModel
+from models.hot_cache import HOT_MODELS
+from models.factory import import_report
+from models.io import get_registry
+from models.registry import MODEL_DIR_MAX_MB
+from feature_store import FeatureStore
+from forecast_store import ForecastStore, validation_result
 
 
 # -------------------------------------------------------------------------
@@ -23,6 +27,15 @@ POINTS_PER_DAY = int(24 * 60 / TIME_STEP_MINUTES)  # 48
 FORECAST_DAYS = 3
 FORECAST_STEPS = FORECAST_DAYS * POINTS_PER_DAY    # 144
 
+EVAL_MODEL_NAMES = {
+	"ensemble": "앙상블",
+	"lgbm": "LightGBM",
+	"xgb": "XGBoost",
+	"rf": "RandomForest",
+	"lstm": "LSTM",
+	"np": "NeuralProphet",
+}
+
 
 # -------------------------------------------------------------------------
 # 2. 페이지 설정 & 세션 초기화
@@ -35,8 +48,11 @@ st.set_page_config(
 if "rf_result" not in st.session_state:
 	st.session_state.rf_result = None
 
+feature_store = FeatureStore()
+forecast_store = ForecastStore()
+
 st.title("디지털 자산 시세 변동 예측 모델")
-st.caption("로스트아크 거래소 아이템 시세를 앙상블 모델(LightGBM / XGBoost / NeuralProphet)로 예측합니다.")
+st.caption("로스트아크 거래소 아이템 시세를 앙상블 모델(LightGBM / XGBoost / NeuralProphet / LSTM)로 예측합니다.")
 
 
 # -------------------------------------------------------------------------
@@ -45,11 +61,11 @@ st.caption("로스트아크 거래소 아이템 시세를 앙상블 모델(Light
 with st.sidebar:
 	st.header("아이템 검색")
 
-	# 1) 데이터 로딩
-	df_final = load_merged_data()
+	# 1) 데이터 로딩 (위젯용 카탈로그만, 시세 로그는 실행 시 선택한 아이템만 조회)
+	df_catalog = load_item_catalog()
 	df_gpt_all = load_gpt_scores()
 
-	grade_list = sorted(df_final["grade"].dropna().unique())
+	grade_list = sorted(df_catalog["grade"].dropna().unique())
 	grade_options = ["전체"] + grade_list
 
 	# 2) 등급 선택
@@ -61,13 +77,11 @@ with st.sidebar:
 
 	# 3) 등급에 따라 아이템 후보 리스트 동적 생성
 	if target_grade == "전체":
-		item_options = sorted(df_final["name"].dropna().unique())
+		df_grade_items = df_catalog
 	else:
-		item_options = sorted(
-			df_final.loc[df_final["grade"] == target_grade, "name"]
-			.dropna()
-			.unique()
-		)
+		df_grade_items = df_catalog[df_catalog["grade"] == target_grade]
+
+	item_options = sorted(df_grade_items["name"].dropna().unique())
 
 	if len(item_options) == 0:
 		st.warning("선택한 등급에 해당하는 아이템이 없습니다.")
@@ -119,38 +133,78 @@ with st.sidebar:
 	st.subheader("🔍 검증 모델 선택")
 
 	eval_model_key = st.selectbox(
-		"검증에 사용할 단일 모델",
-		["lgbm", "xgb", "rf", "lstm", "np"],
-		format_func=lambda k: {
-			"lgbm": "LightGBM",
-			"xgb": "XGBoost",
-			"rf": "RandomForest",
-			"lstm": "LSTM",
-			"np": "NeuralProphet",
-		}[k],
+		"검증에 사용할 모델",
+		["ensemble", "lgbm", "xgb", "rf", "lstm", "np"],
+		format_func=lambda k: EVAL_MODEL_NAMES[k],
+	)
+
+	learn_weights = st.checkbox(
+		"검증 구간으로 앙상블 가중치 학습",
+		value=False,
+		help="체크하면 고정 가중치 대신, 검증 구간(뒤 20%) 오차가 가장 작아지는 가중치로 앙상블합니다.",
 	)
 
 	# 🔹 관리자 설정 영역 추가
 	st.markdown("---")
 	with st.expander("⚙️ 관리자 설정"):
-		st.caption("저장된 모델 학습 결과(.pkl)와 예측 캐시를 초기화합니다.")
+		registry = get_registry()
+		df_registry = registry.entries()
 
-		if st.button("모델 초기화", type="secondary", use_container_width=True):
-			model_dir = "trained_models"  # 🔥 반드시 여기
+		if df_registry.empty:
+			st.caption("저장된 모델이 없습니다.")
+		else:
+			total_mb = df_registry["size_bytes"].sum() / 1024 / 1024
+			st.caption(
+				f"저장된 모델 {len(df_registry)}개 · {total_mb:,.1f} MB "
+				f"(예산 {MODEL_DIR_MAX_MB:,.0f} MB, 초과 시 오래 안 쓴 모델부터 자동 정리)"
+			)
+			st.dataframe(
+				df_registry[["model_key", "item_id", "size_bytes", "saved_at", "last_access", "trained_until"]]
+				.sort_values("last_access", ascending=False),
+				hide_index=True,
+				use_container_width=True,
+			)
 
-			try:
-				# 1) 학습된 모델 파일만 삭제
-				if os.path.exists(model_dir):
-					shutil.rmtree(model_dir)
+		hot = HOT_MODELS.stats()
+		st.caption(
+			f"메모리 캐시: 모델 {hot['n_models']}개 · {hot['bytes'] / 1024 / 1024:,.1f} / "
+			f"{hot['max_bytes'] / 1024 / 1024:,.0f} MB · hit {hot['hits']} / miss {hot['misses']}"
+		)
 
-				# 2) 빈 폴더 재생성
-				os.makedirs(model_dir, exist_ok=True)
+		# 모델 백엔드는 처음 쓰일 때 import 된다 (models/factory.py)
+		imported = {k: sec for k, sec in import_report().items() if sec is not None}
+		st.caption(
+			"모델 백엔드 import: "
+			+ (" · ".join(f"{k} {sec:.2f}s" for k, sec in imported.items()) or "아직 없음")
+		)
+
+		df_precomputed = forecast_store.entries()
+		if df_precomputed.empty:
+			st.caption("사전 계산된 예측: 없음 (precompute_service.py 실행 시 생성)")
+		else:
+			st.caption(
+				f"사전 계산된 예측: 아이템 {df_precomputed['item_id'].nunique()}개 · "
+				f"최근 생성 {df_precomputed['generated_at'].max():%m-%d %H:%M}"
+			)
 
-				# 3) 세션 캐시 초기화
+		unused_days = st.number_input("미사용 기간 (일)", min_value=1, max_value=90, value=14)
+
+		if st.button("오래 안 쓴 모델 정리", use_container_width=True):
+			removed = registry.evict_older_than(pd.Timedelta(days=int(unused_days)))
+			st.success(f"{unused_days}일 동안 쓰지 않은 모델 {len(removed)}개를 삭제했습니다.")
+
+		if st.button("모델 초기화", type="secondary", use_container_width=True):
+			try:
+				# 저장된 모델 artifact 만 하나씩 삭제 (trained_models/ 구조는 유지)
+				n_removed = registry.clear()
+				HOT_MODELS.clear()
+				forecast_store.clear()		# 지운 모델로 만든 사전 계산 결과도 같이 정리
+
+				# 세션 캐시 초기화
 				st.session_state.rf_result = None
 
 				st.success(
-					"학습된 모델(.pkl)과 세션 캐시를 초기화했습니다.\n"
+					f"학습된 모델 {n_removed}개와 세션 캐시를 초기화했습니다.\n"
 					"다시 [학습 & 예측 실행]을 눌러 모델을 재학습해주세요."
 				)
 			except Exception as e:
@@ -162,18 +216,27 @@ with st.sidebar:
 # -------------------------------------------------------------------------
 if run_button:
 	with st.spinner("데이터 필터링 중..."):
-		result = filter_item(df_final, target_keyword, target_grade)
+		target_item_ids = tuple(
+			int(i) for i in df_grade_items.loc[df_grade_items["name"] == target_item_name, "item_id"]
+		)
+
+		# 4-1. feature store 에 확정된 구간이 있으면 그 이후 로그만 조회
+		#      (카탈로그에서 이름이 한 아이템으로 정해질 때만, 아니면 전체 히스토리)
+		history_start = None
+		if len(target_item_ids) == 1:
+			df_gpt_catalog = df_gpt_all[df_gpt_all["item_id"] == target_item_ids[0]]
+			history_start = feature_store.history_start(target_item_ids[0], df_gpt_catalog)
+
+		df_item_logs = load_item_history(target_item_ids, start=history_start)
+		result = filter_item(df_item_logs, target_keyword, target_grade)
 
 	if result is None:
 		st.error(f"'{target_keyword}' (등급: {target_grade}) 에 해당하는 데이터가 없습니다.")
 	else:
-		# 🔹 UI용 원본 (10분 단위)
+		# 🔹 UI용 원본 (10분 단위, feature store 가 있으면 최근 구간만)
 		df_target, top_item = result
 
-		# 4-1. 30분봉으로 변환 (ML 전용)
-		df_target_30 = resample_to_30min_for_app(df_target)
-
-		# 4-2. item_id 추출
+		# 4-2. item_id 는 실제로 불러온 로그 기준 (feature store / 모델 / 사전 계산 결과가 df_target 과 같은 아이템을 가리키도록)
 		item_id = None
 		if "item_id" in df_target.columns:
 			try:
@@ -181,38 +244,19 @@ if run_button:
 			except Exception:
 				item_id = None
 
-		# 4-3. 해당 아이템에 대한 GPT 점수만 필터링
+		# 해당 아이템에 대한 GPT 점수만 필터링
 		if item_id is not None:
 			df_gpt_item = df_gpt_all[df_gpt_all["item_id"] == item_id].copy()
 		else:
 			df_gpt_item = None
 
-		# 4-4. GPT 점수 매핑 (date index 기준)
-		df_target_for_ml = (
-			df_target_30
-			.sort_values("date")
-			.set_index("date")
-		)
-
-		df_target_with_gpt = apply_gpt_scores(
-			df_target_for_ml,
-			df_gpt_item,
-			score_col="gpt_score",
-		)
-
-		# 4-5. 이상치 정제 (30분 기준)
-		df_target_clean = clean_outliers_rolling(
-			df_target_with_gpt,
-			column="price",
-			window=POINTS_PER_DAY,   # 하루 기준
-			sigma=3.0,
-		)
-
-		df_target_clean = df_target_clean.reset_index()
-
-		# 4-6. Feature Engineering
+		# 4-3. 30분봉 변환 → GPT 점수 매핑 → 이상치 정제 → Feature Engineering
+		#      (feature store: watermark 이후 봉만 새로 계산)
 		with st.spinner("Feature Engineering 처리 중..."):
-			df_ml, features = make_ml_dataset(df_target_clean)
+			if item_id is not None:
+				df_ml, features = feature_store.refresh(item_id, df_target, df_gpt_item)
+			else:
+				df_ml, features = build_item_ml_dataset(df_target, df_gpt_item)
 
 		if len(df_ml) < 300:
 			st.warning(
@@ -221,99 +265,83 @@ if run_button:
 			)
 		else:
 			# -----------------------------------------------------------------
-			# 5. 앙상블 모델 (LightGBM / XGBoost / NeuralProphet)
-			#    - 항상 학습/로드 후 미래 예측
-			#    - 예측값은 날짜 기준으로 merge 후 가중 평균
+			# 5. 앙상블 모델 (LightGBM / XGBoost / NeuralProphet / LSTM) + 검증용 단일 모델
+			#    - 멤버끼리 독립이라 models/ensemble.py runner 가 동시에 학습/로드
+			#      (멤버별 스레드 수를 나눠서 코어를 과하게 잡지 않게 함)
+			#    - 저장된 LGBM / XGB 는 새 봉만 이어 학습
+			#    - 예측값은 날짜 기준으로 정렬(NumPy stack) 후 가중 평균
+			#    - 검증 모델이 앙상블 멤버가 아니면 같은 pool 에서 같이 학습/로드
 			# -----------------------------------------------------------------
-			with st.spinner("앙상블 모델 학습 / 로드 중..."):
-				ensemble_keys = ["lgbm", "xgb", "np"]
-				ensemble_weights = {
-					"lgbm": 4.0,
-					"xgb": 4.5,
-					"np": 1.5,
-				}
-
-				ensemble_models: dict[str, object] = {}
-				ensemble_status: dict[str, str] = {}
-				ensemble_future: dict[str, pd.DataFrame | None] = {}
-
-				for key in ensemble_keys:
-					m, status = load_or_train_model(
-						model_key=key,
-						item_id=item_id,
-						df_ml=df_ml,
-						features=features,
-					)
-					ensemble_models[key] = m
-					ensemble_status[key] = status
-
-					try:
-						fut = m.predict_future(steps=FORECAST_STEPS)
-					except NotImplementedError:
-						fut = None
-
-					ensemble_future[key] = fut
-
-				# 5-2. 앙상블 모델 미래 예측 (날짜 기준 merge + 가중 평균)
-				valid_keys = [
-					k for k in ensemble_keys
-					if ensemble_future.get(k) is not None
-					and not ensemble_future[k].empty
-				]
-
-				if len(valid_keys) == 0:
-					ensemble_future_df = None
-				else:
-					df_ens = None
-					for k in valid_keys:
-						df_k = ensemble_future[k][["date", "price"]].copy()
-						df_k = df_k.rename(columns={"price": f"price_{k}"})
-						if df_ens is None:
-							df_ens = df_k
-						else:
-							df_ens = pd.merge(df_ens, df_k, on="date", how="inner")
-
-					# 사용 가능한 모델만으로 가중 평균 계산
-					total_w = sum(ensemble_weights[k] for k in valid_keys)
-					weighted_sum = 0.0
-					for k in valid_keys:
-						w = ensemble_weights[k]
-						weighted_sum += df_ens[f"price_{k}"] * w
-
-					df_ens["ensemble_price"] = weighted_sum / total_w
-					ensemble_future_df = df_ens  # date + price_lgbm/xgb/np + ensemble_price
-
-			# -----------------------------------------------------------------
-			# 6. 검증용 단일 모델 학습 / 평가
-			#    - eval_model_key 기준
-			#    - lgbm/xgb는 이미 ensemble에서 학습된 인스턴스 재사용
-			# -----------------------------------------------------------------
-			with st.spinner("선택한 검증 모델 학습 / 평가 중..."):
-				if eval_model_key in ensemble_models:
-					eval_model = ensemble_models[eval_model_key]
-					eval_status = ensemble_status[eval_model_key]
-				else:
-					eval_model, eval_status = load_or_train_model(
-						model_key=eval_model_key,
+			# 5-0. 사전 계산 워커(precompute_service.py)가 저장한 최신 결과가 있으면 그대로 사용
+			#      (학습 / 예측 없이 저장소 읽기 1번, 새 봉이 더 들어왔거나 가중치 학습을 켰으면 직접 계산)
+			#      - 마지막 봉이 df_ml 과 정확히 같은 결과만 쓴다: 검증 예측 / 그래프는 df_ml 뒤에서부터
+			#        날짜를 붙이고, 미래 예측도 df_ml 마지막 봉 다음부터 시작해야 하므로 한 봉만 어긋나도 밀린다
+			precomputed = None
+			if item_id is not None and not learn_weights:
+				data_until = df_ml["date"].iloc[-1]
+				precomputed = forecast_store.latest(
+					item_id,
+					min_data_until=data_until,
+					min_steps=FORECAST_STEPS,
+				)
+				if precomputed is not None and precomputed["data_until"] != data_until:
+					precomputed = None
+				eval_result = None if precomputed is None else validation_result(precomputed, eval_model_key)
+				if eval_result is None:
+					precomputed = None
+
+			if precomputed is not None:
+				ensemble_future_df = precomputed["forecast"].iloc[:FORECAST_STEPS].reset_index(drop=True)
+				ensemble_timings = None
+				ensemble_weights = precomputed["weights"]
+				y_test, y_pred, rmse, r2 = eval_result
+				split_idx = len(df_ml) - len(y_test)
+				eval_model_name = EVAL_MODEL_NAMES[eval_model_key]
+
+				st.info(
+					f"⚡ 사전 계산된 예측을 불러왔습니다. "
+					f"(생성 {precomputed['generated_at']:%m-%d %H:%M} · 데이터 {precomputed['data_until']:%m-%d %H:%M} 까지)"
+				)
+			else:
+				with st.spinner("앙상블 / 검증 모델 학습 / 로드 중..."):
+					ensemble_model = EnsemblePriceModel(
 						item_id=item_id,
-						df_ml=df_ml,
-						features=features,
+						update=True,
+						learn_weights=learn_weights,
+						extra_keys=[] if eval_model_key == "ensemble" else [eval_model_key],
 					)
-
-				eval_model_name = {
-					"lgbm": "LightGBM",
-					"xgb": "XGBoost",
-					"rf": "RandomForest",
-					"lstm": "LSTM",
-					"np": "NeuralProphet",
-				}[eval_model_key]
-
-				if eval_status == "loaded":
-					st.info(f"📦 검증 모델({eval_model_name})을 저장된 상태에서 불러왔습니다.")
-				else:
-					st.success(f"🧠 검증 모델({eval_model_name})을 새로 학습하고 저장했습니다.")
-
-				y_test, y_pred, split_idx, rmse, r2 = eval_model.predict_test()
+					ensemble_model.train(df_ml, features)
+					ensemble_future_df = ensemble_model.predict_future(FORECAST_STEPS)
+					ensemble_timings = ensemble_model.timings
+					ensemble_weights = ensemble_model.weights
+					# ensemble_future_df: date + price_lgbm/xgb/np/lstm + ensemble_price
+
+				# -----------------------------------------------------------------
+				# 6. 검증용 단일 모델 평가
+				#    - eval_model_key 기준 (5에서 이미 학습/로드된 인스턴스 사용)
+				# -----------------------------------------------------------------
+				with st.spinner("선택한 검증 모델 평가 중..."):
+					if eval_model_key == "ensemble":
+						eval_model = ensemble_model
+						member_status = set(ensemble_model.status.values())
+						eval_status = next(
+							(s for s in ("trained", "updated") if s in member_status),
+							"loaded",
+						)
+					else:
+						eval_model = ensemble_model.members[eval_model_key]
+						eval_status = ensemble_model.status[eval_model_key]
+
+					eval_model_name = EVAL_MODEL_NAMES[eval_model_key]
+
+					if eval_status == "loaded":
+						st.info(f"📦 검증 모델({eval_model_name})을 저장된 상태에서 불러왔습니다.")
+					elif eval_status == "updated":
+						st.info(f"🔁 검증 모델({eval_model_name})을 새 데이터로 이어 학습했습니다.")
+					else:
+						st.success(f"🧠 검증 모델({eval_model_name})을 새로 학습하고 저장했습니다.")
+
+					y_test, y_pred, split_idx, rmse, r2 = eval_model.predict_test()
 
 			# -----------------------------------------------------------------
 			# 7. 세션에 결과 저장 (앙상블 모델 + 검증 모델)
@@ -329,6 +357,8 @@ if run_button:
 				"r2": r2,
 				# "days_to_show": days_to_show,
 				"future_df_ensemble": ensemble_future_df,  # 🔥 앙상블 모델 예측 + 개별
+				"ensemble_timings": ensemble_timings,      # 모델별 학습/로드 + 예측 소요 시간
+				"ensemble_weights": ensemble_weights,      # 실제 blend 에 쓴 가중치
 				"eval_model_key": eval_model_key,
 				"eval_model_name": eval_model_name,
 				"features": features,
@@ -359,6 +389,8 @@ rmse = res["rmse"]
 r2 = res["r2"]
 # days_to_show = res["days_to_show"]
 future_df_ensemble = res["future_df_ensemble"]
+ensemble_timings = res.get("ensemble_timings")
+ensemble_weights = res.get("ensemble_weights") or {}
 eval_model_key = res["eval_model_key"]
 eval_model_name = res["eval_model_name"]
 # use_global_scale = res.get("use_global_scale", False)
@@ -401,11 +433,28 @@ with price_col2:
 # -------------------------------------------------------------------------
 st.markdown("### 🔮 앙상블 모델 기반 향후 3일 시세 예측")
 
+MEMBER_NAMES = {"lgbm": "LightGBM", "xgb": "XGBoost", "np": "NeuralProphet", "lstm": "LSTM"}
+weight_text = " : ".join(
+	f"{MEMBER_NAMES.get(k, k)} {w / max(sum(ensemble_weights.values()), 1e-12) * 10:.1f}"
+	for k, w in ensemble_weights.items()
+)
+
 st.caption(
-	"앙상블 모델 (LightGBM 5.5 : XGBoost 3.5 : NeuralProphet 1.0 가중 평균)\n"
+	f"앙상블 모델 ({weight_text} 가중 평균)\n"
 	"점선은 각 개별 모델의 예측, 실선은 앙상블 모델과 실제 히스토리입니다."
 )
 
+if ensemble_timings:
+	st.caption(
+		"⏱️ 모델별 소요 시간 (동시 실행): "
+		+ " / ".join(
+			f"{k} {t['fit_sec'] + t['predict_sec']:.1f}s"
+			for k, t in ensemble_timings.items()
+			if k != "total_sec"
+		)
+		+ f" · 전체 {ensemble_timings['total_sec']:.1f}s"
+	)
+
 if future_df_ensemble is None or future_df_ensemble.empty:
 	st.info("앙상블 모델 예측을 생성할 수 없습니다. (필요 모델의 predict_future 미구현 또는 데이터 부족)")
 else:
@@ -416,7 +465,7 @@ else:
 	hist_tail = df_ml[["date", "price"]].iloc[-zoom_n:].copy()
 	hist_tail["type"] = "History"
 
-	# 11-2. 미래 예측: 앙상블 + 개별 3개
+	# 11-2. 미래 예측: 앙상블 + 개별 모델
 	df_ens_raw = future_df_ensemble.copy()
 
 	# 앙상블 메인 라인
@@ -450,6 +499,13 @@ else:
 			"type": "NeuralProphet",
 		}))
 
+	if "price_lstm" in df_ens_raw.columns:
+		indiv_frames.append(pd.DataFrame({
+			"date": df_ens_raw["date"],
+			"price": df_ens_raw["price_lstm"],
+			"type": "LSTM",
+		}))
+
 	if len(indiv_frames) > 0:
 		df_indiv = pd.concat(indiv_frames, ignore_index=True)
 	else: